@@ -1,9 +1,25 @@
+import argparse
+import multiprocessing
+import sys
+
 import voicemeeterlib
 
 import nvda_voicemeeter
 
 KIND_ID = "potato"
 
-with voicemeeterlib.api(KIND_ID) as vm:
-    with nvda_voicemeeter.draw(KIND_ID, vm) as window:
-        window.run()
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # the config library reads files in worker processes
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headless", action="store_true", help="run without a window, driven by the command server")
+    parser.add_argument("--port", type=int, help="command server port, overrides settings.json")
+    args = parser.parse_args()
+
+    with voicemeeterlib.api(KIND_ID) as vm:
+        if args.headless:
+            with nvda_voicemeeter.headless(vm, port=args.port) as controller:
+                sys.exit(controller.run())
+        else:
+            with nvda_voicemeeter.draw(KIND_ID, vm) as window:
+                window.run()
@@ -0,0 +1,165 @@
+"""
+Compares the old fixed 200ms delay before a confirmation is spoken with NVDAVMWindow.announce
+
+With a display the real conditions are timed on real tk cycles, from the action to speech: a toggle, a ButtonMenu
+item chosen (the menu is unposted, util.menu_unposted waits for it to be unmapped and focus to be back) and a
+dialog closed (util.has_focus waits for focus to come back to the main window). Without a display only a
+simulation can run, the ready times are assumed there and the output is labelled as such.
+
+    pdm run bench-announce [--runs N]
+"""
+
+import argparse
+import functools
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import fakevm  # noqa: E402
+from bench_fake import has_display  # noqa: E402
+
+from nvda_voicemeeter import util  # noqa: E402
+from nvda_voicemeeter.window import NVDAVMWindow  # noqa: E402
+
+OLD_DELAY = 200
+
+SIMULATED = [
+    ("toggle", None),
+    ("bus mode menu unposted", 40),
+    ("device menu unposted", 80),
+    ("focus back from a dialog", 150),
+    ("never ready, timeout", float("inf")),
+]
+
+
+class TkLoop:
+    def __init__(self, root):
+        self.root = root
+        self.after = root.after
+        self.after_idle = root.after_idle
+
+    def run_until(self, done):
+        while not done():
+            self.root.update()
+            time.sleep(0.001)
+
+
+def measure(loop, act, announce, prepare=None) -> float:
+    """Returns the ms from act() to speech, prepare() sets the cycle up beforehand"""
+    if prepare is not None:
+        prepare()
+    spoken = []
+    start = time.perf_counter()
+    act()
+    announce(lambda text: spoken.append(time.perf_counter()))
+    loop.run_until(lambda: spoken)
+    return (spoken[0] - start) * 1000
+
+
+def old(loop):
+    return lambda speak: loop.after(OLD_DELAY, speak, "on")
+
+
+def new(loop, ready):
+    def schedule(speak):
+        window = SimpleNamespace(TKroot=loop, nvda=SimpleNamespace(speak=speak), logger=logging.getLogger(__name__))
+        NVDAVMWindow.announce(window, "on", ready=ready)
+
+    return schedule
+
+
+def compare(loop, name, runs, act=lambda: None, ready=None, prepare=None):
+    before = statistics.median(measure(loop, act, old(loop), prepare) for _ in range(runs))
+    after = statistics.median(measure(loop, act, new(loop, ready), prepare) for _ in range(runs))
+    print(f"{name:<28} {before:10.1f}ms {after:8.1f}ms")
+
+
+def run_real(runs):
+    import PySimpleGUI as psg
+
+    win = psg.Window(
+        "bench announce",
+        [[psg.ButtonMenu("Mode", ["", ["normal", "amix", "bmix"]], key="MODE")], [psg.Button("OK")]],
+        finalize=True,
+    )
+    loop = TkLoop(win.TKroot)
+    print(f"real tk cycles, median of {runs} runs")
+    print(f"{'case':<28} {'fixed 200ms':>12} {'announce':>10}")
+
+    compare(loop, "toggle", runs)
+
+    menu = win["MODE"].TKMenu
+
+    def post():
+        win["MODE"].set_focus()
+        util.open_context_menu_for_buttonmenu(win, "MODE")
+        loop.run_until(menu.winfo_ismapped)
+
+    def choose():
+        menu.invoke(1)
+        menu.unpost()
+
+    compare(
+        loop,
+        "bus mode menu item chosen",
+        runs,
+        act=choose,
+        ready=functools.partial(util.menu_unposted, win, "MODE"),
+        prepare=post,
+    )
+
+    dialogs = []
+
+    def open_dialog():
+        dialog = psg.Window("dialog", [[psg.Input(key="IN")]], finalize=True, keep_on_top=True)
+        dialog["IN"].set_focus(force=True)
+        deadline = time.perf_counter() + 1
+        loop.run_until(lambda: dialog.TKroot.focus_get() is not None or time.perf_counter() > deadline)
+        dialogs.append(dialog)
+
+    compare(
+        loop,
+        "focus back from a dialog",
+        runs,
+        act=lambda: dialogs.pop().close(),
+        ready=functools.partial(util.has_focus, win),
+        prepare=open_dialog,
+    )
+    win.close()
+
+
+def run_simulated(runs):
+    loop = fakevm.FakeLoop()
+    print(f"SIMULATION, no display: ready times are assumed, not measured. Median of {runs} runs")
+    print(f"{'case':<28} {'ready at':>9} {'fixed 200ms':>12} {'announce':>10}")
+    for name, ready_after in SIMULATED:
+        before = statistics.median(measure(loop, lambda: None, old(loop)) for _ in range(runs))
+
+        def announce(speak):
+            start = time.perf_counter()
+            ready = None if ready_after is None else lambda: (time.perf_counter() - start) * 1000 >= ready_after
+            new(loop, ready)(speak)
+
+        after = statistics.median(measure(loop, lambda: None, announce) for _ in range(runs))
+        ready = "-" if ready_after is None else "never" if ready_after == float("inf") else f"{ready_after}ms"
+        print(f"{name:<28} {ready:>9} {before:10.1f}ms {after:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if has_display():
+        run_real(args.runs)
+    else:
+        run_simulated(args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Ranks the code paths making the most engine calls for each kind, against the fake remote
+
+Runs startup, pdirty refreshes, toggles, slider steps, a batch and a scene recall through the controller, and where
+tk has a display also builds the window and opens each popup. Calls are charged to the innermost function of the
+package that made them and to the step of the script they happened in.
+
+    pdm run bench-calls [--kinds basic banana potato] [--top N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import fakevm  # noqa: E402
+from bench_fake import has_display  # noqa: E402
+
+import nvda_voicemeeter  # noqa: E402
+from nvda_voicemeeter.accounting import CallAccounting  # noqa: E402
+from nvda_voicemeeter.controller import Controller  # noqa: E402
+
+
+def controller_script(vm, accounting):
+    accounting.begin("controller startup")
+    controller = Controller(vm)
+
+    accounting.begin("on_pdirty, nothing changed")
+    controller.on_pdirty()
+
+    accounting.begin("on_pdirty, every strip gain")
+    for i in range(vm.kind.num_strip):
+        vm.poke(f"Strip[{i}].Gain", -6)
+    controller.on_pdirty()
+
+    accounting.begin("toggles")
+    for key in ("STRIP 0||A1", "STRIP 0||MUTE", "BUS 0||MUTE", "BUS 0||MONO"):
+        controller.toggle(key)
+
+    accounting.begin("20 slider steps")
+    for _ in range(20):
+        controller.step_slider("STRIP 0||SLIDER GAIN", "UP", ())
+    controller.writer.flush()
+
+    accounting.begin("batch")
+    controller.run_batch([("STRIP 1||MUTE", None), ("BUS 1||SLIDER GAIN", "-3")], lambda text: None)
+
+    accounting.begin("scene save and recall")
+    controller.save_scene("bench")
+    controller.toggle("STRIP 0||MUTE")
+    controller.recall_scene("bench")
+
+
+def window_script(vm, accounting):
+    from nvda_voicemeeter import window
+
+    window.Nvda = fakevm.FakeNvda
+    accounting.begin("window startup")
+    win = nvda_voicemeeter.draw(vm.kind.name, vm)
+    popups = win.popup
+    accounting.begin("advanced settings popup")
+    popups.show("advanced settings", lambda: popups._make_advanced_settings("Advanced Settings"), None).hide()
+    if vm.kind.name != "basic":
+        accounting.begin("compressor popup")
+        popups.show(("compressor", 0), lambda: popups._make_compressor(0, "Advanced Compressor"), None).hide()
+        accounting.begin("gate popup")
+        popups.show(("gate", 0), lambda: popups._make_gate(0, "Advanced Gate"), None).hide()
+    popups.close()
+    win.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kinds", nargs="+", default=["basic", "banana", "potato"], choices=fakevm.KINDS)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    gui = has_display()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # scenes go to a throwaway settings.json
+        for kind in args.kinds:
+            vm = fakevm.api(kind)
+            accounting = CallAccounting(vm)
+            controller_script(vm, accounting)
+            if gui:
+                window_script(vm, accounting)
+            print(accounting.report(args.top), end="\n\n")
+    if not gui:
+        print("no display, window and popup calls skipped")
+
+
+if __name__ == "__main__":
+    main()
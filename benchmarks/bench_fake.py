@@ -0,0 +1,225 @@
+"""
+Times startup, pdirty refresh, slider stepping and popup open/close for each kind against the fake remote
+
+Runs on any platform. The controller is measured headless, the window and its popups only where tk has a display.
+Engine calls are counted next to each time, --latency adds a delay to every call to model a slow engine.
+
+A scripted key hold counts the engine writes made per key repeat against those of the per-frame coalescing of
+Dispatcher.queue_step/apply_steps, on the fake loop so it runs without a display.
+
+    pdm run bench-fake [--kinds basic banana potato] [--runs N] [--latency US] [--mode-get-delay MS]
+                       [--hold-rate HZ] [--hold-seconds S]
+"""
+
+import argparse
+import functools
+import itertools
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import fakevm  # noqa: E402
+
+import nvda_voicemeeter  # noqa: E402
+from nvda_voicemeeter.controller import Controller  # noqa: E402
+from nvda_voicemeeter.dispatch import FRAME_MS, Dispatcher  # noqa: E402
+
+
+def measure(vm, fn, runs) -> tuple:
+    """Returns the median time in ms and the engine calls of one run"""
+    times = []
+    for _ in range(runs):
+        vm.reset_calls()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), sum(vm.calls.values())
+
+
+def report(kind, name, result):
+    elapsed, calls = result
+    print(f"{kind:<8} {name:<32} {elapsed:9.3f}ms  {calls:6} calls")
+
+
+def bench_controller(args, kind):
+    make = functools.partial(fakevm.api, kind, latency=args.latency, mode_get_delay=args.mode_get_delay)
+    vm = make()
+    report(kind, "controller startup", measure(vm, lambda: Controller(vm), args.runs))
+
+    controller = Controller(vm)
+    report(kind, "on_pdirty, nothing changed", measure(vm, controller.on_pdirty, args.runs))
+
+    tick = itertools.count()
+
+    def changed():
+        gain = -(next(tick) % 59 + 1)
+        for i in range(vm.kind.num_strip):
+            vm.poke(f"Strip[{i}].Gain", gain)
+        controller.on_pdirty()
+
+    report(kind, "on_pdirty, every strip gain", measure(vm, changed, args.runs))
+
+    key = "STRIP 0||SLIDER GAIN"
+
+    def steps():
+        for i in range(args.steps):
+            controller.write_slider(key, controller.next_value(key, "UP" if i % 40 < 20 else "DOWN", ()))
+        controller.writer.flush()
+
+    controller.writer.start()
+    elapsed, calls = measure(vm, steps, args.runs)
+    controller.writer.stop()
+    report(kind, f"{args.steps} slider steps, per step", (elapsed / args.steps, calls))
+
+
+def hold(args, kind, coalesced, latency, start=-60) -> tuple:
+    """
+    Holds Right on strip 0 gain, from start, for hold_seconds at hold_rate repeats a second
+
+    Returns the engine writes, how long after the last repeat the last of them was done in ms, and the final gain.
+    """
+    key = "STRIP 0||SLIDER GAIN"
+    vm = fakevm.api(kind, latency=latency)
+    vm.poke("Strip[0].Gain", start)
+    controller = Controller(vm)
+    loop = fakevm.FakeLoop()
+    if coalesced:
+        dispatcher = Dispatcher(controller, loop.after, speak=fakevm.FakeNvda().speak)
+        controller.writer.start()
+
+        def repeat():
+            dispatcher.step_slider(key, "RIGHT", (), "PRESS")
+
+    else:
+        cache, spec, target = controller._slider(key)
+
+        def repeat():
+            # each repeat read and wrote the engine before the write-behind queue and frame coalescing
+            cache[key] = val = spec.step(spec.get(target), "RIGHT", ())
+            spec.setter(target)(val)
+
+    for i in range(int(args.hold_rate * args.hold_seconds)):
+        loop.after(i * 1000 / args.hold_rate, repeat)
+    vm.reset_calls()
+    began = time.perf_counter()
+    loop.run_until(lambda: not loop.timers)
+    if coalesced:
+        controller.writer.stop()
+    lag = (time.perf_counter() - began) * 1000 - (i * 1000 / args.hold_rate)
+    return vm.calls["set"], lag, vm.strip[0].gain
+
+
+def bench_hold(args, kind):
+    repeats = int(args.hold_rate * args.hold_seconds)
+    name = f"{args.hold_seconds:g}s hold at {args.hold_rate:g}Hz ({repeats} repeats)"
+    for latency in sorted({args.latency, 0.02}):
+        for coalesced in (False, True):
+            writes, lag, final = hold(args, kind, coalesced, latency)
+            path = f"coalesced, {FRAME_MS}ms frames" if coalesced else "per event"
+            print(
+                f"{kind:<8} {name}, {latency * 1000:g}ms per call, {path:<22} {writes:4} writes {lag:8.1f}ms lag, "
+                f"final gain {final:g}"
+            )
+
+
+def bench_window(args, kind):
+    from nvda_voicemeeter import window
+
+    window.Nvda = fakevm.FakeNvda  # speech goes nowhere
+    vm = fakevm.api(kind, latency=args.latency, mode_get_delay=args.mode_get_delay)
+    drawn = []
+
+    def startup():
+        drawn.append(nvda_voicemeeter.draw(kind, vm))
+
+    report(kind, "window startup", measure(vm, startup, 1))
+    win = drawn[0]
+
+    key = "STRIP 0||SLIDER GAIN"
+
+    def steps():
+        for i in range(args.steps):
+            win.dispatcher.step_slider(key, "UP" if i % 40 < 20 else "DOWN", (), "PRESS")
+            win.refresh()
+        win.dispatcher.step_slider(key, "UP", (), "RELEASE")
+        win.writer.flush()
+
+    elapsed, calls = measure(vm, steps, args.runs)
+    report(kind, f"{args.steps} window slider steps, per step", (elapsed / args.steps, calls))
+
+    popups = win.popup
+    targets = [
+        (
+            "advanced settings",
+            functools.partial(popups._make_advanced_settings, "Advanced Settings"),
+            popups.refresh_advanced_settings,
+        )
+    ]
+    if kind != "basic":
+        targets += [
+            (
+                ("compressor", 0),
+                functools.partial(popups._make_compressor, 0, "Advanced Compressor"),
+                functools.partial(popups.refresh_strip, "COMPRESSOR", 0),
+            ),
+            (
+                ("gate", 0),
+                functools.partial(popups._make_gate, 0, "Advanced Gate"),
+                functools.partial(popups.refresh_strip, "GATE", 0),
+            ),
+        ]
+    for key, build, refresh in targets:
+        name = key if isinstance(key, str) else key[0]
+
+        def open_close():
+            popup = popups.show(key, build, refresh)
+            popup.refresh()
+            popups.active = None
+            popup.hide()
+
+        report(kind, f"{name} popup, cold", measure(vm, open_close, 1))
+        report(kind, f"{name} popup, warm", measure(vm, open_close, args.runs))
+    popups.close()
+    win.close()
+
+
+def has_display() -> bool:
+    import tkinter
+
+    try:
+        tkinter.Tk().destroy()
+    except tkinter.TclError:
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kinds", nargs="+", default=["basic", "banana", "potato"], choices=fakevm.KINDS)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="per engine call, in microseconds")
+    parser.add_argument("--hold-rate", type=float, default=30.0, help="key repeats a second")
+    parser.add_argument("--hold-seconds", type=float, default=2.0)
+    parser.add_argument(
+        "--mode-get-delay", type=float, default=10.0, help="bus mode reads sleep this long (ms), as voicemeeterlib"
+    )
+    args = parser.parse_args()
+    args.latency /= 1e6
+    args.mode_get_delay /= 1000
+
+    gui = has_display()
+    for kind in args.kinds:
+        bench_controller(args, kind)
+        if gui:
+            bench_window(args, kind)
+    bench_hold(args, args.kinds[-1])  # the same for every kind, strip 0 gain
+    if not gui:
+        print("no display, window and popup timings skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Checks the import cost of the modules on the startup path against a budget
+
+Each target is imported in a fresh interpreter with -X importtime, the median over a number of runs is compared
+to the budget. Sources are byte compiled first, as they are in the PyInstaller bundle. Modules deferred until
+after the first frame must not show up on the startup path at all.
+
+    pdm run bench-imports [--runs N]
+"""
+
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parents[1] / "src"
+
+# cumulative import cost in ms
+BUDGET = {
+    "PySimpleGUI": 250,
+    "voicemeeterlib": 100,
+    "nvda_voicemeeter": 150,
+    "nvda_voicemeeter.window": 300,
+}
+
+# self import cost in ms, for the package's own modules
+SELF_BUDGET = 10
+
+DEFERRED = ("pyparsing", "winreg", "numpy")
+
+
+def importtime(target) -> dict | None:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=os.environ | {"PYTHONPATH": str(SRC)},
+    )
+    if proc.returncode != 0:
+        return None
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        timings[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    compileall.compile_dir(SRC, quiet=1)
+    failures = []
+    for target, budget in BUDGET.items():
+        runs = [importtime(target) for _ in range(args.runs)]
+        if None in runs:
+            print(f"{target:<40} skipped, not importable on this platform")
+            continue
+        for name in sorted({name for run in runs for name in run}):
+            if name.split(".")[0] in DEFERRED:
+                failures.append(f"{name} imported at startup by {target}")
+                continue
+            if name != target and not name.startswith("nvda_voicemeeter."):
+                continue
+            self_ms = statistics.median(run[name][0] for run in runs if name in run)
+            cumulative_ms = statistics.median(run[name][1] for run in runs if name in run)
+            limit = budget if name == target else SELF_BUDGET
+            measured = cumulative_ms if name == target else self_ms
+            status = "ok" if measured <= limit else "OVER"
+            print(f"{name:<40} self {self_ms:8.1f}ms  cumulative {cumulative_ms:8.1f}ms  budget {limit:5}ms  {status}")
+            if measured > limit:
+                failures.append(f"{name} took {measured:.1f}ms, budget {limit}ms")
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Reports what each kind costs in memory: elements, tk bindings, cache sizes and traced allocations by subsystem
+
+Built against the fake remote so it runs on any platform. The controller caches are measured headless, the window
+and its popups only where tk has a display. Allocations are traced with tracemalloc and charged to the innermost
+module of the package on the stack, memory allocated by Tcl/Tk itself is not visible to it.
+
+    pdm run bench-memory [--kinds basic banana potato] [--top N]
+"""
+
+import argparse
+import collections
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import fakevm  # noqa: E402
+from bench_fake import has_display  # noqa: E402
+
+import nvda_voicemeeter  # noqa: E402
+from nvda_voicemeeter.controller import Controller  # noqa: E402
+
+PACKAGE = str(Path(nvda_voicemeeter.__file__).parent)
+
+
+def deep_size(obj, seen=None) -> int:
+    """sys.getsizeof over containers and their contents, each object counted once"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    return size
+
+
+def traced(fn) -> tuple:
+    """Returns what fn returned and a snapshot of the allocations it left behind"""
+    tracemalloc.start(25)
+    try:
+        result = fn()
+        return result, tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    finally:
+        tracemalloc.stop()
+
+
+def subsystem(traceback) -> str:
+    """The innermost module of the package that led to an allocation, else the library that made it"""
+    for frame in reversed(traceback):
+        if frame.filename.startswith(PACKAGE):
+            return Path(frame.filename).stem
+    parts = Path(traceback[-1].filename).parts
+    for library in ("PySimpleGUI", "tkinter", "pyparsing"):
+        if library in parts:
+            return library
+    return Path(traceback[-1].filename).stem
+
+
+def by_subsystem(snapshot) -> collections.Counter:
+    totals = collections.Counter()
+    for trace in snapshot.traces:
+        totals[subsystem(trace.traceback)] += trace.size
+    return totals
+
+
+def report(kind, name, value):
+    print(f"{kind:<8} {name:<40} {value}")
+
+
+def report_allocations(kind, name, snapshot, top):
+    totals = by_subsystem(snapshot)
+    report(kind, f"{name}, traced", f"{sum(totals.values()) / 1024:10.1f} KiB")
+    for module, size in totals.most_common(top):
+        report(kind, f"    {module}", f"{size / 1024:10.1f} KiB")
+
+
+def bench_controller(args, kind):
+    vm = fakevm.api(kind)
+    controller, snapshot = traced(lambda: Controller(vm))
+    report_allocations(kind, "controller", snapshot, args.top)
+    for section, cache in controller.cache.items():
+        report(kind, f"cache {section}", f"{len(cache):6} entries {deep_size(cache) / 1024:8.1f} KiB")
+    report(kind, "param specs", f"{sum(map(len, controller.specs.values())):6} entries")
+
+
+def menu_entries(menu) -> int:
+    if isinstance(menu, (list, tuple)):
+        return sum(menu_entries(item) for item in menu)
+    return 1
+
+
+def tk_widgets(widget):
+    yield widget
+    for child in widget.winfo_children():
+        yield from tk_widgets(child)
+
+
+def count_window(kind, name, win):
+    elements = win.element_list()
+    report(kind, f"{name}, elements", len(elements))
+    for element_type, n in collections.Counter(e.Type for e in elements).most_common():
+        report(kind, f"    {element_type}", n)
+    menus = [e for e in elements if e.Type == "buttonmenu"]  # device lists, bus modes
+    entries = sum(menu_entries(e.MenuDefinition[1]) for e in menus if e.MenuDefinition)
+    report(kind, f"{name}, button menu entries", entries)
+    widgets = list(tk_widgets(win.TKroot))
+    report(kind, f"{name}, tk widgets", len(widgets))
+    report(kind, f"{name}, tk bindings", sum(len(w.bind()) for w in widgets))
+
+
+def bench_window(args, kind):
+    from nvda_voicemeeter import window
+
+    window.Nvda = fakevm.FakeNvda
+    vm = fakevm.api(kind)
+    win, snapshot = traced(lambda: nvda_voicemeeter.draw(kind, vm))
+    report_allocations(kind, "window", snapshot, args.top)
+    count_window(kind, "window", win)
+
+    popups = win.popup
+    targets = [("advanced settings", lambda: popups._make_advanced_settings("Advanced Settings"))]
+    if kind != "basic":
+        targets += [
+            (("compressor", 0), lambda: popups._make_compressor(0, "Advanced Compressor")),
+            (("gate", 0), lambda: popups._make_gate(0, "Advanced Gate")),
+        ]
+    for key, build in targets:
+        name = key if isinstance(key, str) else key[0]
+        popup, snapshot = traced(lambda: popups.show(key, build, None))
+        report_allocations(kind, f"{name} popup", snapshot, args.top)
+        count_window(kind, f"{name} popup", popup)
+        popups.active = None
+        popup.hide()
+    popups.close()
+    win.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kinds", nargs="+", default=["basic", "banana", "potato"], choices=fakevm.KINDS)
+    parser.add_argument("--top", type=int, default=8, help="subsystems listed per measurement")
+    args = parser.parse_args()
+
+    gui = has_display()
+    for kind in args.kinds:
+        bench_controller(args, kind)
+        if gui:
+            bench_window(args, kind)
+    if not gui:
+        print("no display, window and popup footprints skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Times showing the compressor, gate and advanced settings popups, cold (first build) against warm (reshown)
+
+Requires a running Voicemeeter of the given kind.
+
+    pdm run bench-popups [--kind potato] [--runs N]
+"""
+
+import argparse
+import functools
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import voicemeeterlib  # noqa: E402
+
+import nvda_voicemeeter  # noqa: E402
+
+
+def timed(popups, key, build, refresh) -> float:
+    start = time.perf_counter()
+    popup = popups.show(key, build, refresh)
+    popup.refresh()
+    elapsed = (time.perf_counter() - start) * 1000
+    popup.hide()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kind", default="potato", choices=("basic", "banana", "potato"))
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with voicemeeterlib.api(args.kind) as vm:
+        with nvda_voicemeeter.draw(args.kind, vm) as window:
+            popups = window.popup
+            targets = [
+                (
+                    "advanced settings",
+                    functools.partial(popups._make_advanced_settings, "Advanced Settings"),
+                    popups.refresh_advanced_settings,
+                ),
+            ]
+            if args.kind != "basic":
+                targets += [
+                    (
+                        ("compressor", 0),
+                        functools.partial(popups._make_compressor, 0, "Advanced Compressor"),
+                        functools.partial(popups.refresh_strip, "COMPRESSOR", 0),
+                    ),
+                    (
+                        ("gate", 0),
+                        functools.partial(popups._make_gate, 0, "Advanced Gate"),
+                        functools.partial(popups.refresh_strip, "GATE", 0),
+                    ),
+                ]
+            for key, build, refresh in targets:
+                cold = timed(popups, key, build, refresh)
+                warm = [timed(popups, key, build, refresh) for _ in range(args.runs)]
+                print(f"{str(key):<20} cold {cold:8.2f}ms  warm median {statistics.median(warm):8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Replays a recorded session through the controller against the fake remote and speech, for regression timings
+
+Record a session by setting "record_session": true in settings.json, each run of the app writes a
+session-<date>.jsonl.gz next to it. --speed 1 keeps the original timing (with the engine thread refreshing
+alongside), --speed 0 replays as fast as possible.
+
+    pdm run bench-replay SESSION [--speed X] [--kind KIND] [--latency US]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import fakevm  # noqa: E402
+
+from nvda_voicemeeter.controller import Controller  # noqa: E402
+from nvda_voicemeeter.latency import Histogram, family  # noqa: E402
+from nvda_voicemeeter.session import Replayer, read_session  # noqa: E402
+
+
+def replay(records, controller, speed) -> dict:
+    """Returns the dispatch time histograms by event family"""
+    frames = fakevm.FakeLoop()
+    replayer = Replayer(controller, frames.after)
+    histograms = {}
+    start = time.perf_counter()
+    for elapsed, loop, event, values, focus in records:
+        # the step frames due before the event run first, as they would on the tk loop
+        frames.run_to(start + elapsed / speed if speed else time.perf_counter())
+        before = time.perf_counter()
+        if replayer.dispatch(loop, event, values, focus):
+            histograms.setdefault(family(loop, event), Histogram()).record(time.perf_counter() - before)
+    frames.run_until(lambda: not frames.timers)
+    controller.writer.flush()
+    histograms["stats"] = replayer.stats
+    return histograms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("session", type=Path)
+    parser.add_argument("--speed", type=float, default=1.0, help="1 for the recorded timing, 0 for no waits")
+    parser.add_argument("--kind", choices=fakevm.KINDS, help="defaults to the kind recorded")
+    parser.add_argument("--latency", type=float, default=0.0, help="per engine call, in microseconds")
+    args = parser.parse_args()
+
+    header, records = read_session(args.session)
+    vm = fakevm.api(args.kind or header["kind"], latency=args.latency / 1e6)
+    nvda = fakevm.FakeNvda()
+    controller = Controller(vm, speak=nvda.speak)
+    controller.start()
+    try:
+        start = time.perf_counter()
+        histograms = replay(records, controller, args.speed)
+        wall = time.perf_counter() - start
+    finally:
+        controller.stop()
+
+    stats = histograms.pop("stats")
+    print(f"{len(records)} events from {header['started']}, {stats['replayed']} replayed, {stats['skipped']} skipped")
+    print(f"{wall:.3f}s wall, {stats['replayed'] / wall:.0f} events/s, {sum(vm.calls.values())} engine calls")
+    print(f"{len(nvda.spoken)} announcements")
+    print(f"{'event':<56} {'count':>6} {'p50 us':>8} {'p99 us':>8} {'max us':>8}")
+    for name, h in sorted(histograms.items(), key=lambda item: -item[1].total):
+        print(f"{name:<56} {h.count:6} {h.percentile(50):8} {h.percentile(99):8} {h.max:8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measures command server throughput in commands per second
+
+Connects to a running app with "command_server_port" set in settings.json and sends batches of slider and switch
+commands, first one request at a time (round trip latency) then pipelined.
+
+    pdm run bench-server [--port 54321] [--batches N] [--size N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+
+def make_batch(i, size) -> bytes:
+    commands = [f"STRIP 0||SLIDER GAIN={-((i + j) % 60)}" if j % 2 == 0 else "STRIP 0||MUTE" for j in range(size)]
+    return f"{';'.join(commands)}\n".encode()
+
+
+async def round_trip(reader, writer, batches, size) -> list:
+    latencies = []
+    for i in range(batches):
+        start = time.perf_counter()
+        writer.write(make_batch(i, size))
+        reply = await reader.readline()
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert reply.startswith(b"OK"), reply
+    return latencies
+
+
+async def pipelined(reader, writer, batches, size) -> float:
+    start = time.perf_counter()
+    writer.writelines(make_batch(i, size) for i in range(batches))
+    for _ in range(batches):
+        assert (await reader.readline()).startswith(b"OK")
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--batches", type=int, default=500)
+    parser.add_argument("--size", type=int, default=4)
+    args = parser.parse_args()
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", args.port)
+    latencies = await round_trip(reader, writer, args.batches, args.size)
+    print(
+        f"round trip  median {statistics.median(latencies):6.2f}ms  "
+        f"{args.batches * args.size / (sum(latencies) / 1000):8.0f} commands/s"
+    )
+    elapsed = await pipelined(reader, writer, args.batches, args.size)
+    print(f"pipelined   {args.batches * args.size / elapsed:8.0f} commands/s")
+    writer.close()
+    await writer.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
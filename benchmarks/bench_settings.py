@@ -0,0 +1,63 @@
+"""
+Compares a burst of settings changes written synchronously per change against the debounced SettingsStore
+
+Reports the time spent on the calling thread and the number of times settings.json was written.
+
+    pdm run bench-settings [--changes N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from nvda_voicemeeter.configuration import SettingsStore  # noqa: E402
+
+
+def sync_rewrite(path, changes):
+    """The previous path, the whole file is rewritten in place for every change"""
+    config = {}
+    for i in range(changes):
+        config["default_theme"] = f"theme {i}"
+        with open(path, "w") as f:
+            json.dump(config, f)
+    return changes
+
+
+def debounced(changes):
+    store = SettingsStore()
+    for i in range(changes):
+        store.set("default_theme", f"theme {i}")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--changes", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+
+        start = time.perf_counter()
+        writes = sync_rewrite(Path(tmp) / "settings.json", args.changes)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"sync rewrite   caller {elapsed:8.2f}ms  writes {writes}")
+
+        start = time.perf_counter()
+        store = debounced(args.changes)
+        elapsed = (time.perf_counter() - start) * 1000
+        time.sleep(store.delay * 2)
+        print(f"debounced      caller {elapsed:8.2f}ms  writes {store.stats['writes']}")
+        assert store.stats["writes"] == 1, store.stats
+        assert json.loads(store.path.read_text())["default_theme"] == f"theme {args.changes - 1}"
+        os.chdir(Path(__file__).parent)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+"""
+In-memory stand-in for the voicemeeterlib remote, for benchmarks on any platform
+
+Covers the parts of the remote the app uses: kind, strip, bus, device, patch, option, event, observer,
+init_thread/end_thread, set/get, sendtext, get_level and command. Parameters are held in a dict keyed by their
+script names ("Strip[0].Mute", "Bus[1].mode", "patch.insert[3]"), every engine call is counted and can be
+given a latency.
+
+    with fakevm.api("potato", latency=50e-6) as vm:
+        ...
+        vm.calls  # Counter of get, set, sendtext...
+"""
+
+import collections
+import heapq
+import itertools
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class FakeKind:
+    name: str
+    ins: tuple
+    outs: tuple
+    asio: tuple
+    insert: int
+    composite: int
+
+    @property
+    def phys_in(self) -> int:
+        return self.ins[0]
+
+    @property
+    def virt_in(self) -> int:
+        return self.ins[-1]
+
+    @property
+    def phys_out(self) -> int:
+        return self.outs[0]
+
+    @property
+    def virt_out(self) -> int:
+        return self.outs[-1]
+
+    @property
+    def num_strip(self) -> int:
+        return sum(self.ins)
+
+    @property
+    def num_bus(self) -> int:
+        return sum(self.outs)
+
+    @property
+    def num_strip_levels(self) -> int:
+        return 2 * self.phys_in + 8 * self.virt_in
+
+    @property
+    def num_bus_levels(self) -> int:
+        return 8 * (self.phys_out + self.virt_out)
+
+    def __str__(self) -> str:
+        return self.name.capitalize()
+
+
+KINDS = {
+    "basic": FakeKind("basic", (2, 1), (1, 1), (0, 0), 0, 0),
+    "banana": FakeKind("banana", (3, 2), (3, 2), (6, 8), 22, 8),
+    "potato": FakeKind("potato", (5, 3), (5, 3), (10, 8), 34, 8),
+}
+
+BUS_MODES = [
+    "amix",
+    "bmix",
+    "repeat",
+    "composite",
+    "tvmix",
+    "upmix21",
+    "upmix41",
+    "upmix61",
+    "centeronly",
+    "lfeonly",
+    "rearonly",
+]
+
+DEVICES = [
+    {"name": "Microphone (USB Audio)", "type": "wdm", "id": "{0.0.1.00000000}.{mic}"},
+    {"name": "Line In (Realtek Audio)", "type": "mme", "id": "{0.0.1.00000000}.{line}"},
+    {"name": "Speakers (Realtek Audio)", "type": "ks", "id": "{0.0.0.00000000}.{spk}"},
+    {"name": "Headphones (USB Audio)", "type": "wdm", "id": "{0.0.0.00000000}.{hp}"},
+]
+
+
+class Node:
+    """
+    A group of parameters under one script identifier, Strip[0], Strip[0].Comp, Bus[1].EQ
+
+    fields maps an attribute to (parameter suffix, type, default), an empty suffix is the identifier itself.
+    """
+
+    fields = {}
+    children = {}
+
+    def __init__(self, remote, identifier, fields=None):
+        object.__setattr__(self, "_remote", remote)
+        object.__setattr__(self, "identifier", identifier)
+        object.__setattr__(self, "_fields", self.fields | (fields or {}))
+        for name, (suffix, _, default) in self._fields.items():
+            remote.params.setdefault(self._param(suffix), default)
+        for name, (cls, suffix) in self.children.items():
+            object.__setattr__(self, name, cls(remote, self._param(suffix)))
+
+    def _param(self, suffix) -> str:
+        return f"{self.identifier}.{suffix}" if suffix else self.identifier
+
+    def __getattr__(self, name):
+        if (field := self._fields.get(name)) is None:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name}")
+        suffix, type_, _ = field
+        return type_(self._remote.get(self._param(suffix), is_string=type_ is str))
+
+    def __setattr__(self, name, val):
+        if (field := self._fields.get(name)) is None:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name}")
+        self._remote.set(self._param(field[0]), val)
+
+
+class Knob(Node):
+    fields = {"knob": ("", float, 0.0)}
+
+
+class Comp(Node):
+    fields = Knob.fields | {
+        "gainin": ("GainIn", float, 0.0),
+        "ratio": ("Ratio", float, 1.0),
+        "threshold": ("Threshold", float, -20.0),
+        "attack": ("Attack", float, 10.0),
+        "release": ("Release", float, 50.0),
+        "knee": ("Knee", float, 0.5),
+        "gainout": ("GainOut", float, 0.0),
+        "makeup": ("makeup", bool, False),
+    }
+
+
+class Gate(Node):
+    fields = Knob.fields | {
+        "threshold": ("Threshold", float, -60.0),
+        "damping": ("Damping", float, -60.0),
+        "bpsidechain": ("BPSidechain", int, 100),
+        "attack": ("Attack", float, 0.0),
+        "hold": ("Hold", float, 500.0),
+        "release": ("Release", float, 1000.0),
+    }
+
+
+class Device(Node):
+    """Setting a driver attribute (wdm, mme, ks, asio) selects a device by name, an empty name removes it"""
+
+    fields = {"name": ("name", str, "")}
+
+    def __setattr__(self, name, val):
+        if name in ("wdm", "mme", "ks", "asio"):
+            self._remote.set(self._param(name), val)
+            self._remote.params[self._param("name")] = val
+            return
+        super().__setattr__(name, val)
+
+
+class Eq(Node):
+    fields = {"on": ("on", bool, False)}
+
+
+class Mode(Node):
+    """The bus mode, stored once under Bus[i].mode, read back the way voicemeeterlib does, one call per mode"""
+
+    def __init__(self, remote, identifier):
+        super().__init__(remote, identifier)
+        remote.params[identifier] = "normal"
+
+    def __getattr__(self, name):
+        if name not in BUS_MODES:
+            raise AttributeError(f"Mode has no attribute {name}")
+        return self._remote.get(self._param(name)) == 1
+
+    def __setattr__(self, name, val):
+        if name not in BUS_MODES:
+            raise AttributeError(f"Mode has no attribute {name}")
+        self._remote.set(self._param(name), val)
+
+    def get(self) -> str:
+        time.sleep(self._remote.mode_get_delay)
+        for mode in BUS_MODES:
+            if getattr(self, mode):
+                return mode
+        return "normal"
+
+
+class Strip(Node):
+    fields = {
+        "mono": ("Mono", bool, False),
+        "solo": ("Solo", bool, False),
+        "mute": ("Mute", bool, False),
+        "mc": ("MC", bool, False),
+        "k": ("Karaoke", int, 0),
+        "label": ("Label", str, ""),
+        "gain": ("Gain", float, 0.0),
+        "limit": ("Limit", int, 12),
+        "audibility": ("Audibility", float, 0.0),
+        "bass": ("EQGain1", float, 0.0),
+        "mid": ("EQGain2", float, 0.0),
+        "treble": ("EQGain3", float, 0.0),
+    }
+    children = {
+        "comp": (Comp, "Comp"),
+        "gate": (Gate, "Gate"),
+        "denoiser": (Knob, "Denoiser"),
+        "device": (Device, "device"),
+    }
+
+
+class Bus(Node):
+    fields = {
+        "mono": ("Mono", bool, False),
+        "mute": ("Mute", bool, False),
+        "label": ("Label", str, ""),
+        "gain": ("Gain", float, 0.0),
+    }
+    children = {"eq": (Eq, "EQ"), "mode": (Mode, "mode"), "device": (Device, "device")}
+
+
+class PatchValue(Node):
+    fields = {"on": ("", bool, False)}
+
+    def get(self) -> int:
+        return int(self._remote.get(self.identifier))
+
+    def set(self, val):
+        self._remote.set(self.identifier, val)
+
+
+class Patch:
+    def __init__(self, remote):
+        kind = remote.kind
+        self.asio = [PatchValue(remote, f"patch.asio[{i}]") for i in range(kind.phys_out * 2)]
+        for i in range(2, kind.phys_out + 1):
+            setattr(self, f"A{i}", [PatchValue(remote, f"patch.OutA{i}[{j}]") for j in range(kind.num_bus)])
+        self.composite = [PatchValue(remote, f"patch.composite[{i}]") for i in range(kind.composite)]
+        self.insert = [PatchValue(remote, f"patch.insert[{i}]") for i in range(kind.num_strip_levels)]
+
+
+class FakeDevices:
+    def __init__(self, remote, devices):
+        self._remote = remote
+        self.devices = devices
+
+    @property
+    def ins(self) -> int:
+        self._remote.call("get_num_devices")
+        return len(self.devices)
+
+    @property
+    def outs(self) -> int:
+        self._remote.call("get_num_devices")
+        return len(self.devices)
+
+    def input(self, index) -> dict:
+        self._remote.call("get_device_desc")
+        return dict(self.devices[index])
+
+    def output(self, index) -> dict:
+        self._remote.call("get_device_desc")
+        return dict(self.devices[index])
+
+
+class FakeCommand:
+    def __init__(self, remote):
+        self._remote = remote
+
+    def restart(self):
+        self._remote.set("command.restart", 1)
+
+
+class FakeEvent:
+    def __init__(self):
+        self.pdirty = False
+        self.ldirty = False
+
+
+class FakeSubject:
+    """Observers are objects with on_update(event) or functions named on_<event>, as in voicemeeterlib"""
+
+    def __init__(self):
+        self.observers = []
+
+    def notify(self, event):
+        for o in list(self.observers):
+            if hasattr(o, "on_update"):
+                o.on_update(event)
+            elif o.__name__ == f"on_{event}":
+                o()
+
+    def add(self, observer):
+        if observer not in self.observers:
+            self.observers.append(observer)
+
+    def remove(self, observer):
+        if observer in self.observers:
+            self.observers.remove(observer)
+
+
+class FakeRemote:
+    """
+    The fake remote, every get, set, sendtext and level read counts as one engine call
+
+    latency is added to every call, spun rather than slept below a millisecond so that microsecond latencies hold.
+    Any write marks the parameters dirty, the updates thread then notifies pdirty observers within ratelimit
+    seconds while event.pdirty is set, like the engine does for changes from any source.
+    """
+
+    def __init__(self, kind_id, latency=0.0, ratelimit=0.033, mode_get_delay=0.01, devices=DEVICES):
+        self.kind = KINDS[kind_id]
+        self.latency = latency
+        self.ratelimit = ratelimit
+        self.mode_get_delay = mode_get_delay
+        self.calls = collections.Counter()
+        self.params = {}
+        self.loaded = None
+        self.strip_mode = 0
+        self.event = FakeEvent()
+        self.observer = FakeSubject()
+        self.cache = {
+            "strip_level": [0.0] * self.kind.num_strip_levels,
+            "bus_level": [0.0] * self.kind.num_bus_levels,
+        }
+        routing = [f"A{i}" for i in range(1, self.kind.phys_out + 1)] + [
+            f"B{i}" for i in range(1, self.kind.virt_out + 1)
+        ]
+        self.strip = tuple(
+            Strip(self, f"Strip[{i}]", {output: (output, bool, False) for output in routing})
+            for i in range(self.kind.num_strip)
+        )
+        self.bus = tuple(Bus(self, f"Bus[{i}]") for i in range(self.kind.num_bus))
+        self.device = FakeDevices(self, devices)
+        self.patch = Patch(self)
+        self.command = FakeCommand(self)
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end_thread()
+
+    def call(self, name):
+        self.calls[name] += 1
+        if self.latency >= 1e-3:
+            time.sleep(self.latency)
+        elif self.latency > 0:
+            deadline = time.perf_counter() + self.latency
+            while time.perf_counter() < deadline:
+                pass
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    def get(self, param, is_string=False):
+        self.call("get")
+        if (mode := re.fullmatch(r"(Bus\[\d+\]\.mode)\.(\w+)", param)) is not None:
+            return 1.0 if self.params[mode[1]] == mode[2] else 0.0
+        val = self.params.get(param, "" if is_string else 0.0)
+        if is_string:
+            return str(val)
+        return float(val)
+
+    def set(self, param, val):
+        self.call("set")
+        self._write(param, val)
+
+    def _write(self, param, val):
+        if (mode := re.fullmatch(r"(Bus\[\d+\]\.mode)\.(\w+)", param)) is not None:
+            if val:
+                self.params[mode[1]] = mode[2]
+        elif param == "command.load":
+            self.loaded = val
+        else:
+            self.params[param] = val if isinstance(val, str) else float(val)
+        self._dirty.set()
+
+    def sendtext(self, script):
+        """Applies a script of name=value statements separated by ; or newlines in one call"""
+        self.call("sendtext")
+        for statement in re.split(r"[;\n]", script):
+            if not (statement := statement.strip()):
+                continue
+            param, _, raw = statement.partition("=")
+            raw = raw.strip()
+            self._write(param.strip(), raw.strip('"') if raw.startswith('"') else float(raw))
+
+    def get_level(self, mode, index) -> float:
+        self.call("get_level")
+        return 0.0
+
+    def poke(self, param, val):
+        """Changes a parameter as if from outside the app (the Voicemeeter gui, a midi controller)"""
+        self._write(param, val)
+
+    def pdirty(self) -> bool:
+        """Returns and clears the dirty flag, as the engine's IsParametersDirty does"""
+        self.call("pdirty")
+        dirty = self._dirty.is_set()
+        self._dirty.clear()
+        return dirty
+
+    def init_thread(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._updates, name="FakeUpdates", daemon=True)
+        self._thread.start()
+
+    def end_thread(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _updates(self):
+        while not self._stop.wait(self.ratelimit):
+            if self.event.pdirty and self.pdirty():
+                self.observer.notify("pdirty")
+            if self.event.ldirty:
+                self.observer.notify("ldirty")
+
+
+class FakeNvda:
+    """Speech backend that keeps what would have been spoken"""
+
+    def __init__(self):
+        self.spoken = []
+
+    @property
+    def is_running(self):
+        return True
+
+    def speak(self, text):
+        self.spoken.append(text)
+
+    def cancel_speech(self):
+        pass
+
+    def braille_message(self, text):
+        pass
+
+
+class FakeLoop:
+    """The after/after_idle calls the window makes on its tk root, run in real time from a heap of timers"""
+
+    def __init__(self):
+        self.timers = []
+        self.order = itertools.count()
+
+    def after(self, ms, fn, *args):
+        heapq.heappush(self.timers, (time.perf_counter() + ms / 1000, next(self.order), fn, args))
+        return next(self.order)
+
+    def after_idle(self, fn, *args):
+        return self.after(0, fn, *args)
+
+    def run_until(self, done):
+        while not done():
+            due, _, fn, args = heapq.heappop(self.timers)
+            time.sleep(max(0, due - time.perf_counter()))
+            fn(*args)
+
+    def run_to(self, deadline):
+        """Runs the timers due by deadline, a perf_counter time, returning once it has passed"""
+        while self.timers and self.timers[0][0] <= deadline:
+            due, _, fn, args = heapq.heappop(self.timers)
+            time.sleep(max(0, due - time.perf_counter()))
+            fn(*args)
+        time.sleep(max(0, deadline - time.perf_counter()))
+
+
+def api(kind_id, **kwargs) -> FakeRemote:
+    return FakeRemote(kind_id, **kwargs)
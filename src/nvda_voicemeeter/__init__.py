@@ -1,14 +1,20 @@
 import subprocess as sp
 import time
 
-from .cdll import NVDA_PATH
-from .window import request_window_object as draw
+from .cdll import get_nvda_exe
+from .controller import request_controller_object as headless
+
+
+def draw(kind_id, vm):
+    from .window import request_window_object  # PySimpleGUI and tk are only loaded for the gui
+
+    return request_window_object(kind_id, vm)
 
 
 def launch(delay=1):
-    if NVDA_PATH:
-        sp.Popen([NVDA_PATH], shell=True)
+    if nvda_exe := get_nvda_exe():
+        sp.Popen([nvda_exe], shell=True)
         time.sleep(delay)
 
 
-__ALL__ = ["launch", "draw"]
+__ALL__ = ["launch", "draw", "headless"]
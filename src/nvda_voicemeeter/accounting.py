@@ -0,0 +1,95 @@
+import collections
+import json
+import logging
+import sys
+import threading
+
+from .latency import family
+
+logger = logging.getLogger(__name__)
+
+PACKAGE = __name__.rpartition(".")[0]
+
+# wrappers that sit between the package and the engine, never a call site themselves
+SKIP = (__name__, f"{PACKAGE}.latency")
+
+
+class CallAccounting:
+    """
+    Counts engine calls by the code that made them
+
+    Every strip, bus, device and patch attribute and every get, set and sendtext ends in one vm.call, so wrapping
+    that one method sees all the DLL traffic. Each call is charged to the innermost function of this package on
+    the stack, and to the scope it happened in: the event being handled by a loop, a name set with begin(), or the
+    thread name for the engine's own threads. Only installed when call_accounting is set in settings.json.
+    """
+
+    def __init__(self, vm):
+        self.logger = logger.getChild(type(self).__name__)
+        self.kind = vm.kind.name
+        self.counts = collections.Counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        call = vm.call
+
+        def counted(func, *args, **kwargs):
+            self.count(getattr(func, "__name__", func))
+            return call(func, *args, **kwargs)
+
+        vm.call = counted
+
+    def begin(self, scope):
+        """Charges the calls that follow on this thread to scope"""
+        self._local.scope = scope
+
+    def event(self, loop, event):
+        self._local.scope = family(loop, event)
+
+    def site(self) -> str:
+        frame = sys._getframe(2)
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "")
+            if module.startswith(PACKAGE) and module not in SKIP:
+                qualname = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+                return f"{module.removeprefix(PACKAGE + '.')}.{qualname.split('.<locals>')[0]}"
+            frame = frame.f_back
+        return "voicemeeterlib"
+
+    def count(self, func):
+        scope = getattr(self._local, "scope", None) or threading.current_thread().name
+        key = (scope, self.site(), func)
+        with self._lock:
+            self.counts[key] += 1
+
+    def by(self, *fields) -> collections.Counter:
+        """Totals the counts over the given fields of (scope, site, func)"""
+        index = {"scope": 0, "site": 1, "func": 2}
+        totals = collections.Counter()
+        for key, n in self.counts.items():
+            totals[tuple(key[index[f]] for f in fields)] += n
+        return totals
+
+    def report(self, top=15) -> str:
+        lines = [f"engine calls for {self.kind}, {sum(self.counts.values())} in total"]
+        for title, fields in (
+            ("call sites", ("site",)),
+            ("scopes", ("scope",)),
+            ("scope and site", ("scope", "site")),
+        ):
+            lines.append(f"heaviest {title}:")
+            lines += [f"{n:8} {' | '.join(key)}" for key, n in self.by(*fields).most_common(top)]
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "total": sum(self.counts.values()),
+            "calls": [
+                {"scope": scope, "site": site, "func": func, "count": n}
+                for (scope, site, func), n in self.counts.most_common()
+            ],
+        }
+
+    def dump(self, path):
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        self.logger.info(self.report())
@@ -1,6 +1,8 @@
+import re
+
 import PySimpleGUI as psg
 
-from . import util
+from . import configuration, util
 from .compound import LabelSlider
 
 
@@ -92,9 +94,18 @@ class Builder:
         return [[menu], [tab_group]]
 
     def make_menu(self) -> psg.Menu:
+        return psg.Menu(self.make_menu_def(), key="menus")
+
+    def make_menu_def(self) -> list:
         themes = [f"{theme}::MENU THEME" for theme in util.get_themes_list()]
         themes.append("Default::MENU THEME")
-        menu_def = [
+        scenes = [f"{name}::MENU SCENE" for name in configuration.get("scenes", {})]
+        # menu events are parsed as words, keep the letters and digits of a file name and look it up by position
+        configs = [
+            f"{' '.join(re.findall(r'[A-Za-z0-9]+', path.stem)) or 'config'}::MENU CONFIG {i}"
+            for i, path in enumerate(self.window.configs)
+        ]
+        return [
             [
                 "&Voicemeeter",
                 [
@@ -102,11 +113,12 @@ class Builder:
                     "Save Settings::MENU",
                     "Load Settings::MENU",
                     "Load Settings on Startup ::MENU",
+                    ["Load Config", configs or ["!No configs found"]],
                 ],
             ],
             ["&Theme", themes],
+            ["&Scenes", ["Save Scene::MENU", "Delete Scene::MENU", "---", *scenes]],
         ]
-        return psg.Menu(menu_def, key="menus")
 
     def make_tab0_row0(self) -> psg.Frame:
         """tab0 row0 represents hardware ins"""
@@ -279,9 +291,9 @@ class Builder:
                 [
                     psg.Text("Gain"),
                     psg.Slider(
-                        range=(-60, 12),
-                        default_value=self.vm.strip[i].gain,
-                        resolution=0.1,
+                        range=self.window.specs["STRIP"]["GAIN"].range,
+                        default_value=self.window.cache["sliders"][f"STRIP {i}||SLIDER GAIN"],
+                        resolution=self.window.specs["STRIP"]["GAIN"].resolution,
                         disable_number_display=True,
                         expand_x=True,
                         enable_events=True,
@@ -300,9 +312,9 @@ class Builder:
                 [
                     psg.Text("Limit"),
                     psg.Slider(
-                        range=(-40, 12),
-                        default_value=self.vm.strip[i].limit,
-                        resolution=1,
+                        range=self.window.specs["STRIP"]["LIMIT"].range,
+                        default_value=self.window.cache["sliders"][f"STRIP {i}||SLIDER LIMIT"],
+                        resolution=self.window.specs["STRIP"]["LIMIT"].resolution,
                         disable_number_display=True,
                         expand_x=True,
                         enable_events=True,
@@ -376,9 +388,9 @@ class Builder:
                 [
                     psg.Text("Gain"),
                     psg.Slider(
-                        range=(-60, 12),
-                        default_value=self.vm.strip[i].gain,
-                        resolution=0.1,
+                        range=self.window.specs["STRIP"]["GAIN"].range,
+                        default_value=self.window.cache["sliders"][f"STRIP {i}||SLIDER GAIN"],
+                        resolution=self.window.specs["STRIP"]["GAIN"].resolution,
                         disable_number_display=True,
                         expand_x=True,
                         enable_events=True,
@@ -392,23 +404,18 @@ class Builder:
         def add_param_sliders(layout):
             if self.kind.name in ("basic", "banana"):
                 for param in util.get_slider_params(i, self.kind):
-                    layout.append([LabelSlider(self.window, i, param, range_=(-12, 12))])
+                    layout.append([LabelSlider(self.window, i, param)])
             else:
-                layout.append(
-                    [
-                        LabelSlider(self.window, i, param, range_=(-12, 12))
-                        for param in util.get_slider_params(i, self.kind)
-                    ]
-                )
+                layout.append([LabelSlider(self.window, i, param) for param in util.get_slider_params(i, self.kind)])
 
         def add_limit_slider(layout):
             layout.append(
                 [
                     psg.Text("Limit"),
                     psg.Slider(
-                        range=(-40, 12),
-                        default_value=self.vm.strip[i].limit,
-                        resolution=1,
+                        range=self.window.specs["STRIP"]["LIMIT"].range,
+                        default_value=self.window.cache["sliders"][f"STRIP {i}||SLIDER LIMIT"],
+                        resolution=self.window.specs["STRIP"]["LIMIT"].resolution,
                         disable_number_display=True,
                         expand_x=True,
                         enable_events=True,
@@ -480,9 +487,9 @@ class Builder:
                 [
                     psg.Text("Gain"),
                     psg.Slider(
-                        range=(-60, 12),
-                        default_value=self.vm.bus[i].gain,
-                        resolution=0.1,
+                        range=self.window.specs["BUS"]["GAIN"].range,
+                        default_value=self.window.cache["sliders"][f"BUS {i}||SLIDER GAIN"],
+                        resolution=self.window.specs["BUS"]["GAIN"].resolution,
                         disable_number_display=True,
                         expand_x=True,
                         enable_events=True,
@@ -1,15 +1,12 @@
 import ctypes as ct
+import functools
 import platform
-import winreg
 from pathlib import Path
 
 from .errors import NVDAVMError
 
 BITS = 64 if ct.sizeof(ct.c_void_p) == 8 else 32
 
-if platform.system() != "Windows":
-    raise NVDAVMError("Only Windows OS supported")
-
 REG_KEY = "\\".join(
     filter(
         None,
@@ -27,14 +24,17 @@ REG_KEY = "\\".join(
 
 
 def get_nvdapath():
+    import winreg
+
     with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"{}".format(REG_KEY)) as nvda_key:
         return winreg.QueryValueEx(nvda_key, r"UninstallDirectory")[0]
 
 
-try:
-    NVDA_PATH = Path(get_nvdapath()) / "nvda.exe"
-except FileNotFoundError:
-    NVDA_PATH = ""
+def get_nvda_exe():
+    try:
+        return Path(get_nvdapath()) / "nvda.exe"
+    except FileNotFoundError:
+        return ""
 
 
 controller_path = Path(__file__).parents[2].resolve() / "controllerClient"
@@ -43,4 +43,10 @@ if not controller_path.exists():
 
 DLL_PATH = controller_path / f"x{64 if BITS == 64 else 86}" / f"nvdaControllerClient{BITS}.dll"
 
-libc = ct.CDLL(str(DLL_PATH))
+
+@functools.cache
+def load_libc():
+    """Loads the controller client dll on first use rather than at import"""
+    if platform.system() != "Windows":
+        raise NVDAVMError("Only Windows OS supported")
+    return ct.CDLL(str(DLL_PATH))
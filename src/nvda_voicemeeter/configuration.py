@@ -1,34 +1,138 @@
 import json
+import logging
+import os
+import tempfile
+import threading
+import time
 from pathlib import Path
 
-SETTINGS = Path.cwd() / "settings.json"
+logger = logging.getLogger(__name__)
 
 
-def config_from_json():
-    data = {}
-    if not SETTINGS.exists():
-        return data
-    with open(SETTINGS, "r") as f:
-        data = json.load(f)
-    return data
+class SettingsStore:
+    """
+    Settings persisted to a json file
 
+    The file is read on first access. Changes are batched and written from a timer thread once no further change
+    has arrived for delay seconds, through a temp file renamed over the original so it is never left half written.
+    Changes stay pending until a write succeeds, a failed write is retried after retry_delay seconds.
+    """
 
-config = config_from_json()
+    def __init__(self, filename="settings.json", delay=0.5, retry_delay=5.0):
+        self.filename = filename
+        self.delay = delay
+        self.retry_delay = retry_delay
+        self.logger = logger.getChild(type(self).__name__)
+        self._path = None
+        self._data = None
+        self._dirty = False
+        self._timer = None
+        self._last_change = 0.0
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self.stats = {"changes": 0, "writes": 0}
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            self._path = Path.cwd() / self.filename
+        return self._path
+
+    @property
+    def data(self) -> dict:
+        with self._lock:
+            if self._data is None:
+                self._data = self._read()
+            return self._data
+
+    def _read(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError as e:
+            self.logger.error(f"{self.path} could not be parsed, starting with empty settings: {e}")
+            return {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            self.data[key] = value
+            self._changed()
+
+    def delete(self, key):
+        with self._lock:
+            if key in self.data:
+                del self.data[key]
+                self._changed()
+
+    def _changed(self):
+        self._dirty = True
+        self._last_change = time.monotonic()
+        self.stats["changes"] += 1
+        if self._timer is None:
+            self._arm(self.delay)
+
+    def _arm(self, delay):
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            remaining = self._last_change + self.delay - time.monotonic()
+            if remaining > 0:
+                self._arm(remaining)
+                return
+        self.flush()
+
+    def flush(self):
+        """Writes pending changes now, safe to call from any thread"""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                snapshot = json.dumps(self._data)
+                changes = self.stats["changes"]
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.filename}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(snapshot)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except OSError as e:
+                self.logger.error(f"{type(e).__name__}: failed writing {self.path}: {e}")
+                Path(tmp).unlink(missing_ok=True)
+                with self._lock:
+                    if self._timer is None:  # still dirty, try again later
+                        self._arm(self.retry_delay)
+                return
+            with self._lock:
+                self._dirty = self.stats["changes"] != changes  # a change may have arrived during the write
+                self.stats["writes"] += 1
+
+
+store = SettingsStore()
 
 
 def get(key, default=None):
-    if key in config:
-        return config[key]
-    return default
+    return store.get(key, default)
 
 
 def set(key, value):
-    config[key] = value
-    with open(SETTINGS, "w") as f:
-        json.dump(config, f)
+    store.set(key, value)
 
 
 def delete(key):
-    del config[key]
-    with open(SETTINGS, "w") as f:
-        json.dump(config, f)
+    store.delete(key)
+
+
+def flush():
+    store.flush()
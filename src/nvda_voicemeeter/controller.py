@@ -0,0 +1,467 @@
+import logging
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from . import configuration, models, params, scenes, util, xmlsettings
+from .undo import UndoHistory
+from .writer import ParamWriter
+
+logger = logging.getLogger(__name__)
+
+DYNAMICS = {"comp": models._make_comp_cache, "gate": models._make_gate_cache}
+
+KARAOKE_MODES = ["off", "k m", "k 1", "k 2", "k v"]
+
+VERIFY_DELAY = 0.5
+
+
+class Controller:
+    """
+    Parameter state and logic of the app, independent of any gui
+
+    Holds the cache of vm parameters, writes changes through the write-behind queue and records them for undo.
+    Anything a user should hear is passed to speak(text), events for the loop that owns the controller are handed
+    to post(key, value). Views registered with add_view are called with the cache entries changed on each refresh.
+    Without a window the controller runs its own event loop, see run().
+    """
+
+    def __init__(self, vm, speak=None, post=None, port=None):
+        self.vm = vm
+        self.kind = self.vm.kind
+        self.logger = logger.getChild(type(self).__name__)
+        self.speak = speak or self.logger.info
+        self.post = post or self.put_event
+        self.port = port
+        self.specs = params.get_param_specs(self.kind)
+        self.cache = {
+            "hw_ins": models._make_hardware_ins_cache(self.vm),
+            "hw_outs": models._make_hardware_outs_cache(self.vm),
+            "strip": models._make_param_cache(self.vm, "strip"),
+            "bus": models._make_param_cache(self.vm, "bus"),
+            "labels": models._make_label_cache(self.vm),
+            "asio": models._make_patch_asio_cache(self.vm),
+            "insert": models._make_patch_insert_cache(self.vm),
+            "sliders": models._make_slider_cache(self.vm),
+            "comp": {},
+            "gate": {},
+        }
+        self.writer = ParamWriter()
+        self.steps = {}
+        self.scene_stats = {"written": 0, "skipped": 0}
+        self.undo_history = UndoHistory()
+        self.server = None
+        self.views = []
+        self.events = queue.Queue()
+        self.watched = {"comp": set(), "gate": set()}
+        self.preview = {section: {} for section in self.cache}
+
+    def __enter__(self):
+        if (defaultconfig := self.load_default_config()) is not None:
+            self.speak(f"config {defaultconfig.stem} has been loaded")
+        self.start()
+        self.vm.event.pdirty = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def load_default_config(self) -> Path | None:
+        defaultconfig = Path(configuration.get("default_config", ""))  # coerce the type
+        if defaultconfig.is_file() and defaultconfig.exists():
+            self.load_config(defaultconfig)
+            return defaultconfig
+        return None
+
+    def load_config(self, path) -> dict:
+        """
+        Has the engine load a settings file, previewing a local read of it in the views straight away
+
+        The values read only go to the views, the cache is left to the engine: the file is read loosely and the engine
+        applies it in its own time, so a toggle or step until then works from the last engine state. A CONFIG||VERIFY
+        event is posted VERIFY_DELAY seconds later for verify_config() to replace the preview. Returns the entries
+        previewed.
+        """
+        self.vm.set("command.load", str(path))
+        self.logger.debug(f"config {path} loaded")
+        try:
+            parsed = xmlsettings.read(path, self.kind)
+        except (OSError, ET.ParseError) as e:
+            self.logger.warning(f"config {path} could not be read locally: {e}")
+            parsed = {}
+        preview = {section: {} for section in self.cache}
+        for section, values in parsed.items():
+            for key, val in values.items():
+                if key in self.cache[section] and self.cache[section][key] != val and not self.is_pending(key):
+                    preview[section][key] = self.preview[section][key] = val
+        for view in self.views:
+            view(preview)
+        timer = threading.Timer(VERIFY_DELAY, self.post, ("CONFIG||VERIFY", path.stem))
+        timer.daemon = True
+        timer.start()
+        return preview
+
+    def verify_config(self, name) -> dict:
+        """
+        Refreshes from the engine once after a settings file was loaded, replacing the preview of the local read
+
+        Previewed entries the engine holds differently are redrawn from the cache. Returns them with the engine values.
+        """
+        preview, self.preview = self.preview, {section: {} for section in self.cache}
+        changed = self.on_pdirty()
+        differences = {
+            section: {key: self.cache[section][key] for key, val in values.items() if self.cache[section][key] != val}
+            for section, values in preview.items()
+        }
+        redraw = {
+            section: {key: val for key, val in values.items() if key not in changed[section]}
+            for section, values in differences.items()
+        }
+        if any(redraw.values()):
+            for view in self.views:
+                view(redraw)
+        if differences := {key: val for values in differences.values() for key, val in values.items()}:
+            self.logger.warning(f"config {name}: engine differs from the local read for {sorted(differences)}")
+        else:
+            self.logger.debug(f"config {name}: engine matches the local read")
+        return differences
+
+    def start(self):
+        self.writer.start()
+        self.vm.init_thread()
+        self.vm.observer.add(self.on_pdirty)
+        if port := self.port or configuration.get("command_server_port"):
+            from .server import CommandServer  # asyncio is only loaded when the server is enabled
+
+            self.server = CommandServer(self, port)
+            try:
+                self.server.start()
+            except OSError:  # logged by the server, the app runs on without it
+                self.server = None
+
+    def stop(self):
+        if self.server is not None:
+            self.server.stop()
+        self.writer.stop()
+        self.logger.debug(f"scene stats: {self.scene_stats}")
+        configuration.flush()
+        self.vm.end_thread()
+
+    def put_event(self, key, value):
+        self.events.put((key, value))
+
+    def run(self, poll=0.5) -> int:
+        """
+        Serves events posted to the controller until interrupted, the headless counterpart of the window's loop
+
+        The queue is polled so Ctrl+C is noticed on every platform. Returns 1 straight away, an exit status, when the
+        command server is not listening.
+        """
+        if self.server is None:
+            self.logger.error(
+                "nothing to serve, the command server is not listening: set command_server_port in settings.json or "
+                "pass a free port"
+            )
+            return 1
+        self.logger.info(f"serving commands on {self.server.host}:{self.server.port}")
+        while True:
+            try:
+                key, value = self.events.get(timeout=poll)
+            except queue.Empty:
+                continue
+            match key:
+                case "SERVER||BATCH":
+                    self.run_batch(*value)
+                case "CONFIG||VERIFY":
+                    self.verify_config(value)
+                case _:
+                    self.logger.debug(f"unhandled event {key}")
+
+    def add_view(self, view):
+        """view(changed) is called with the cache entries that changed on every refresh, keyed by cache section"""
+        self.views.append(view)
+
+    def is_pending(self, key) -> bool:
+        return key in self.steps or key in self.writer
+
+    def watch(self, section, index):
+        """Reads the comp or gate params of a strip into the cache, on_pdirty refreshes them until unwatch()"""
+        self.cache[section] |= DYNAMICS[section](self.vm, index)
+        self.watched[section].add(index)
+
+    def unwatch(self, section, index):
+        """Stops refreshing the comp or gate params of a strip, dropping them from the cache"""
+        self.watched[section].discard(index)
+        prefix = f"STRIP {index}||"
+        self.cache[section] = {key: val for key, val in self.cache[section].items() if not key.startswith(prefix)}
+
+    def _read_watched(self, section) -> dict:
+        values = {}
+        for index in tuple(self.watched[section]):
+            values |= DYNAMICS[section](self.vm, index)
+        for key in values:
+            if self.is_pending(key) and key in self.cache[section]:  # keep the optimistic value
+                values[key] = self.cache[section][key]
+        return self.cache[section] | values
+
+    def on_pdirty(self) -> dict:
+        sliders = models._make_slider_cache(self.vm)
+        for key in sliders:
+            if self.is_pending(key) and key in self.cache["sliders"]:  # keep the optimistic value
+                sliders[key] = self.cache["sliders"][key]
+        fresh = {
+            "hw_ins": models._make_hardware_ins_cache(self.vm),
+            "hw_outs": models._make_hardware_outs_cache(self.vm),
+            "strip": models._make_param_cache(self.vm, "strip"),
+            "bus": models._make_param_cache(self.vm, "bus"),
+            "labels": models._make_label_cache(self.vm),
+            "asio": models._make_patch_asio_cache(self.vm),
+            "insert": models._make_patch_insert_cache(self.vm),
+            "sliders": sliders,
+            "comp": self._read_watched("comp"),
+            "gate": self._read_watched("gate"),
+        }
+        changed = {
+            section: {key: value for key, value in cache.items() if self.cache[section].get(key) != value}
+            for section, cache in fresh.items()
+        }
+        self.cache |= fresh
+        for view in self.views:
+            view(changed)
+        if self.server is not None:
+            self.server.publish(changed["strip"] | changed["bus"] | changed["sliders"])
+        return changed
+
+    def _slider(self, key) -> tuple:
+        """Returns the cache, ParamSpec and vm object behind a slider key"""
+        identifier, *section, param = key.split("||")
+        channel, index = identifier.split()
+        name = param.removeprefix("SLIDER ")
+        if section:
+            cache = {"COMPRESSOR": "comp", "GATE": "gate"}[section[0]]
+            return self.cache[cache], self.specs[section[0]][name], self.vm.strip[int(index)]
+        target = self.vm.strip if channel == "STRIP" else self.vm.bus
+        return self.cache["sliders"], self.specs[channel][name], target[int(index)]
+
+    def spec(self, key) -> params.ParamSpec:
+        return self._slider(key)[1]
+
+    def read_slider(self, key):
+        """
+        Reads a slider value from the local cache, a queued step takes precedence
+
+        The vm is only read for entries missing from the cache (invalidated or not yet refreshed).
+        """
+        if (val := self.steps.get(key)) is not None:
+            return val
+        cache, spec, target = self._slider(key)
+        if (val := cache.get(key)) is None:
+            val = cache[key] = spec.get(target)
+        return val
+
+    def write_slider(self, key, val, record=True):
+        cache, spec, target = self._slider(key)
+        if record:
+            self.undo_history.record(key, cache.get(key), val, merge=True)
+        cache[key] = val
+        self.writer.put(key, spec.setter(target), val)
+
+    def next_value(self, key, direction, modifier):
+        """Returns the value a step would move a slider to, None if the modifier has no step"""
+        return self.spec(key).step(self.read_slider(key), direction, modifier)
+
+    def step_slider(self, key, direction, modifier):
+        if (val := self.next_value(key, direction, modifier)) is None:
+            return None
+        self.write_slider(key, val)
+        self.speak(self.spec(key).format(val))
+        return val
+
+    def toggle(self, key):
+        """Flips a strip or bus switch (cycles karaoke), speaking the new state"""
+        identifier, param = key.split("||")
+        channel, index = identifier.split()
+        cache = self.cache[channel.lower()]
+        match channel, param:
+            case "STRIP", "KARAOKE":
+                val = (cache[key] + 1) % len(KARAOKE_MODES)
+                self.vm.strip[int(index)].k = val
+            case "STRIP", _:
+                val = not cache[key]
+                attr = param if param in util._get_bus_assignments(self.kind) else param.lower()
+                setattr(self.vm.strip[int(index)], attr, val)
+            case "BUS", "EQ":
+                val = not cache[key]
+                self.vm.bus[int(index)].eq.on = val
+            case _:
+                val = not cache[key]
+                setattr(self.vm.bus[int(index)], param.lower(), val)
+        self.undo_history.record(key, cache[key], val)
+        cache[key] = val
+        self.speak(self.describe_value(key, val))
+        return val
+
+    def set_bus_mode(self, index, mode):
+        key = f"BUS {index}||MODE"
+        setattr(self.vm.bus[index].mode, mode, True)
+        self.undo_history.record(key, self.cache["bus"][key], mode)
+        self.cache["bus"][key] = mode
+
+    def save_scene(self, name):
+        """Captures routing, switches, gains and knobs from the cache as a named scene"""
+        configuration.set("scenes", configuration.get("scenes", {}) | {name: scenes.capture(self.cache)})
+        self.speak(f"scene {name} saved")
+
+    def delete_scene(self, name) -> bool:
+        saved = configuration.get("scenes", {})
+        if name not in saved:
+            if name:
+                self.speak(f"no scene named {name}")
+            return False
+        configuration.set("scenes", {key: scene for key, scene in saved.items() if key != name})
+        self.speak(f"scene {name} deleted")
+        return True
+
+    def recall_scene(self, name) -> dict:
+        """
+        Applies the parameters of a saved scene that differ from the cache as a single script write
+
+        Parameters the current kind doesn't have are skipped. The cache is updated up front so the pdirty
+        refresh that follows finds nothing left to redraw. Returns the changes written.
+        """
+        if (scene := configuration.get("scenes", {}).get(name)) is None:
+            return {}
+        target = scenes.flatten(scene)
+        current = self.cache["strip"] | self.cache["bus"] | self.cache["sliders"]
+        changes = scenes.diff(target, current)
+        skipped = sum(key in current for key in target) - len(changes)
+        self.scene_stats["written"] += len(changes)
+        self.scene_stats["skipped"] += skipped
+        self.logger.debug(f"scene {name}: {len(changes)} changed, {skipped} unchanged writes skipped")
+        if not changes:
+            self.speak(f"scene {name} already active")
+            return changes
+        self.undo_history.record_many((key, current[key], val) for key, val in changes.items())
+        self.writer.flush()
+        self.vm.sendtext(scenes.to_script(changes, self.specs))
+        for key, val in changes.items():
+            if "||SLIDER " in key:
+                self.cache["sliders"][key] = val
+            else:
+                self.cache["strip" if key.startswith("STRIP") else "bus"][key] = val
+        self.speak(f"scene {name} recalled, {len(changes)} {'change' if len(changes) == 1 else 'changes'}")
+        return changes
+
+    def undo(self, redo=False) -> tuple | None:
+        """Restores the newest undo (or redo) entry, speaking what was restored. Returns the restored values"""
+        action = "redo" if redo else "undo"
+        if (restored := self.undo_history.redo() if redo else self.undo_history.undo()) is None:
+            self.speak(f"nothing to {action}")
+            return None
+        self.apply_deltas(restored)
+        if len(restored) == 1:
+            self.speak(f"{action} {self.describe_param(*restored[0])}")
+        else:
+            self.speak(f"{action} {len(restored)} changes")
+        return restored
+
+    def apply_deltas(self, restored):
+        """
+        Writes restored values without recording them
+
+        Sliders go through the write-behind queue, switches and bus modes are batched into one script.
+        """
+        script = {}
+        for key, val in restored:
+            if "||SLIDER " in key:
+                self.write_slider(key, val, record=False)
+            else:
+                script[key] = val
+                self.cache["strip" if key.startswith("STRIP") else "bus"][key] = val
+        if script:
+            self.writer.flush()
+            self.vm.sendtext(scenes.to_script(script, self.specs))
+
+    def run_batch(self, batch, reply) -> dict:
+        """
+        Applies a batch of (key, value) commands from the command server as one change
+
+        The whole batch is checked before anything is written, reply receives "OK <n changed>" or "ERR <reason>",
+        whatever happens. A None value toggles a switch or cycles karaoke. Returns the changes written.
+        """
+        result = "ERR batch failed"
+        try:
+            current = self.cache["strip"] | self.cache["bus"] | self.cache["sliders"]
+            changes = {}
+            for key, val in batch:
+                if key not in current:
+                    result = f"ERR unknown parameter {key}"
+                    return {}
+                try:
+                    changes[key] = self.coerce_param(key, val, changes.get(key, current[key]))
+                except (TypeError, ValueError) as e:
+                    result = f"ERR {key}: {e}"
+                    return {}
+            changes = {key: val for key, val in changes.items() if val != current[key]}
+            self.undo_history.record_many((key, current[key], val) for key, val in changes.items())
+            self.apply_deltas(changes.items())
+            if self.server is not None:
+                self.server.publish(changes)
+            result = f"OK {len(changes)}"
+            return changes
+        finally:
+            reply(result)
+
+    def coerce_param(self, key, val, current):
+        """Converts a command value to the type the cache holds for key"""
+        identifier, param = key.split("||")
+        if param.startswith("SLIDER "):
+            spec = self.specs[identifier.split()[0]][param.removeprefix("SLIDER ")]
+            val = spec.clamp(float(val))
+            return int(val) if spec.precision == 0 else round(val, spec.precision)
+        match current:
+            case bool():
+                if val is None:
+                    return not current
+                if isinstance(val, str):
+                    if val.lower() not in ("on", "off"):
+                        raise ValueError(f"expected on or off, got {val}")
+                    return val.lower() == "on"
+                return bool(val)
+            case int():
+                if val is None:
+                    return (current + 1) % len(KARAOKE_MODES)
+                if not 0 <= int(val) < len(KARAOKE_MODES):
+                    raise ValueError(f"expected 0 to {len(KARAOKE_MODES) - 1}")
+                return int(val)
+            case str():
+                if val not in util._bus_mode_map:
+                    raise ValueError(f"expected one of {', '.join(util._bus_mode_map)}")
+                return val
+
+    def describe_value(self, key, val) -> str:
+        match key.split("||")[-1]:
+            case "MODE":
+                return util._bus_mode_map[val]
+            case "KARAOKE":
+                return KARAOKE_MODES[val]
+        return "on" if val else "off"
+
+    def describe_param(self, key, val) -> str:
+        identifier, *section, param = key.split("||")
+        label = self.cache["labels"][f"{identifier}||LABEL"]
+        if param.startswith("SLIDER "):
+            name = param.removeprefix("SLIDER ")
+            prefix = f"{section[0].lower()} " if section else ""
+            return f"{label} {prefix}{name.lower()} {self.spec(key).format(val)}"
+        match param:
+            case "MODE":
+                return f"{label} bus mode {self.describe_value(key, val)}"
+            case "KARAOKE":
+                return f"{label} karaoke {self.describe_value(key, val)}"
+        return f"{label} {param} {self.describe_value(key, val)}"
+
+
+def request_controller_object(vm, port=None):
+    return Controller(vm, port=port)
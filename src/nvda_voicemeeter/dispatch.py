@@ -0,0 +1,182 @@
+import logging
+import re
+
+from . import configuration, util
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 16
+
+STEP_TABS = ("tab||Physical Strip", "tab||Virtual Strip", "tab||Buses")
+
+
+class Dispatcher:
+    """
+    Maps the parameter changing events of the main window and the compressor and gate popups onto the controller
+
+    Shared by the window's loops and the session replayer, so a replay runs the handlers the app runs. Slider key
+    steps are coalesced to at most one write per key per FRAME_MS frame, on the loop whose after(ms, fn) is passed:
+    the window's tk root, or a stand-in. Without a window the optional hooks fall back to the controller: speak(text)
+    for immediate feedback, move(key, val) to move a slider widget, announce(text, key) to speak once the widget at
+    key is ready.
+    """
+
+    def __init__(self, controller, after, speak=None, move=None, announce=None):
+        self.controller = controller
+        self.kind = controller.kind
+        self.after = after
+        self.speak = speak or controller.speak
+        self.move = move or (lambda key, val: None)
+        self.announce = announce or (lambda text, key: self.speak(text))
+        self.logger = logger.getChild(type(self).__name__)
+        self.mode = None
+        self._steps_frame = None
+
+    def main(self, parsed, event, values, focus) -> bool:
+        """
+        Applies an event of the main window, returns whether it was one of these
+
+        focus() returns the key of the focused element, it is only called for slider mode steps.
+        """
+        if event in util.get_slider_modes():
+            self.mode = event
+            self.speak(f"{self.mode} enabled")
+            self.logger.debug(f"entered slider mode {self.mode}")
+            return True
+        if event == "ESCAPE":
+            if self.mode:
+                self.speak(f"{self.mode} disabled")
+                self.logger.debug(f"exited from slider mode {self.mode}")
+                self.mode = None
+            return True
+
+        match parsed:
+            # Slider mode
+            case [["ALT", *modifier, "LEFT" | "RIGHT" | "UP" | "DOWN" as direction], ["PRESS" | "RELEASE" as e]]:
+                if self.mode and values.get("tabgroup") in STEP_TABS and (key := self._mode_slider(focus())):
+                    self.step_slider(key, direction, modifier, e)
+
+            # Undo
+            case ["CTRL-Z" | "CTRL-Y" as bind]:
+                self.undo(redo=bind == "CTRL-Y")
+
+            # Scenes
+            case [name, ["MENU", "SCENE"]]:
+                self.recall_scene(" ".join(name))
+            case [str(bind)] if re.fullmatch(r"CTRL-F\d", bind):
+                saved = list(configuration.get("scenes", {}))
+                if (i := int(bind.removeprefix("CTRL-F")) - 1) < len(saved):
+                    self.recall_scene(saved[i])
+
+            # Sliders
+            case [["STRIP" | "BUS", _], ["SLIDER", param]]:
+                val = values[event]
+                self.controller.write_slider(event, int(val) if param == "LIMIT" else val)
+            case [
+                ["STRIP" | "BUS", _],
+                ["SLIDER", _],
+                ["KEY", *modifier, "LEFT" | "RIGHT" | "UP" | "DOWN" as direction, "PRESS" | "RELEASE" as e],
+            ]:
+                self.step_slider(event.rpartition("||")[0], direction, modifier, e)
+            case [["STRIP" | "BUS", _], ["SLIDER", _], ["KEY", "CTRL", "SHIFT", "R"]]:
+                self.reset_slider(event.rpartition("||")[0])
+
+            # Switches
+            case [["BUS", index], ["MODE"]]:
+                chosen = util._bus_mode_map_reversed[values[event]]
+                self.controller.set_bus_mode(int(index), chosen)
+                self.announce(util._bus_mode_map[chosen], event)
+            case [["STRIP", _], [_]] | [["BUS", _], ["EQ" | "MONO" | "MUTE"]]:
+                self.controller.toggle(event)
+
+            case _:
+                return False
+        return True
+
+    def dynamics(self, index, parsed, event, values) -> bool:
+        """Applies an event of the compressor or gate popup of strip index, returns whether it was one of these"""
+        match parsed:
+            case [["COMPRESSOR" | "GATE"], ["SLIDER", *_]]:
+                self.controller.write_slider(f"STRIP {index}||{event}", values[event])
+            case [
+                ["COMPRESSOR" | "GATE"],
+                ["SLIDER", *_],
+                ["KEY", *modifier, "LEFT" | "RIGHT" | "UP" | "DOWN" as direction, "PRESS" | "RELEASE" as e],
+            ]:
+                self.step_slider(f"STRIP {index}||{event.rpartition('||')[0]}", direction, modifier, e)
+            case [["COMPRESSOR" | "GATE"], ["SLIDER", *_], ["KEY", "CTRL", "SHIFT", "R"]]:
+                self.reset_slider(f"STRIP {index}||{event.rpartition('||')[0]}")
+            case ["CTRL-Z" | "CTRL-Y" as bind]:
+                self.undo(redo=bind == "CTRL-Y")
+            case _:
+                return False
+        return True
+
+    def _mode_slider(self, focus) -> str | None:
+        """Returns the slider of the current mode on the strip or bus with focus, None if it has none"""
+        if focus is None or focus.count("||") != 1:
+            return None
+        identifier, partial = focus.split("||")
+        channel, _, index = identifier.partition(" ")
+        if channel not in ("STRIP", "BUS") or not index.isdigit() or "SLIDER" in partial:
+            return None
+        param = self.mode.split()[0]
+        if param not in util.get_full_slider_params(int(index), self.kind):
+            return None
+        if not (channel == "STRIP" or param == "GAIN"):
+            return None
+        return f"{identifier}||SLIDER {param}"
+
+    def step_slider(self, key, direction, modifier, e):
+        """Steps a slider on a key press, engine refreshes are held off until the key is released"""
+        if e == "RELEASE":
+            self.controller.vm.event.pdirty = True
+            return
+
+        if (val := self.controller.next_value(key, direction, modifier)) is None:
+            return
+        self.controller.vm.event.pdirty = False
+        self.queue_step(key, val)
+
+    def reset_slider(self, key):
+        self.queue_step(key, self.controller.spec(key).reset)
+
+    def queue_step(self, key, val):
+        """
+        Coalesces slider steps, at most one write and widget update per key per frame
+
+        A step arriving when no frame is open is applied immediately, later steps in the same frame overwrite each
+        other.
+        """
+        if self._steps_frame is None:
+            self.apply_step(key, val)
+            self._steps_frame = self.after(FRAME_MS, self.apply_steps)
+        else:
+            self.controller.steps[key] = val
+
+    def apply_step(self, key, val):
+        self.controller.write_slider(key, val)
+        self.move(key, val)
+        self.speak(self.controller.spec(key).format(val))
+
+    def apply_steps(self):
+        steps, self.controller.steps = self.controller.steps, {}
+        self._steps_frame = self.after(FRAME_MS, self.apply_steps) if steps else None
+        for key, val in steps.items():
+            self.apply_step(key, val)
+
+    def undo(self, redo=False) -> tuple | None:
+        """Restores the newest undo (or redo) entry, moving the sliders it restored. Returns the restored values"""
+        restored = self.controller.undo(redo=redo)
+        self.move_sliders(restored or ())
+        return restored
+
+    def recall_scene(self, name) -> dict:
+        changes = self.controller.recall_scene(name)
+        self.move_sliders(changes.items())
+        return changes
+
+    def move_sliders(self, changes):
+        for key, val in changes:
+            if "||SLIDER " in key:
+                self.move(key, val)
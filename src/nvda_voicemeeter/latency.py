@@ -0,0 +1,176 @@
+import functools
+import json
+import logging
+import math
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("read", "parse", "handler", "vm", "speech")
+INDEX = re.compile(r" \d+\b")
+
+
+class Histogram:
+    """
+    Log-linear histogram of durations in microseconds, HDR style
+
+    Values below 2**SUB_BITS are counted exactly, larger values by power of two split into 2**(SUB_BITS - 1) linear
+    sub-buckets, so every value is kept to within about 3% at a fixed cost of a list of 1024 counts.
+    """
+
+    SUB_BITS = 6
+    MAX_BITS = 36
+
+    def __init__(self):
+        self.half = 1 << (self.SUB_BITS - 1)
+        self.counts = [0] * ((self.MAX_BITS - self.SUB_BITS + 2) * self.half)
+        self.count = 0
+        self.total = 0
+        self.min = math.inf
+        self.max = 0
+
+    def index(self, us) -> int:
+        if us < 2 * self.half:
+            return us
+        shift = us.bit_length() - self.SUB_BITS
+        return shift * self.half + (us >> shift)
+
+    def bounds(self, i) -> tuple:
+        """Returns the lowest and highest value counted in bucket i"""
+        if i < 2 * self.half:
+            return i, i
+        shift = i // self.half - 1
+        mantissa = i - shift * self.half
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds):
+        us = min(int(seconds * 1e6), (1 << self.MAX_BITS) - 1)
+        self.counts[self.index(us)] += 1
+        self.count += 1
+        self.total += us
+        self.min = min(self.min, us)
+        self.max = max(self.max, us)
+
+    def percentile(self, q) -> int:
+        """Returns the value below which q percent of the recorded values fall, to within a bucket"""
+        target = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                low, high = self.bounds(i)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "min_us": self.min,
+            "mean_us": round(self.total / self.count),
+            **{f"p{str(q).replace('.', '')}_us": self.percentile(q) for q in (50, 90, 99, 99.9)},
+            "max_us": self.max,
+            "buckets": [[self.bounds(i)[0], n] for i, n in enumerate(self.counts) if n],
+        }
+
+
+def family(loop, event) -> str:
+    """Groups events by loop and key with indexes dropped, "STRIP 3||SLIDER GAIN||KEY UP PRESS" is one family"""
+    return INDEX.sub("", f"{loop} {event}")
+
+
+class LatencyRecorder:
+    """
+    Histograms of how long each phase of handling an event takes, per event family
+
+    Each event loop gets a LoopTimer that marks the read() wait, the parse and the handler. Time spent in vm calls
+    and speech on the gui thread is measured by instrumenting those objects and reported for the handler it
+    happened in. Only created when latency_stats is set in settings.json, the loops skip timing entirely otherwise.
+    """
+
+    def __init__(self):
+        self.logger = logger.getChild(type(self).__name__)
+        self.histograms = {}
+        self.totals = {"vm": 0.0, "speech": 0.0}
+        self.reads = 0  # events read by all loops
+        self.thread = threading.get_ident()
+
+    def instrument(self, obj, names, phase):
+        """Replaces methods of obj with wrappers adding their time on the gui thread to phase"""
+        for name in names:
+            fn = getattr(obj, name)
+
+            @functools.wraps(fn)
+            def timed(*args, _fn=fn, **kwargs):
+                if threading.get_ident() != self.thread:
+                    return _fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return _fn(*args, **kwargs)
+                finally:
+                    self.totals[phase] += time.perf_counter() - start
+
+            setattr(obj, name, timed)
+
+    def loop(self, name) -> "LoopTimer":
+        return LoopTimer(self, name)
+
+    def record(self, family, phase, seconds):
+        if (phases := self.histograms.get(family)) is None:
+            phases = self.histograms[family] = {}
+        if (histogram := phases.get(phase)) is None:
+            histogram = phases[phase] = Histogram()
+        histogram.record(seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            family: {phase: phases[phase].to_dict() for phase in PHASES if phase in phases}
+            for family, phases in sorted(self.histograms.items())
+        }
+
+    def dump(self, path):
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        self.logger.debug(f"latency histograms for {len(self.histograms)} event families written to {path}")
+
+
+class LoopTimer:
+    """
+    Marks the phases of one event loop, an event is finished when the loop next waits
+
+    Its handler is not timed if another loop read an event in between, it ran a popup's loop or it ended this one.
+    """
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+        self.family = None
+        self._waiting = 0.0
+        self._received = 0.0
+        self._parsed = None
+        self._totals = None
+        self._read = 0
+
+    def wait(self):
+        now = time.perf_counter()
+        if self.family is not None and self._read == self.recorder.reads:
+            record = functools.partial(self.recorder.record, self.family)
+            record("handler", now - (self._parsed or self._received))
+            for phase, start in self._totals.items():
+                if spent := self.recorder.totals[phase] - start:
+                    record(phase, spent)
+        self.family = None
+        self._waiting = now
+
+    def received(self, event):
+        self._received = time.perf_counter()
+        self.recorder.reads += 1
+        self._read = self.recorder.reads
+        self.family = family(self.name, event)
+        self.recorder.record(self.family, "read", self._received - self._waiting)
+        self._parsed = None
+        self._totals = dict(self.recorder.totals)
+
+    def parsed(self):
+        self._parsed = time.perf_counter()
+        self.recorder.record(self.family, "parse", self._parsed - self._received)
@@ -0,0 +1,109 @@
+import concurrent.futures
+import json
+import logging
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from . import xmlsettings
+
+logger = logging.getLogger(__name__)
+
+FORMAT = 1
+
+
+class ConfigLibrary:
+    """
+    Index of the Voicemeeter settings files in a folder
+
+    Each file's kind, labels and summary are kept in a json index, keyed by path with the mtime and size they were
+    read at. A refresh only stats the folder and rereads files that are new or changed, spread over a process pool
+    once there are enough of them to pay for starting one. The entries are replaced whole, never changed in place, so
+    the gui thread can list them while a refresh runs on another thread. If the index can't be written the new
+    entries are still kept in memory, if the files can't be read the old entries stay.
+    """
+
+    POOL_THRESHOLD = 16
+
+    def __init__(self, folder, path):
+        self.logger = logger.getChild(type(self).__name__)
+        self.folder = Path(folder)
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries = self._read()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.error(f"{self.path} could not be read, the library will be rebuilt: {e}")
+            return {}
+        if index.get("format") != FORMAT or index.get("folder") != str(self.folder):
+            return {}
+        return index.get("entries", {})
+
+    def _write(self, entries):
+        index = {"format": FORMAT, "folder": str(self.folder), "entries": entries}
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, self.path)
+
+    def _summarise(self, paths) -> list:
+        if len(paths) < self.POOL_THRESHOLD:
+            return [xmlsettings.summarise(path) for path in paths]
+        with concurrent.futures.ProcessPoolExecutor() as pool:
+            return list(pool.map(xmlsettings.summarise, paths, chunksize=max(1, len(paths) // 64)))
+
+    def refresh(self) -> bool:
+        """Brings the index in line with the folder, returns whether anything changed"""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        try:
+            found = {
+                entry.path: entry.stat()
+                for entry in os.scandir(self.folder)
+                if entry.is_file() and entry.name.lower().endswith(".xml")
+            }
+        except FileNotFoundError:
+            found = {}
+        stale = [
+            path
+            for path, stat in found.items()
+            if (cached := self.entries.get(path)) is None
+            or (cached["mtime"], cached["size"]) != (stat.st_mtime, stat.st_size)
+        ]
+        removed = self.entries.keys() - found.keys()
+        if not (stale or removed):
+            return False
+        entries = {path: entry for path, entry in self.entries.items() if path not in removed}
+        try:
+            summaries = self._summarise(stale)
+        except (OSError, BrokenProcessPool) as e:
+            self.logger.error(f"{self.folder} could not be read, the library is left as it was: {e}")
+            return False
+        for path, summary in zip(stale, summaries):
+            entries[path] = summary | {"mtime": found[path].st_mtime, "size": found[path].st_size}
+        self.entries = entries
+        try:
+            self._write(entries)
+        except OSError as e:
+            self.logger.error(f"{self.path} could not be written, the library is kept in memory: {e}")
+        self.logger.debug(f"{len(stale)} files read, {len(removed)} dropped, {len(entries)} in the library")
+        return True
+
+    def for_kind(self, kind) -> list:
+        """Paths of the readable files for a kind, or of unknown kind, sorted by name"""
+        paths = (
+            Path(path) for path, entry in self.entries.items() if entry["readable"] and entry["kind"] in (kind, None)
+        )
+        return sorted(paths, key=lambda path: path.stem.lower())
+
+    def summary(self, path) -> str:
+        return self.entries.get(str(path), {}).get("summary", "")
@@ -0,0 +1,322 @@
+import logging
+import math
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FLOOR_DB = -60.0
+
+
+def to_db(val):
+    """Converts linear levels to dB, clipped at FLOOR_DB"""
+    return np.maximum(20 * np.log10(np.maximum(val, 1e-9)), FLOOR_DB)
+
+
+class LevelMeter:
+    """
+    Peak hold and RMS for every strip and bus level channel
+
+    All channels are held in one preallocated array (strip levels first, then bus levels) and updated together
+    on each ldirty tick. The vm only reports levels while the meter has users.
+    """
+
+    def __init__(self, vm, hold=1.5, decay=20.0, window=0.3):
+        self.vm = vm
+        self.kind = vm.kind
+        self.hold = hold
+        self.decay = decay
+        self.window = window
+        self.logger = logger.getChild(type(self).__name__)
+        n = self.kind.num_strip_levels + self.kind.num_bus_levels
+        self.level = np.zeros(n)
+        self.peak = np.zeros(n)
+        self.held_until = np.zeros(n)
+        self.mean_square = np.zeros(n)
+        self._square = np.empty(n)
+        self._decaying = np.empty(n, dtype=bool)
+        self._rising = np.empty(n, dtype=bool)
+        self._last = None
+        self.owners = [("STRIP", i) for i in range(self.kind.num_strip)] + [
+            ("BUS", i) for i in range(self.kind.num_bus)
+        ]
+        self.owner_starts = np.array([self.channels(*owner).start for owner in self.owners])
+        self.listeners = []
+        self._users = set()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._users)
+
+    def acquire(self, user):
+        """Starts sampling when the first user arrives"""
+        if not self._users:
+            self.reset()
+            self.sample(
+                [self.vm.get_level(self.vm.strip_mode, i) for i in range(self.kind.num_strip_levels)],
+                [self.vm.get_level(3, i) for i in range(self.kind.num_bus_levels)],
+            )
+            self.vm.observer.add(self.on_ldirty)
+            self.vm.event.ldirty = True
+            self.logger.debug("metering started")
+        self._users.add(user)
+
+    def release(self, user):
+        """Stops sampling entirely once the last user has gone"""
+        self._users.discard(user)
+        if not self._users:
+            self.stop()
+
+    def add_listener(self, listener):
+        """listener(meter, now) is called after every sample while holding the meter lock"""
+        with self._lock:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def stop(self):
+        self._users.clear()
+        self.vm.event.ldirty = False
+        if self.on_ldirty in self.vm.observer.observers:
+            self.vm.observer.remove(self.on_ldirty)
+        self.logger.debug("metering stopped")
+
+    def reset(self):
+        with self._lock:
+            for arr in (self.level, self.peak, self.held_until, self.mean_square):
+                arr.fill(0)
+            self._last = None
+
+    def on_ldirty(self):
+        self.sample(self.vm.cache["strip_level"], self.vm.cache["bus_level"])
+
+    def sample(self, strip_level, bus_level, now=None):
+        now = time.monotonic() if now is None else now
+        ns = self.kind.num_strip_levels
+        with self._lock:
+            self.level[:ns] = strip_level
+            self.level[ns:] = bus_level
+            dt = 0.0 if self._last is None else max(0.0, now - self._last)
+            self._last = now
+
+            # rms, exponential moving average of the squared level
+            np.multiply(self.level, self.level, out=self._square)
+            alpha = 1.0 if dt == 0 else 1 - math.exp(-dt / self.window)
+            self._square -= self.mean_square
+            self._square *= alpha
+            self.mean_square += self._square
+
+            # peak hold, decaying at self.decay dB/s once the hold time has passed
+            np.less(self.held_until, now, out=self._decaying)
+            np.multiply(self.peak, 10 ** (-self.decay * dt / 20), out=self.peak, where=self._decaying)
+            np.greater_equal(self.level, self.peak, out=self._rising)
+            np.copyto(self.peak, self.level, where=self._rising)
+            np.copyto(self.held_until, now + self.hold, where=self._rising)
+
+            for listener in self.listeners:
+                listener(self, now)
+
+    def channels(self, section, index) -> slice:
+        """Returns the slice of level channels for a strip or bus"""
+        if section == "STRIP":
+            if index < self.kind.phys_in:
+                return slice(2 * index, 2 * index + 2)
+            start = 2 * self.kind.phys_in + 8 * (index - self.kind.phys_in)
+            return slice(start, start + 8)
+        start = self.kind.num_strip_levels + 8 * index
+        return slice(start, start + 8)
+
+    def read(self, section, index) -> tuple:
+        """Returns (peak, rms) in dB for a strip or bus, the loudest of its channels"""
+        channels = self.channels(section, index)
+        with self._lock:
+            peak = self.peak[channels].max()
+            rms = math.sqrt(self.mean_square[channels].max())
+        return float(to_db(peak)), float(to_db(rms))
+
+    def describe(self, section, index) -> str:
+        peak, rms = self.read(section, index)
+        if peak <= FLOOR_DB:
+            return "silent"
+        return f"peak {round(peak)} dB, RMS {round(rms)} dB"
+
+
+class LevelDetector:
+    """
+    Watches every strip and bus for clipping and for signal that has gone silent
+
+    Runs on each meter sample against the loudest channel of each strip and bus, alerts are passed to
+    notify(section, index, alert). Both checks use separate on and off thresholds so a level hovering around one
+    threshold is reported once, and each strip or bus has a cooldown per alert.
+    Silence is only reported for a strip or bus that was active beforehand.
+    """
+
+    def __init__(
+        self,
+        meter,
+        notify,
+        clip_db=-0.5,
+        clip_release_db=-6.0,
+        active_db=-40.0,
+        silence_db=-55.0,
+        silence_after=3.0,
+        cooldown=10.0,
+    ):
+        self.meter = meter
+        self.notify = notify
+        self.logger = logger.getChild(type(self).__name__)
+        # compared against linear levels, no logs on the hot path
+        self.clip_on = 10 ** (clip_db / 20)
+        self.clip_off = 10 ** (clip_release_db / 20)
+        self.active_on = 10 ** (active_db / 20)
+        self.silence_on = 10 ** (silence_db / 20)
+        self.silence_after = silence_after
+        self.cooldown = cooldown
+        n = len(meter.owners)
+        self.level = np.empty(n)
+        self.clipping = np.zeros(n, dtype=bool)
+        self.active = np.zeros(n, dtype=bool)
+        self.quiet_since = np.zeros(n)
+        self.muted_until = {"clipping": np.zeros(n), "silent": np.zeros(n)}
+        self._hit = np.empty(n, dtype=bool)
+        self._new = np.empty(n, dtype=bool)
+
+    def start(self):
+        self.reset()
+        self.meter.add_listener(self.on_sample)
+        self.meter.acquire("detector")
+
+    def stop(self):
+        self.meter.remove_listener(self.on_sample)
+        self.meter.release("detector")
+
+    @property
+    def running(self) -> bool:
+        return self.on_sample in self.meter.listeners
+
+    def reset(self):
+        for arr in (self.clipping, self.active, self.quiet_since, *self.muted_until.values()):
+            arr.fill(0)
+
+    def on_sample(self, meter, now):
+        np.maximum.reduceat(meter.level, meter.owner_starts, out=self.level)
+
+        # on bool arrays a > b is a and not b, keeps the masks in place
+        # clipping, raised at clip_db, cleared once the level falls below clip_release_db
+        np.greater_equal(self.level, self.clip_on, out=self._hit)
+        np.greater(self._hit, self.clipping, out=self._new)
+        self.clipping |= self._hit
+        np.less(self.level, self.clip_off, out=self._hit)
+        np.greater(self.clipping, self._hit, out=self.clipping)
+        if self._new.any():
+            self._raise("clipping", self._new, now)
+
+        # silence, armed above active_db, raised after silence_after seconds below silence_db
+        np.greater_equal(self.level, self.active_on, out=self._hit)
+        self.active |= self._hit
+        np.greater_equal(self.level, self.silence_on, out=self._hit)
+        np.copyto(self.quiet_since, now, where=self._hit)
+        np.less_equal(self.quiet_since, now - self.silence_after, out=self._new)
+        self._new &= self.active
+        if self._new.any():
+            np.greater(self.active, self._new, out=self.active)
+            self._raise("silent", self._new, now)
+
+    def _raise(self, alert, mask, now):
+        muted_until = self.muted_until[alert]
+        for i in np.flatnonzero(mask):
+            if now < muted_until[i]:
+                continue
+            muted_until[i] = now + self.cooldown
+            section, index = self.meter.owners[i]
+            self.logger.debug(f"{section} {index} {alert}")
+            self.notify(section, index, alert)
+
+
+class LevelHistory:
+    """
+    The last seconds of levels for every channel, kept in fixed size ring buffers
+
+    Samples are folded into bins of resolution seconds, each bin holds the peak, the sum of squared levels and the
+    sample count. Bins are overwritten in place as time moves on, queries only consider bins stamped within the
+    requested window so gaps while the meter was stopped drop out on their own.
+    """
+
+    def __init__(self, meter, seconds=60, resolution=0.1):
+        self.meter = meter
+        self.seconds = seconds
+        self.resolution = resolution
+        self.logger = logger.getChild(type(self).__name__)
+        self.capacity = math.ceil(seconds / resolution)
+        n = len(meter.level)
+        self.peak = np.zeros((self.capacity, n), dtype=np.float32)
+        self.square_sum = np.zeros((self.capacity, n), dtype=np.float32)
+        self.counts = np.zeros(self.capacity, dtype=np.int64)
+        self.bins = np.full(self.capacity, -1, dtype=np.int64)
+        self._square = np.empty(n)
+        self._bin = -1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(arr.nbytes for arr in (self.peak, self.square_sum, self.counts, self.bins, self._square))
+
+    def start(self):
+        self.meter.add_listener(self.on_sample)
+        self.meter.acquire("history")
+
+    def stop(self):
+        self.meter.remove_listener(self.on_sample)
+        self.meter.release("history")
+
+    @property
+    def running(self) -> bool:
+        return self.on_sample in self.meter.listeners
+
+    def on_sample(self, meter, now):
+        b = int(now / self.resolution)
+        row = b % self.capacity
+        np.multiply(meter.level, meter.level, out=self._square)
+        if b != self._bin:
+            self._bin = b
+            self.bins[row] = b
+            self.peak[row] = meter.level
+            self.square_sum[row] = self._square
+            self.counts[row] = 1
+        else:
+            np.maximum(self.peak[row], meter.level, out=self.peak[row])
+            self.square_sum[row] += self._square
+            self.counts[row] += 1
+
+    def _window(self, seconds):
+        """Returns a mask of the bins within the last seconds"""
+        span = min(math.ceil(seconds / self.resolution), self.capacity)
+        return self.bins > self._bin - span
+
+    def summary(self, section, index, seconds) -> tuple | None:
+        """Returns (peak, rms) in dB for a strip or bus over the last seconds, None without samples"""
+        channels = self.meter.channels(section, index)
+        with self.meter._lock:
+            window = self._window(seconds)
+            if not (count := self.counts[window].sum()):
+                return None
+            peak = self.peak[window, channels].max()
+            mean_square = self.square_sum[window, channels].sum(axis=0).max() / count
+        return float(to_db(peak)), float(to_db(math.sqrt(mean_square)))
+
+    def loudest(self, section, seconds) -> tuple | None:
+        """Returns (index, rms) in dB of the loudest strip or bus in section over the last seconds"""
+        with self.meter._lock:
+            window = self._window(seconds)
+            if not (count := self.counts[window].sum()):
+                return None
+            mean_square = self.square_sum[window].sum(axis=0) / count
+        per_owner = np.maximum.reduceat(mean_square, self.meter.owner_starts)
+        indices = [i for i, (owner_section, _) in enumerate(self.meter.owners) if owner_section == section]
+        best = max(indices, key=per_owner.__getitem__)
+        return self.meter.owners[best][1], float(to_db(math.sqrt(per_owner[best])))
@@ -1,3 +1,6 @@
+from . import params, util
+
+
 def _make_hardware_ins_cache(vm) -> dict:
     return {**{f"HARDWARE IN||{i + 1}": vm.strip[i].device.name for i in range(vm.kind.phys_in)}}
 
@@ -93,3 +96,27 @@ def _make_patch_insert_cache(vm) -> dict:
     if vm.kind.name != "basic":
         params |= {**{f"INSERT CHECKBOX||{i}": vm.patch.insert[i].on for i in range(vm.kind.num_strip_levels)}}
     return params
+
+
+def _make_slider_cache(vm) -> dict:
+    specs = params.get_param_specs(vm.kind)
+    cache = {}
+    for i in range(vm.kind.num_strip):
+        for param in util.get_full_slider_params(i, vm.kind):
+            cache[f"STRIP {i}||SLIDER {param}"] = specs["STRIP"][param].get(vm.strip[i])
+    cache |= {**{f"BUS {i}||SLIDER GAIN": specs["BUS"]["GAIN"].get(vm.bus[i]) for i in range(vm.kind.num_bus)}}
+    return cache
+
+
+def _make_comp_cache(vm, index) -> dict:
+    return {
+        f"STRIP {index}||COMPRESSOR||SLIDER {param}": spec.get(vm.strip[index])
+        for param, spec in params.get_param_specs(vm.kind)["COMPRESSOR"].items()
+    }
+
+
+def _make_gate_cache(vm, index) -> dict:
+    return {
+        f"STRIP {index}||GATE||SLIDER {param}": spec.get(vm.strip[index])
+        for param, spec in params.get_param_specs(vm.kind)["GATE"].items()
+    }
@@ -1,12 +1,14 @@
-from .cdll import libc
+from .cdll import load_libc
 from .errors import NVDAVMCAPIError
 
 
 class CBindings:
-    bind_test_if_running = libc.nvdaController_testIfRunning
-    bind_speak_text = libc.nvdaController_speakText
-    bind_cancel_speech = libc.nvdaController_cancelSpeech
-    bind_braille_message = libc.nvdaController_brailleMessage
+    def __init__(self):
+        libc = load_libc()
+        self.bind_test_if_running = libc.nvdaController_testIfRunning
+        self.bind_speak_text = libc.nvdaController_speakText
+        self.bind_cancel_speech = libc.nvdaController_cancelSpeech
+        self.bind_braille_message = libc.nvdaController_brailleMessage
 
     def call(self, fn, *args, ok=(0,)):
         retval = fn(*args)
@@ -0,0 +1,121 @@
+import functools
+from dataclasses import dataclass, field
+
+from . import util
+
+
+@dataclass(frozen=True)
+class ParamSpec:
+    """Range, resolution, key steps, vm attribute and script name for a slider parameter"""
+
+    range: tuple
+    attr: str
+    resolution: float = 0.1
+    steps: dict = field(default_factory=lambda: {(): 1, ("CTRL",): 3, ("SHIFT",): 0.1})
+    reset: float = 0
+    precision: int = 1
+    disabled: bool = False
+    script: str = ""
+
+    @property
+    def slider_opts(self) -> dict:
+        return {"range": self.range, "resolution": self.resolution, "disabled": self.disabled}
+
+    def clamp(self, val):
+        return util.check_bounds(val, self.range)
+
+    def step(self, val, direction, modifier):
+        """Returns val moved by the step bound to modifier, None if the modifier has no step"""
+        if (step := self.steps.get(tuple(modifier))) is None:
+            return None
+        match direction:
+            case "RIGHT" | "UP":
+                val += step
+            case "LEFT" | "DOWN":
+                val -= step
+        return self.clamp(val)
+
+    def format(self, val) -> str:
+        if self.precision == 0:
+            return str(int(val))
+        return str(round(val, self.precision))
+
+    def target(self, obj):
+        """Returns the object holding the attribute and the attribute name"""
+        *path, name = self.attr.split(".")
+        return functools.reduce(getattr, path, obj), name
+
+    def get(self, obj):
+        return getattr(*self.target(obj))
+
+    def setter(self, obj):
+        return functools.partial(setattr, *self.target(obj))
+
+
+_knob_steps = {(): 1, ("CTRL",): 1, ("SHIFT",): 0.1}
+_long_steps = {(): 1, ("CTRL",): 3, ("SHIFT",): 0.1, ("ALT",): 10, ("CTRL", "ALT"): 50}
+
+
+@functools.cache
+def _make_param_specs(kind_id) -> dict:
+    strip = {
+        "GAIN": ParamSpec((-60, 12), "gain", script="Gain"),
+        "BASS": ParamSpec((-12, 12), "bass", steps=_knob_steps, script="EQGain1"),
+        "MID": ParamSpec((-12, 12), "mid", steps=_knob_steps, script="EQGain2"),
+        "TREBLE": ParamSpec((-12, 12), "treble", steps=_knob_steps, script="EQGain3"),
+    }
+    if kind_id == "basic":
+        strip["AUDIBILITY"] = ParamSpec((0, 10), "audibility", steps=_knob_steps, script="Audibility")
+    else:
+        strip |= {
+            "COMP": ParamSpec((0, 10), "comp.knob", steps=_knob_steps, script="Comp"),
+            "GATE": ParamSpec((0, 10), "gate.knob", steps=_knob_steps, script="Gate"),
+            "LIMIT": ParamSpec(
+                (-40, 12),
+                "limit",
+                resolution=1,
+                steps={(): 1, ("CTRL",): 3, ("SHIFT",): 1},
+                reset=12,
+                precision=0,
+                script="Limit",
+            ),
+        }
+    if kind_id == "potato":
+        strip["DENOISER"] = ParamSpec((0, 10), "denoiser.knob", steps=_knob_steps, script="Denoiser")
+
+    specs = {"STRIP": strip, "BUS": {"GAIN": ParamSpec((-60, 12), "gain", script="Gain")}}
+    if kind_id == "basic":
+        return specs
+
+    specs["COMPRESSOR"] = {
+        "INPUT GAIN": ParamSpec((-24, 24), "comp.gainin", disabled=True),
+        "RATIO": ParamSpec((1, 8), "comp.ratio", reset=1),
+        "THRESHOLD": ParamSpec((-40, -3), "comp.threshold", reset=-20),
+        "ATTACK": ParamSpec((0, 200), "comp.attack", reset=10),
+        "RELEASE": ParamSpec((0, 5000), "comp.release", steps=_long_steps | {("CTRL",): 5}, reset=50),
+        "KNEE": ParamSpec(
+            (0, 1),
+            "comp.knee",
+            resolution=0.01,
+            steps={(): 0.1, ("CTRL",): 0.3, ("SHIFT",): 0.01},
+            reset=0.5,
+            precision=2,
+        ),
+        "OUTPUT GAIN": ParamSpec((-24, 24), "comp.gainout", disabled=True),
+    }
+    specs["GATE"] = {
+        "THRESHOLD": ParamSpec((-60, -10), "gate.threshold", reset=-60),
+        "DAMPING": ParamSpec((-60, -10), "gate.damping", reset=-60),
+        "BPSIDECHAIN": ParamSpec(
+            (100, 4000), "gate.bpsidechain", resolution=1, steps=_long_steps, reset=100, precision=0
+        ),
+        "ATTACK": ParamSpec((0, 1000), "gate.attack", steps=_long_steps),
+        "HOLD": ParamSpec((0, 5000), "gate.hold", steps=_long_steps, reset=500),
+        "RELEASE": ParamSpec((0, 5000), "gate.release", steps=_long_steps, reset=1000),
+    }
+    return specs
+
+
+def get_param_specs(kind) -> dict:
+    """Returns the ParamSpec table for kind, keyed by section (STRIP, BUS, COMPRESSOR, GATE) then param"""
+    return _make_param_specs(kind.name)
@@ -1,8 +1,8 @@
-from pyparsing import Group, OneOrMore, Optional, Suppress, Word, alphanums, restOfLine
-
-
 class Parser:
     def __init__(self):
+        # pyparsing is only needed once events are read, keep it off the startup import path
+        from pyparsing import Group, OneOrMore, Optional, Suppress, Word, alphanums, restOfLine
+
         self.widget = Group(OneOrMore(Word(alphanums)))
         self.widget_token = Suppress("||")
         self.identifier = Group(OneOrMore(Word(alphanums)))
@@ -1,4 +1,6 @@
+import functools
 import logging
+import time
 from pathlib import Path
 
 import PySimpleGUI as psg
@@ -8,12 +10,17 @@ from .compound import CompSlider, GateSlider, LabelSliderAdvanced
 
 logger = logging.getLogger(__name__)
 
+CLOSING = (psg.WIN_CLOSED, psg.WINDOW_CLOSE_ATTEMPTED_EVENT, "Exit")
+
 
 class Popup:
     def __init__(self, window):
         self.window = window
         self.kind = self.window.kind
         self.logger = logger.getChild(type(self).__name__)
+        self.windows = {}
+        self.active = None
+        self.shown = None
 
     def save_as(self, message, title=None, initial_folder=None):
         layout = [
@@ -30,12 +37,10 @@ class Popup:
         popup["Cancel"].bind("<Return>", "||KEY ENTER")
         filepath = None
         while True:
-            event, values = popup.read()
-            self.logger.debug(f"event::{event}")
-            self.logger.debug(f"values::{values}")
-            if event in (psg.WIN_CLOSED, "Cancel"):
+            event, values, parsed_cmd = self.window.read_event(popup, "save as", closing=(psg.WIN_CLOSED, "Cancel"))
+            if parsed_cmd is None:
                 break
-            match parsed_cmd := self.window.parser.match.parseString(event):
+            match parsed_cmd:
                 case [[button], ["FOCUS", "IN"]]:
                     if values["Browse"]:
                         filepath = values["Browse"]
@@ -43,34 +48,47 @@ class Popup:
                     self.window.nvda.speak(button)
                 case [_, ["KEY", "ENTER"]]:
                     popup.find_element_with_focus().click()
-            self.logger.debug(f"parsed::{parsed_cmd}")
         popup.close()
         if filepath:
             return Path(filepath)
 
-    def on_pdirty(self):
-        if self.popup.Title == "Advanced Settings":
-            if self.kind.name != "basic":
-                for key, value in self.window.cache["asio"].items():
-                    if "INPUT" in key:
-                        identifier, i = key.split("||")
-                        partial = util.get_channel_identifier_list(self.window.vm)[int(i)]
-                        self.popup[f"{identifier}||{partial}"].update(value=value)
-                    elif "OUTPUT" in key:
-                        self.popup[key].update(value=value)
-
-        if self.popup.Title == "Advanced Compressor":
-            for param in ("RATIO", "THRESHOLD", "ATTACK", "RELEASE", "KNEE"):
-                self.popup[f"COMPRESSOR||SLIDER {param}"].update(
-                    value=getattr(self.window.vm.strip[self.index].comp, param.lower())
-                )
-            self.popup["COMPRESSOR||SLIDER INPUT GAIN"].update(value=self.window.vm.strip[self.index].comp.gainin)
-            self.popup["COMPRESSOR||SLIDER OUTPUT GAIN"].update(value=self.window.vm.strip[self.index].comp.gainout)
-        elif self.popup.Title == "Advanced Gate":
-            for param in ("THRESHOLD", "DAMPING", "BPSIDECHAIN", "ATTACK", "HOLD", "RELEASE"):
-                self.popup[f"GATE||SLIDER {param}"].update(
-                    value=getattr(self.window.vm.strip[self.index].gate, param.lower())
-                )
+    def move_slider(self, key, val):
+        """Moves a compressor or gate slider, if its popup is the one shown"""
+        identifier, section, name = key.split("||")
+        if self.shown == (section.lower(), int(identifier.split()[1])):
+            self.popup[f"{section}||{name}"].update(value=val)
+
+    def on_pdirty(self, changed):
+        """Refreshes the popup on screen, changed holds the main window cache entries changed this tick"""
+        if self.active is not None:
+            popup, refresh = self.active
+            refresh(popup, changed)
+
+    def refresh_advanced_settings(self, popup, changed=None):
+        """Fills every ASIO spinbox, or only those in changed"""
+        if self.kind.name == "basic":
+            return
+        asio = self.window.cache["asio"] if changed is None else changed["asio"]
+        values = {}
+        for key, value in asio.items():
+            if "INPUT" in key:
+                identifier, i = key.split("||")
+                values[f"{identifier}||{util.get_channel_identifier_list(self.window.vm)[int(i)]}"] = value
+            elif "OUTPUT" in key:
+                values[key] = value
+        popup.fill(values)
+
+    def refresh_strip(self, section, index, popup, changed=None):
+        """
+        Fills the compressor or gate sliders of a strip from the cache
+
+        The controller refreshes the params of a watched strip on pdirty, on a tick only the entries in changed are
+        filled.
+        """
+        cache = {"COMPRESSOR": "comp", "GATE": "gate"}[section]
+        source = self.window.cache[cache] if changed is None else changed[cache]
+        prefix = f"STRIP {index}||"
+        popup.fill({key.removeprefix(prefix): value for key, value in source.items() if key.startswith(prefix)})
 
     def rename(self, message, index, title=None, tab=None):
         if "Strip" in tab:
@@ -83,6 +101,10 @@ class Popup:
                 title += f" Physical Bus {index + 1}"
             else:
                 title += f" Virtual Bus {index - self.kind.phys_out + 1}"
+        return self.get_text(message, title=title)
+
+    def get_text(self, message, title=None) -> dict:
+        """Prompts for a line of text, returns the popup values ({} if cancelled) with the text under Edit"""
         layout = [
             [psg.Text(message)],
             [
@@ -100,12 +122,10 @@ class Popup:
         popup["Cancel"].bind("<Return>", "||KEY ENTER")
         data = {}
         while True:
-            event, values = popup.read()
-            self.logger.debug(f"event::{event}")
-            self.logger.debug(f"values::{values}")
-            if event in (psg.WIN_CLOSED, "Cancel"):
+            event, values, parsed_cmd = self.window.read_event(popup, "get text", closing=(psg.WIN_CLOSED, "Cancel"))
+            if parsed_cmd is None:
                 break
-            match parsed_cmd := self.window.parser.match.parseString(event):
+            match parsed_cmd:
                 case [[button], ["FOCUS", "IN"]]:
                     self.window.nvda.speak(button)
                 case [_, ["KEY", "ENTER"]]:
@@ -113,11 +133,10 @@ class Popup:
                 case ["Ok"]:
                     data = values
                     break
-            self.logger.debug(f"parsed::{parsed_cmd}")
         popup.close()
         return data
 
-    def advanced_settings(self, title):
+    def _make_advanced_settings(self, title) -> psg.Window:
         def add_patch_asio_input_to_strips(layout, i):
             nums = list(range(99))
             layout.append(
@@ -197,37 +216,40 @@ class Popup:
             layout.append([step()])
         layout.append([psg.Button("Exit", size=(8, 2))])
 
-        self.popup = psg.Window(title, layout, finalize=True)
+        popup = psg.Window(title, layout, enable_close_attempted_event=True, finalize=True)
         if self.kind.name != "basic":
             for i in range(self.kind.phys_out):
-                self.popup[f"ASIO INPUT SPINBOX||IN{i + 1} 0"].Widget.config(state="readonly")
-                self.popup[f"ASIO INPUT SPINBOX||IN{i + 1} 1"].Widget.config(state="readonly")
+                popup[f"ASIO INPUT SPINBOX||IN{i + 1} 0"].Widget.config(state="readonly")
+                popup[f"ASIO INPUT SPINBOX||IN{i + 1} 1"].Widget.config(state="readonly")
             for i in range(self.kind.phys_out - 1):
                 for j in range(self.kind.num_bus):
-                    self.popup[f"ASIO OUTPUT A{i + 2} SPINBOX||{j}"].Widget.config(state="readonly")
+                    popup[f"ASIO OUTPUT A{i + 2} SPINBOX||{j}"].Widget.config(state="readonly")
         if self.kind.name != "basic":
             for i in range(self.kind.phys_out):
-                self.popup[f"ASIO INPUT SPINBOX||IN{i + 1} 0"].bind("<FocusIn>", "||FOCUS IN")
-                self.popup[f"ASIO INPUT SPINBOX||IN{i + 1} 1"].bind("<FocusIn>", "||FOCUS IN")
+                popup[f"ASIO INPUT SPINBOX||IN{i + 1} 0"].bind("<FocusIn>", "||FOCUS IN")
+                popup[f"ASIO INPUT SPINBOX||IN{i + 1} 1"].bind("<FocusIn>", "||FOCUS IN")
             for i in range(self.kind.phys_out - 1):
                 for j in range(self.kind.num_bus):
-                    self.popup[f"ASIO OUTPUT A{i + 2} SPINBOX||{j}"].bind("<FocusIn>", "||FOCUS IN")
+                    popup[f"ASIO OUTPUT A{i + 2} SPINBOX||{j}"].bind("<FocusIn>", "||FOCUS IN")
         buttonmenu_opts = {"takefocus": 1, "highlightthickness": 1}
         for driver in ("MME", "WDM", "KS", "ASIO"):
-            self.popup[f"BUFFER {driver}"].Widget.config(**buttonmenu_opts)
-            self.popup[f"BUFFER {driver}"].bind("<FocusIn>", "||FOCUS IN")
-            self.popup[f"BUFFER {driver}"].bind("<space>", "||KEY SPACE", propagate=False)
-            self.popup[f"BUFFER {driver}"].bind("<Return>", "||KEY ENTER", propagate=False)
-        self.popup["Exit"].bind("<FocusIn>", "||FOCUS IN")
-        self.popup["Exit"].bind("<Return>", "||KEY ENTER")
-        self.window.vm.observer.add(self.on_pdirty)
+            popup[f"BUFFER {driver}"].Widget.config(**buttonmenu_opts)
+            popup[f"BUFFER {driver}"].bind("<FocusIn>", "||FOCUS IN")
+            popup[f"BUFFER {driver}"].bind("<space>", "||KEY SPACE", propagate=False)
+            popup[f"BUFFER {driver}"].bind("<Return>", "||KEY ENTER", propagate=False)
+        popup["Exit"].bind("<FocusIn>", "||FOCUS IN")
+        popup["Exit"].bind("<Return>", "||KEY ENTER")
+        return popup
+
+    def advanced_settings(self, title):
+        self.popup = self.show(
+            "advanced settings", functools.partial(self._make_advanced_settings, title), self.refresh_advanced_settings
+        )
         while True:
-            event, values = self.popup.read()
-            self.logger.debug(f"event::{event}")
-            self.logger.debug(f"values::{values}")
-            if event in (psg.WIN_CLOSED, "Exit"):
+            event, values, parsed_cmd = self.window.read_event(self.popup, "advanced settings", closing=CLOSING)
+            if parsed_cmd is None:
                 break
-            match parsed_cmd := self.window.parser.match.parseString(event):
+            match parsed_cmd:
                 case [["ASIO", "INPUT", "SPINBOX"], [in_num, channel]]:
                     index = util.get_asio_input_spinbox_index(int(channel), int(in_num[-1]))
                     val = values[f"ASIO INPUT SPINBOX||{in_num} {channel}"]
@@ -262,8 +284,9 @@ class Popup:
                         val = int(values[event])
                     driver = event.split()[1]
                     self.window.vm.set(f"option.buffer.{driver.lower()}", val)
-                    self.window.TKroot.after(
-                        200, self.window.nvda.speak, f"{driver} BUFFER {val if val else 'default'}"
+                    self.window.announce(
+                        f"{driver} BUFFER {val if val else 'default'}",
+                        ready=functools.partial(util.menu_unposted, self.popup, event),
                     )
                 case [["BUFFER", driver], ["FOCUS", "IN"]]:
                     val = int(self.window.vm.get(f"option.buffer.{driver.lower()}"))
@@ -274,13 +297,9 @@ class Popup:
                     self.window.nvda.speak(button)
                 case [_, ["KEY", "ENTER"]]:
                     self.popup.find_element_with_focus().click()
-            self.logger.debug(f"parsed::{parsed_cmd}")
-        self.window.vm.observer.remove(self.on_pdirty)
-        self.popup.close()
-
-    def compressor(self, index, title=None):
-        self.index = index
+        self.hide("advanced settings", event)
 
+    def _make_compressor(self, index, title=None) -> psg.Window:
         def _make_comp_frame() -> psg.Frame:
             comp_layout = [
                 [LabelSliderAdvanced(self.window, index, param, CompSlider)]
@@ -294,304 +313,59 @@ class Popup:
             layout.append([step()])
         layout.append([psg.Button("MAKEUP", size=(12, 1)), psg.Button("Exit", size=(8, 1))])
 
-        self.popup = psg.Window(title, layout, return_keyboard_events=False, finalize=True)
+        popup = psg.Window(
+            title, layout, return_keyboard_events=False, enable_close_attempted_event=True, finalize=True
+        )
         buttonmenu_opts = {"takefocus": 1, "highlightthickness": 1}
         for param in ("INPUT GAIN", "RATIO", "THRESHOLD", "ATTACK", "RELEASE", "KNEE", "OUTPUT GAIN"):
-            self.popup[f"COMPRESSOR||SLIDER {param}"].Widget.config(**buttonmenu_opts)
-            self.popup[f"COMPRESSOR||SLIDER {param}"].bind("<FocusIn>", "||FOCUS IN")
-            self.popup[f"COMPRESSOR||SLIDER {param}"].bind("<FocusOut>", "||FOCUS OUT")
+            popup[f"COMPRESSOR||SLIDER {param}"].Widget.config(**buttonmenu_opts)
+            popup[f"COMPRESSOR||SLIDER {param}"].bind("<FocusIn>", "||FOCUS IN")
+            popup[f"COMPRESSOR||SLIDER {param}"].bind("<FocusOut>", "||FOCUS OUT")
             for event in ("KeyPress", "KeyRelease"):
                 event_id = event.removeprefix("Key").upper()
                 for direction in ("Left", "Right", "Up", "Down"):
-                    self.popup[f"COMPRESSOR||SLIDER {param}"].bind(
+                    popup[f"COMPRESSOR||SLIDER {param}"].bind(
                         f"<{event}-{direction}>", f"||KEY {direction.upper()} {event_id}"
                     )
-                    self.popup[f"COMPRESSOR||SLIDER {param}"].bind(
+                    popup[f"COMPRESSOR||SLIDER {param}"].bind(
                         f"<Shift-{event}-{direction}>", f"||KEY SHIFT {direction.upper()} {event_id}"
                     )
-                    self.popup[f"COMPRESSOR||SLIDER {param}"].bind(
+                    popup[f"COMPRESSOR||SLIDER {param}"].bind(
                         f"<Control-{event}-{direction}>", f"||KEY CTRL {direction.upper()} {event_id}"
                     )
                     if param == "RELEASE":
-                        self.popup[f"COMPRESSOR||SLIDER {param}"].bind(
+                        popup[f"COMPRESSOR||SLIDER {param}"].bind(
                             f"<Alt-{event}-{direction}>", f"||KEY ALT {direction.upper()} {event_id}"
                         )
-                        self.popup[f"COMPRESSOR||SLIDER {param}"].bind(
+                        popup[f"COMPRESSOR||SLIDER {param}"].bind(
                             f"<Control-Alt-{event}-{direction}>", f"||KEY CTRL ALT {direction.upper()} {event_id}"
                         )
-            self.popup[f"COMPRESSOR||SLIDER {param}"].bind("<Control-Shift-KeyPress-R>", "||KEY CTRL SHIFT R")
-        self.popup["MAKEUP"].bind("<FocusIn>", "||FOCUS IN")
-        self.popup["MAKEUP"].bind("<Return>", "||KEY ENTER")
-        self.popup["Exit"].bind("<FocusIn>", "||FOCUS IN")
-        self.popup["Exit"].bind("<Return>", "||KEY ENTER")
-        self.window.vm.observer.add(self.on_pdirty)
+            popup[f"COMPRESSOR||SLIDER {param}"].bind("<Control-Shift-KeyPress-R>", "||KEY CTRL SHIFT R")
+        popup.bind("<Control-z>", "CTRL-Z")
+        popup.bind("<Control-y>", "CTRL-Y")
+        popup["MAKEUP"].bind("<FocusIn>", "||FOCUS IN")
+        popup["MAKEUP"].bind("<Return>", "||KEY ENTER")
+        popup["Exit"].bind("<FocusIn>", "||FOCUS IN")
+        popup["Exit"].bind("<Return>", "||KEY ENTER")
+        return popup
+
+    def compressor(self, index, title=None):
+        self.window.controller.watch("comp", index)
+        self.popup = self.show(
+            ("compressor", index),
+            functools.partial(self._make_compressor, index, title),
+            functools.partial(self.refresh_strip, "COMPRESSOR", index),
+        )
         while True:
-            event, values = self.popup.read()
-            self.logger.debug(f"event::{event}")
-            self.logger.debug(f"values::{values}")
-            if event in (psg.WIN_CLOSED, "Exit"):
+            event, values, parsed_cmd = self.window.read_event(self.popup, f"compressor {index}", closing=CLOSING)
+            if parsed_cmd is None:
                 break
-            match parsed_cmd := self.window.parser.match.parseString(event):
-                case [["COMPRESSOR"], ["SLIDER", param]]:
-                    setattr(self.window.vm.strip[index].comp, param.lower(), values[event])
-                case [["COMPRESSOR"], ["SLIDER", param], ["FOCUS", "IN"]]:
-                    self.window.nvda.speak(f"{param} {values[f'COMPRESSOR||SLIDER {param}']}")
-                case [
-                    ["COMPRESSOR"],
-                    ["SLIDER", param],
-                    ["KEY", "LEFT" | "RIGHT" | "UP" | "DOWN" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        val = getattr(self.window.vm.strip[index].comp, param.lower())
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                if param == "KNEE":
-                                    val += 0.1
-                                else:
-                                    val += 1
-                            case "LEFT" | "DOWN":
-                                if param == "KNEE":
-                                    val -= 0.1
-                                else:
-                                    val -= 1
-
-                        val = CompSlider.check_bounds(param, val)
-
-                        setattr(self.window.vm.strip[index].comp, param.lower(), val)
-                        self.popup[f"COMPRESSOR||SLIDER {param}"].update(value=val)
-                        if param == "KNEE":
-                            self.window.nvda.speak(str(round(val, 2)))
-                        else:
-                            self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [
-                    ["COMPRESSOR"],
-                    ["SLIDER", param],
-                    ["KEY", "CTRL", "LEFT" | "RIGHT" | "UP" | "DOWN" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        val = getattr(self.window.vm.strip[index].comp, param.lower())
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                if param == "KNEE":
-                                    val += 0.3
-                                elif param == "RELEASE":
-                                    val += 5
-                                else:
-                                    val += 3
-                            case "LEFT" | "DOWN":
-                                if param == "KNEE":
-                                    val -= 0.3
-                                elif param == "RELEASE":
-                                    val -= 5
-                                else:
-                                    val -= 3
-
-                        val = CompSlider.check_bounds(param, val)
-
-                        setattr(self.window.vm.strip[index].comp, param.lower(), val)
-                        self.popup[f"COMPRESSOR||SLIDER {param}"].update(value=val)
-                        if param == "KNEE":
-                            self.window.nvda.speak(str(round(val, 2)))
-                        else:
-                            self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [
-                    ["COMPRESSOR"],
-                    ["SLIDER", param],
-                    ["KEY", "SHIFT", "LEFT" | "RIGHT" | "UP" | "DOWN" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        val = getattr(self.window.vm.strip[index].comp, param.lower())
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                if param == "KNEE":
-                                    val += 0.01
-                                else:
-                                    val += 0.1
-                            case "LEFT" | "DOWN":
-                                if param == "KNEE":
-                                    val -= 0.01
-                                else:
-                                    val -= 0.1
-
-                        val = CompSlider.check_bounds(param, val)
-
-                        setattr(self.window.vm.strip[index].comp, param.lower(), val)
-                        self.popup[f"COMPRESSOR||SLIDER {param}"].update(value=val)
-                        if param == "KNEE":
-                            self.window.nvda.speak(str(round(val, 2)))
-                        else:
-                            self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [
-                    ["COMPRESSOR"],
-                    ["SLIDER", "RELEASE"],
-                    ["KEY", "ALT", "LEFT" | "RIGHT" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        val = self.window.vm.strip[index].comp.release
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                val += 10
-                            case "LEFT" | "DOWN":
-                                val -= 10
-
-                        val = util.check_bounds(val, (0, 5000))
-                        self.window.vm.strip[index].comp.release = val
-                        self.popup[f"COMPRESSOR||SLIDER {param}"].update(value=val)
-                        self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [
-                    ["COMPRESSOR"],
-                    ["SLIDER", "RELEASE"],
-                    ["KEY", "CTRL", "ALT", "LEFT" | "RIGHT" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        val = self.window.vm.strip[index].comp.release
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                val += 50
-                            case "LEFT" | "DOWN":
-                                val -= 50
-
-                        val = util.check_bounds(val, (0, 5000))
-                        self.window.vm.strip[index].comp.release = val
-                        self.popup[f"COMPRESSOR||SLIDER {param}"].update(value=val)
-                        self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-
-                case [["COMPRESSOR"], ["SLIDER", "INPUT" | "OUTPUT" as direction, "GAIN"]]:
-                    if direction == "INPUT":
-                        self.window.vm.strip[index].comp.gainin = values[event]
-                    else:
-                        self.window.vm.strip[index].comp.gainout = values[event]
-                case [["COMPRESSOR"], ["SLIDER", "INPUT" | "OUTPUT" as direction, "GAIN"], ["FOCUS", "IN"]]:
-                    label = f"{direction} GAIN"
+            if self.window.dispatcher.dynamics(index, parsed_cmd, event, values):
+                continue
+            match parsed_cmd:
+                case [["COMPRESSOR"], ["SLIDER", *param], ["FOCUS", "IN"]]:
+                    label = " ".join(param)
                     self.window.nvda.speak(f"{label} {values[f'COMPRESSOR||SLIDER {label}']}")
-                case [
-                    ["COMPRESSOR"],
-                    ["SLIDER", "INPUT" | "OUTPUT" as direction, "GAIN"],
-                    ["KEY", "LEFT" | "RIGHT" | "UP" | "DOWN" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        if direction == "INPUT":
-                            val = self.window.vm.strip[index].comp.gainin
-                        else:
-                            val = self.window.vm.strip[index].comp.gainout
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                val += 1
-                            case "LEFT" | "DOWN":
-                                val -= 1
-
-                        val = util.check_bounds(val, (-24, 24))
-                        if direction == "INPUT":
-                            self.window.vm.strip[index].comp.gainin = val
-                        else:
-                            self.window.vm.strip[index].comp.gainout = val
-                        self.popup[f"COMPRESSOR||SLIDER {direction} GAIN"].update(value=val)
-                        self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [
-                    ["COMPRESSOR"],
-                    ["SLIDER", "INPUT" | "OUTPUT" as direction, "GAIN"],
-                    ["KEY", "CTRL", "LEFT" | "RIGHT" | "UP" | "DOWN" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        if direction == "INPUT":
-                            val = self.window.vm.strip[index].comp.gainin
-                        else:
-                            val = self.window.vm.strip[index].comp.gainout
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                val += 3
-                            case "LEFT" | "DOWN":
-                                val -= 3
-
-                        val = util.check_bounds(val, (-24, 24))
-                        if direction == "INPUT":
-                            self.window.vm.strip[index].comp.gainin = val
-                        else:
-                            self.window.vm.strip[index].comp.gainout = val
-                        self.popup[f"COMPRESSOR||SLIDER {direction} GAIN"].update(value=val)
-                        self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [
-                    ["COMPRESSOR"],
-                    ["SLIDER", "INPUT" | "OUTPUT" as direction, "GAIN"],
-                    ["KEY", "SHIFT", "LEFT" | "RIGHT" | "UP" | "DOWN" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        if direction == "INPUT":
-                            val = self.window.vm.strip[index].comp.gainin
-                        else:
-                            val = self.window.vm.strip[index].comp.gainout
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                val += 0.1
-                            case "LEFT" | "DOWN":
-                                val -= 0.1
-
-                        val = util.check_bounds(val, (-24, 24))
-                        if direction == "INPUT":
-                            self.window.vm.strip[index].comp.gainin = val
-                        else:
-                            self.window.vm.strip[index].comp.gainout = val
-                        self.popup[f"COMPRESSOR||SLIDER {direction} GAIN"].update(value=val)
-                        self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-
-                case [
-                    ["COMPRESSOR"],
-                    ["SLIDER", "INPUT" | "OUTPUT" as direction, "GAIN"],
-                    ["KEY", "CTRL", "SHIFT", "R"],
-                ]:
-                    if direction == "INPUT":
-                        self.window.vm.strip[index].comp.gainin = 0
-                    else:
-                        self.window.vm.strip[index].comp.gainout = 0
-                    self.popup[f"COMPRESSOR||SLIDER {direction} GAIN"].update(value=0)
-                    self.window.nvda.speak(str(0))
-                case [["COMPRESSOR"], ["SLIDER", param], ["KEY", "CTRL", "SHIFT", "R"]]:
-                    match param:
-                        case "RATIO":
-                            val = 1
-                        case "THRESHOLD":
-                            val = -20
-                        case "ATTACK":
-                            val = 10
-                        case "RELEASE":
-                            val = 50
-                        case "KNEE":
-                            val = 0.5
-                    setattr(self.window.vm.strip[index].comp, param.lower(), val)
-                    self.popup[f"COMPRESSOR||SLIDER {param}"].update(value=val)
-                    self.window.nvda.speak(str(round(val, 1)))
 
                 case ["MAKEUP"]:
                     val = not self.window.vm.strip[index].comp.makeup
@@ -606,13 +380,10 @@ class Popup:
                         self.window.nvda.speak(button)
                 case [_, ["KEY", "ENTER"]]:
                     self.popup.find_element_with_focus().click()
-            self.logger.debug(f"parsed::{parsed_cmd}")
-        self.window.vm.observer.remove(self.on_pdirty)
-        self.popup.close()
-
-    def gate(self, index, title=None):
-        self.index = index
+        self.hide(("compressor", index), event)
+        self.window.controller.unwatch("comp", index)
 
+    def _make_gate(self, index, title=None) -> psg.Window:
         def _make_gate_frame() -> psg.Frame:
             gate_layout = [
                 [LabelSliderAdvanced(self.window, index, param, GateSlider)]
@@ -626,44 +397,54 @@ class Popup:
             layout.append([step()])
         layout.append([psg.Button("Exit", size=(8, 1))])
 
-        self.popup = psg.Window(title, layout, return_keyboard_events=False, finalize=True)
+        popup = psg.Window(
+            title, layout, return_keyboard_events=False, enable_close_attempted_event=True, finalize=True
+        )
         buttonmenu_opts = {"takefocus": 1, "highlightthickness": 1}
         for param in ("THRESHOLD", "DAMPING", "BPSIDECHAIN", "ATTACK", "HOLD", "RELEASE"):
-            self.popup[f"GATE||SLIDER {param}"].Widget.config(**buttonmenu_opts)
-            self.popup[f"GATE||SLIDER {param}"].bind("<FocusIn>", "||FOCUS IN")
-            self.popup[f"GATE||SLIDER {param}"].bind("<FocusOut>", "||FOCUS OUT")
+            popup[f"GATE||SLIDER {param}"].Widget.config(**buttonmenu_opts)
+            popup[f"GATE||SLIDER {param}"].bind("<FocusIn>", "||FOCUS IN")
+            popup[f"GATE||SLIDER {param}"].bind("<FocusOut>", "||FOCUS OUT")
             for event in ("KeyPress", "KeyRelease"):
                 event_id = event.removeprefix("Key").upper()
                 for direction in ("Left", "Right", "Up", "Down"):
-                    self.popup[f"GATE||SLIDER {param}"].bind(
+                    popup[f"GATE||SLIDER {param}"].bind(
                         f"<{event}-{direction}>", f"||KEY {direction.upper()} {event_id}"
                     )
-                    self.popup[f"GATE||SLIDER {param}"].bind(
+                    popup[f"GATE||SLIDER {param}"].bind(
                         f"<Shift-{event}-{direction}>", f"||KEY SHIFT {direction.upper()} {event_id}"
                     )
-                    self.popup[f"GATE||SLIDER {param}"].bind(
+                    popup[f"GATE||SLIDER {param}"].bind(
                         f"<Control-{event}-{direction}>", f"||KEY CTRL {direction.upper()} {event_id}"
                     )
                     if param in ("BPSIDECHAIN", "ATTACK", "HOLD", "RELEASE"):
-                        self.popup[f"GATE||SLIDER {param}"].bind(
+                        popup[f"GATE||SLIDER {param}"].bind(
                             f"<Alt-{event}-{direction}>", f"||KEY ALT {direction.upper()} {event_id}"
                         )
-                        self.popup[f"GATE||SLIDER {param}"].bind(
+                        popup[f"GATE||SLIDER {param}"].bind(
                             f"<Control-Alt-{event}-{direction}>", f"||KEY CTRL ALT {direction.upper()} {event_id}"
                         )
-            self.popup[f"GATE||SLIDER {param}"].bind("<Control-Shift-KeyPress-R>", "||KEY CTRL SHIFT R")
-        self.popup["Exit"].bind("<FocusIn>", "||FOCUS IN")
-        self.popup["Exit"].bind("<Return>", "||KEY ENTER")
-        self.window.vm.observer.add(self.on_pdirty)
+            popup[f"GATE||SLIDER {param}"].bind("<Control-Shift-KeyPress-R>", "||KEY CTRL SHIFT R")
+        popup.bind("<Control-z>", "CTRL-Z")
+        popup.bind("<Control-y>", "CTRL-Y")
+        popup["Exit"].bind("<FocusIn>", "||FOCUS IN")
+        popup["Exit"].bind("<Return>", "||KEY ENTER")
+        return popup
+
+    def gate(self, index, title=None):
+        self.window.controller.watch("gate", index)
+        self.popup = self.show(
+            ("gate", index),
+            functools.partial(self._make_gate, index, title),
+            functools.partial(self.refresh_strip, "GATE", index),
+        )
         while True:
-            event, values = self.popup.read()
-            self.logger.debug(f"event::{event}")
-            self.logger.debug(f"values::{values}")
-            if event in (psg.WIN_CLOSED, "Exit"):
+            event, values, parsed_cmd = self.window.read_event(self.popup, f"gate {index}", closing=CLOSING)
+            if parsed_cmd is None:
                 break
-            match parsed_cmd := self.window.parser.match.parseString(event):
-                case [["GATE"], ["SLIDER", param]]:
-                    setattr(self.window.vm.strip[index].gate, param.lower(), values[event])
+            if self.window.dispatcher.dynamics(index, parsed_cmd, event, values):
+                continue
+            match parsed_cmd:
                 case [["GATE"], ["SLIDER", param], ["FOCUS", "IN"]]:
                     label_map = {
                         "DAMPING": "Damping Max",
@@ -671,152 +452,42 @@ class Popup:
                     }
                     self.window.nvda.speak(f"{label_map.get(param, param)} {values[f'GATE||SLIDER {param}']}")
 
-                case [
-                    ["GATE"],
-                    ["SLIDER", param],
-                    ["KEY", "LEFT" | "RIGHT" | "UP" | "DOWN" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        val = getattr(self.window.vm.strip[index].gate, param.lower())
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                val += 1
-                            case "LEFT" | "DOWN":
-                                val -= 1
-
-                        val = GateSlider.check_bounds(param, val)
-
-                        setattr(self.window.vm.strip[index].gate, param.lower(), val)
-                        self.popup[f"GATE||SLIDER {param}"].update(value=val)
-                        if param == "BPSIDECHAIN":
-                            self.window.nvda.speak(str(int(val)))
-                        else:
-                            self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [
-                    ["GATE"],
-                    ["SLIDER", param],
-                    ["KEY", "CTRL", "LEFT" | "RIGHT" | "UP" | "DOWN" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        val = getattr(self.window.vm.strip[index].gate, param.lower())
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                val += 3
-                            case "LEFT" | "DOWN":
-                                val -= 3
-
-                        val = GateSlider.check_bounds(param, val)
-
-                        setattr(self.window.vm.strip[index].gate, param.lower(), val)
-                        self.popup[f"GATE||SLIDER {param}"].update(value=val)
-                        if param == "BPSIDECHAIN":
-                            self.window.nvda.speak(str(int(val)))
-                        else:
-                            self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [
-                    ["GATE"],
-                    ["SLIDER", param],
-                    ["KEY", "SHIFT", "LEFT" | "RIGHT" | "UP" | "DOWN" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        val = getattr(self.window.vm.strip[index].gate, param.lower())
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                val += 0.1
-                            case "LEFT" | "DOWN":
-                                val -= 0.1
-
-                        val = GateSlider.check_bounds(param, val)
-
-                        setattr(self.window.vm.strip[index].gate, param.lower(), val)
-                        self.popup[f"GATE||SLIDER {param}"].update(value=val)
-                        if param == "BPSIDECHAIN":
-                            self.window.nvda.speak(str(int(val)))
-                        else:
-                            self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [
-                    ["GATE"],
-                    ["SLIDER", "BPSIDECHAIN" | "ATTACK" | "HOLD" | "RELEASE" as param],
-                    ["KEY", "ALT", "LEFT" | "RIGHT" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        val = getattr(self.window.vm.strip[index].gate, param.lower())
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                val += 10
-                            case "LEFT" | "DOWN":
-                                val -= 10
-
-                        val = GateSlider.check_bounds(param, val)
-                        setattr(self.window.vm.strip[index].gate, param.lower(), val)
-                        self.popup[f"GATE||SLIDER {param}"].update(value=val)
-                        if param == "BPSIDECHAIN":
-                            self.window.nvda.speak(str(int(val)))
-                        else:
-                            self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [
-                    ["GATE"],
-                    ["SLIDER", "BPSIDECHAIN" | "ATTACK" | "HOLD" | "RELEASE" as param],
-                    ["KEY", "CTRL", "ALT", "LEFT" | "RIGHT" as input_direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.window.vm.event.pdirty = False
-                        val = getattr(self.window.vm.strip[index].gate, param.lower())
-
-                        match input_direction:
-                            case "RIGHT" | "UP":
-                                val += 50
-                            case "LEFT" | "DOWN":
-                                val -= 50
-
-                        val = GateSlider.check_bounds(param, val)
-                        setattr(self.window.vm.strip[index].gate, param.lower(), val)
-                        self.popup[f"GATE||SLIDER {param}"].update(value=val)
-                        if param == "BPSIDECHAIN":
-                            self.window.nvda.speak(str(int(val)))
-                        else:
-                            self.window.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.window.vm.event.pdirty = True
-                case [["GATE"], ["SLIDER", param], ["KEY", "CTRL", "SHIFT", "R"]]:
-                    match param:
-                        case "THRESHOLD":
-                            val = -60
-                        case "DAMPING":
-                            val = -60
-                        case "BPSIDECHAIN":
-                            val = 100
-                        case "ATTACK":
-                            val = 0
-                        case "HOLD":
-                            val = 500
-                        case "RELEASE":
-                            val = 1000
-                    setattr(self.window.vm.strip[index].gate, param.lower(), val)
-                    self.popup[f"GATE||SLIDER {param}"].update(value=val)
-                    self.window.nvda.speak(str(round(val, 1)))
-
                 case [[button], ["FOCUS", "IN"]]:
                     self.window.nvda.speak(button)
                 case [_, ["KEY", "ENTER"]]:
                     self.popup.find_element_with_focus().click()
 
-            self.logger.debug(f"parsed::{parsed_cmd}")
-        self.window.vm.observer.remove(self.on_pdirty)
-        self.popup.close()
+        self.hide(("gate", index), event)
+        self.window.controller.unwatch("gate", index)
+
+    def show(self, key, build, refresh) -> psg.Window:
+        """
+        Shows the popup cached under key
+
+        It is built on first use, later it is unhidden with its values refreshed in one batch.
+        """
+        start = time.perf_counter()
+        if (popup := self.windows.get(key)) is None:
+            popup = self.windows[key] = build()
+        else:
+            refresh(popup)
+            popup.un_hide()
+            popup.TKroot.focus_force()
+        self.active = (popup, refresh)
+        self.shown = key
+        self.logger.debug(f"{key} shown after {(time.perf_counter() - start) * 1000:.1f}ms")
+        return popup
+
+    def hide(self, key, event):
+        """Hides the popup for reuse, a popup destroyed by the window manager is dropped instead"""
+        self.active = None
+        self.shown = None
+        if event == psg.WIN_CLOSED:
+            del self.windows[key]
+        else:
+            self.popup.hide()
+
+    def close(self):
+        for popup in self.windows.values():
+            popup.close()
+        self.windows.clear()
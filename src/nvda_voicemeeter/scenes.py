@@ -0,0 +1,75 @@
+"""
+Named snapshots of routing, switches, gains and knobs
+
+Scenes are stored in settings.json grouped by strip or bus, {"STRIP 0": {"A1": true, "SLIDER GAIN": -6.0}, ...},
+and recalled as one Voicemeeter script.
+"""
+
+from . import util
+
+_switches = {
+    **{f"A{i}": f"A{i}" for i in range(1, 6)},
+    **{f"B{i}": f"B{i}" for i in range(1, 4)},
+    "MONO": "Mono",
+    "SOLO": "Solo",
+    "MUTE": "Mute",
+    "MC": "MC",
+    "KARAOKE": "Karaoke",
+    "EQ": "EQ.on",
+}
+
+_modes = list(util._bus_mode_map)
+
+
+def capture(cache) -> dict:
+    """Groups the strip, bus and slider entries of the window cache by strip or bus"""
+    scene = {}
+    for key, val in (cache["strip"] | cache["bus"] | cache["sliders"]).items():
+        identifier, param = key.split("||")
+        scene.setdefault(identifier, {})[param] = val
+    return scene
+
+
+def flatten(scene) -> dict:
+    """Returns a scene keyed like the window cache"""
+    return {f"{identifier}||{param}": val for identifier, params in scene.items() for param, val in params.items()}
+
+
+def _encode(val) -> float:
+    """Numbers and switches as floats, bus modes by their position in the mode table"""
+    if isinstance(val, str):
+        return float(_modes.index(val)) if val in _modes else -1.0
+    return float(val)
+
+
+def diff(target, current, tolerance=1e-3) -> dict:
+    """
+    Returns the entries of target that differ from current, both keyed like the window cache
+
+    Values are encoded into two vectors and compared in one pass. Keys missing from current, parameters the
+    kind doesn't have, are dropped.
+    """
+    import numpy as np  # only loaded on first recall
+
+    keys = [key for key in target if key in current]
+    new = np.fromiter((_encode(target[key]) for key in keys), dtype=float, count=len(keys))
+    old = np.fromiter((_encode(current[key]) for key in keys), dtype=float, count=len(keys))
+    return {keys[i]: target[keys[i]] for i in np.flatnonzero(np.abs(new - old) > tolerance)}
+
+
+def _script_param(section, param, val, specs) -> str:
+    if param.startswith("SLIDER "):
+        return f"{specs[section][param.removeprefix('SLIDER ')].script}={val}"
+    if param == "MODE":
+        return f"mode.{val}=1"
+    return f"{_switches[param]}={int(val)}"
+
+
+def to_script(changes, specs) -> str:
+    """Returns cache keyed values as a Voicemeeter script, applied in a single vm.sendtext"""
+    lines = []
+    for key, val in changes.items():
+        identifier, param = key.split("||")
+        section, index = identifier.split()
+        lines.append(f"{section.capitalize()}[{index}].{_script_param(section, param, val, specs)}")
+    return ";".join(lines)
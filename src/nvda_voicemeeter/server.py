@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKLOG = 1 << 20
+
+
+def parse_batch(line) -> list:
+    """
+    Parses a line of ; separated commands into (key, value) pairs
+
+    A command is a window key, "STRIP 2||MUTE", optionally followed by =value, "BUS 0||SLIDER GAIN=-6".
+    Values are read as json where possible (true, -6, "amix"), anything else is kept as a string.
+    A key without a value is None, a toggle.
+    """
+    batch = []
+    for command in line.split(";"):
+        if not (command := command.strip()):
+            continue
+        key, sep, raw = command.partition("=")
+        if not sep:
+            batch.append((key.strip(), None))
+            continue
+        try:
+            val = json.loads(raw)
+        except ValueError:
+            val = raw.strip()
+        batch.append((key.strip(), val))
+    return batch
+
+
+def format_changes(changes) -> bytes:
+    """Formats changes as key=value lines, in the form parse_batch reads back"""
+    return "".join(f"{key}={json.dumps(val)}\n" for key, val in changes.items()).encode()
+
+
+def _resolve(future, result):
+    if not future.done():  # a batch answered after shutdown already replied to it
+        future.set_result(result)
+
+
+class CommandServer(threading.Thread):
+    """
+    Local asyncio server for scripted control
+
+    Clients send newline delimited batches of commands, each batch is posted to the loop that owns the controller
+    (the window's, or the controller's own when headless) and applied as one, the reply is "OK <n changed>" or
+    "ERR <reason>". A client that sends SUBSCRIBE is sent every parameter change as key=value lines from then on.
+    Only listens on the loopback interface. start() raises the OSError when the port can't be bound, batches still
+    waiting for a reply at stop() are answered "ERR shutting down".
+    """
+
+    def __init__(self, controller, port, host="127.0.0.1"):
+        super().__init__(name="CommandServer", daemon=True)
+        self.controller = controller
+        self.host = host
+        self.port = port
+        self.logger = logger.getChild(type(self).__name__)
+        self.loop = None
+        self.subscribers = set()
+        self._clients = {}
+        self._waiting = set()
+        self.error = None
+        self.stats = {"batches": 0, "commands": 0, "errors": 0}
+        self._ready = threading.Event()
+        self._stopped = None
+
+    def start(self):
+        super().start()
+        self._ready.wait()
+        if self.error is not None:
+            self.join()
+            raise self.error
+
+    def run(self):
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            self.logger.error(f"{type(e).__name__}: command server could not listen on {self.port}: {e}")
+            self.error = e
+            self._ready.set()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self.logger.debug(f"command server listening on {self.host}:{self.port}")
+        self._ready.set()
+        async with server:
+            await self._stopped.wait()
+            server.close()
+            for future in self._waiting:
+                _resolve(future, "ERR shutting down")
+            await asyncio.sleep(0)  # lets the handlers write those replies
+            for writer in self._clients:
+                writer.close()
+            if tasks := list(self._clients.values()):
+                _, stuck = await asyncio.wait(tasks, timeout=1)
+                for task in stuck:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle(self, reader, writer):
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while line := await reader.readline():
+                if not (text := line.decode().strip()):
+                    continue
+                if text == "SUBSCRIBE":
+                    self.subscribers.add(writer)
+                    writer.write(b"OK 0\n")
+                else:
+                    writer.write(f"{await self.submit(parse_batch(text))}\n".encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            self._clients.pop(writer, None)
+            writer.close()
+
+    async def submit(self, batch) -> str:
+        """Posts a batch to the controller's event loop, waiting for its reply"""
+        future = self.loop.create_future()
+
+        def reply(result):
+            try:
+                self.loop.call_soon_threadsafe(_resolve, future, result)
+            except RuntimeError:  # the loop closed, the client has gone
+                pass
+
+        self._waiting.add(future)
+        try:
+            self.controller.post("SERVER||BATCH", (batch, reply))
+            result = await future
+        finally:
+            self._waiting.discard(future)
+        self.stats["batches"] += 1
+        self.stats["commands"] += len(batch)
+        if result.startswith("ERR"):
+            self.stats["errors"] += 1
+        return result
+
+    def publish(self, changes):
+        """Sends changes to every subscriber, safe to call from any thread"""
+        if changes and self.subscribers:
+            self.loop.call_soon_threadsafe(self._publish, format_changes(changes))
+
+    def _publish(self, data):
+        for writer in list(self.subscribers):
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                # a subscriber that stopped reading is dropped rather than buffered without bound
+                self.subscribers.discard(writer)
+                writer.close()
+            else:
+                writer.write(data)
+
+    def stop(self):
+        if self.is_alive():
+            self.loop.call_soon_threadsafe(self._stopped.set)
+            self.join()
+        self.logger.debug(f"command server stats: {self.stats}")
@@ -0,0 +1,80 @@
+import gzip
+import json
+import logging
+import time
+
+from .dispatch import Dispatcher
+from .parser import Parser
+
+logger = logging.getLogger(__name__)
+
+FORMAT = 1
+
+
+class SessionRecorder:
+    """
+    Writes every event read by the main and popup loops to a gzipped json lines file
+
+    The first line is a header, each following line is [seconds since start, loop, event, values, focused key].
+    Only the event's own value and the selected tab are kept from values.
+    """
+
+    def __init__(self, path, kind):
+        self.logger = logger.getChild(type(self).__name__)
+        self.path = path
+        self.started = time.perf_counter()
+        self.events = 0
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._write({"format": FORMAT, "kind": kind, "started": time.strftime("%Y-%m-%dT%H:%M:%S")})
+
+    def _write(self, obj):
+        self._file.write(json.dumps(obj, separators=(",", ":"), default=repr) + "\n")
+
+    def record(self, loop, event, values, focus=None):
+        values = values or {}
+        subset = {key: values[key] for key in (event, "tabgroup") if key in values}
+        elapsed = round(time.perf_counter() - self.started, 4)
+        self._write([elapsed, loop, event, subset, getattr(focus, "Key", None)])
+        self.events += 1
+
+    def close(self):
+        self._file.close()
+        self.logger.debug(f"{self.events} events recorded to {self.path}")
+
+
+def read_session(path) -> tuple:
+    """Returns the header and a list of (seconds, loop, event, values, focused key) of a recorded session"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != FORMAT:
+            raise ValueError(f"{path} is not a recorded session of format {FORMAT}")
+        return header, [tuple(json.loads(line)) for line in f]
+
+
+class Replayer:
+    """
+    Feeds recorded events through the window's Dispatcher and a controller, no window needed
+
+    Only events that change parameters are replayed, the rest (focus, tabs, menus, popups opening) are counted as
+    skipped. Slider steps are coalesced per frame as in the app, on the loop whose after(ms, fn) is passed, the
+    caller runs its timers between events.
+    """
+
+    def __init__(self, controller, after):
+        self.controller = controller
+        self.dispatcher = Dispatcher(controller, after)
+        self.parser = Parser()
+        self.stats = {"replayed": 0, "skipped": 0}
+
+    def dispatch(self, loop, event, values, focus=None) -> bool:
+        """Replays one event, returns whether it did anything"""
+        done = False
+        if isinstance(event, str):
+            parsed = self.parser.match.parseString(event)
+            match loop.split():
+                case ["main"]:
+                    done = self.dispatcher.main(parsed, event, values, lambda: focus)
+                case ["compressor" | "gate", index]:
+                    done = self.dispatcher.dynamics(int(index), parsed, event, values)
+        self.stats["replayed" if done else "skipped"] += 1
+        return done
@@ -0,0 +1,67 @@
+import collections
+import logging
+import logging.handlers
+import queue
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TraceRecord:
+    """One event as read by a loop, formatted only when str() is called on it"""
+
+    __slots__ = ("time", "loop", "event", "values", "parsed")
+
+    def __init__(self, loop, event, values):
+        self.time = time.time()
+        self.loop = loop
+        self.event = event
+        self.values = values
+        self.parsed = None
+
+    def __str__(self):
+        stamp = f"{time.strftime('%H:%M:%S', time.localtime(self.time))}.{int(self.time % 1 * 1000):03d}"
+        return f"{stamp} {self.loop} event::{self.event} values::{self.values} parsed::{self.parsed}"
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        return record  # leave the formatting to the listener thread
+
+
+class EventTrace:
+    """
+    Ring buffer of the last events read by the main and popup loops
+
+    Records hold references to the event, its values and the parsed command, nothing is formatted until the trace
+    is dumped to the nvda_voicemeeter.trace logger. Given a path, that logger writes to the file through a queue,
+    so formatting and file i/o happen on a listener thread rather than the tk thread.
+    """
+
+    def __init__(self, size=200, path=None):
+        self.records = collections.deque(maxlen=size)
+        self.listener = None
+        if path is not None:
+            handler = logging.FileHandler(path, encoding="utf-8", delay=True)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            events = queue.SimpleQueue()
+            self.listener = logging.handlers.QueueListener(events, handler)
+            self.listener.start()
+            logger.addHandler(_LazyQueueHandler(events))
+            logger.setLevel(logging.DEBUG)
+            logger.propagate = False
+
+    def add(self, loop, event, values):
+        self.records.append(TraceRecord(loop, event, values))
+
+    def parsed(self, parsed_cmd):
+        self.records[-1].parsed = parsed_cmd
+
+    def dump(self, reason):
+        logger.debug("trace dump (%s), last %d events", reason, len(self.records))
+        for record in self.records:
+            logger.debug("%s", record)
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()
@@ -0,0 +1,58 @@
+import collections
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class UndoHistory:
+    """
+    Bounded undo and redo stacks of parameter deltas
+
+    An entry is a tuple of (key, old, new) deltas keyed like the window cache, most hold a single delta.
+    A merged change to the same key as the newest entry within merge_window seconds is folded into it,
+    so a run of slider steps is undone in one go.
+    """
+
+    def __init__(self, size=200, merge_window=2.0):
+        self.merge_window = merge_window
+        self.logger = logger.getChild(type(self).__name__)
+        self.undo_stack = collections.deque(maxlen=size)
+        self.redo_stack = collections.deque(maxlen=size)
+        self._last = 0.0
+
+    def record(self, key, old, new, merge=False):
+        self.record_many(((key, old, new),), merge=merge)
+
+    def record_many(self, deltas, merge=False):
+        deltas = tuple((key, old, new) for key, old, new in deltas if old is not None and old != new)
+        if not deltas:
+            return
+        now = time.monotonic()
+        if merge and len(deltas) == 1 and self.undo_stack and now - self._last < self.merge_window:
+            ((key, _, new),) = deltas
+            if len(last := self.undo_stack[-1]) == 1 and last[0][0] == key:
+                self.undo_stack.pop()
+                old = last[0][1]
+                deltas = ((key, old, new),) if old != new else ()
+        self._last = now
+        if deltas:
+            self.undo_stack.append(deltas)
+        self.redo_stack.clear()
+
+    def undo(self) -> tuple | None:
+        """Returns the newest entry's deltas as (key, value to restore) pairs"""
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        self._last = 0.0
+        return tuple((key, old) for key, old, _ in reversed(entry))
+
+    def redo(self) -> tuple | None:
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        self._last = 0.0
+        return tuple((key, new) for key, _, new in entry)
@@ -1,7 +1,5 @@
 from typing import Iterable
 
-import PySimpleGUI as psg
-
 
 def get_asio_input_spinbox_index(channel, num) -> int:
     if channel == 0:
@@ -102,6 +100,19 @@ def open_context_menu_for_buttonmenu(window, identifier) -> None:
     element.TKMenu.post(x, y)
 
 
+def has_focus(window) -> bool:
+    try:
+        return window.TKroot.focus_get() is not None
+    except KeyError:  # focus is held by a tk internal widget (menu, popdown)
+        return False
+
+
+def menu_unposted(window, identifier) -> bool:
+    if window[identifier].TKMenu.winfo_ismapped():
+        return False
+    return has_focus(window)
+
+
 def get_channel_identifier_list(vm) -> list:
     identifiers = []
     for i in range(vm.kind.phys_in):
@@ -200,21 +211,28 @@ def _get_bus_assignments(kind) -> list:
     return [f"A{i}" for i in range(1, kind.phys_out + 1)] + [f"B{i}" for i in range(1, kind.virt_out + 1)]
 
 
-psg.theme_add_new(
-    "HighContrast",
-    {
-        "BACKGROUND": "#FFFFFF",
-        "TEXT": "#000000",
-        "INPUT": "#FAF9F6",
-        "TEXT_INPUT": "#000000",
-        "SCROLL": "#FAF9F6",
-        "BUTTON": ("#000000", "#FFFFFF"),
-        "PROGRESS": ("#000000", "#FFFFFF"),
-        "BORDER": 2,
-        "SLIDER_DEPTH": 3,
-        "PROGRESS_DEPTH": 0,
-    },
-)
+def set_theme(name) -> None:
+    """Registers the custom themes and applies name, called when the window is drawn rather than at import"""
+    import PySimpleGUI as psg  # util is shared with the headless controller
+
+    psg.theme_add_new(
+        "HighContrast",
+        {
+            "BACKGROUND": "#FFFFFF",
+            "TEXT": "#000000",
+            "INPUT": "#FAF9F6",
+            "TEXT_INPUT": "#000000",
+            "SCROLL": "#FAF9F6",
+            "BUTTON": ("#000000", "#FFFFFF"),
+            "PROGRESS": ("#000000", "#FFFFFF"),
+            "BORDER": 2,
+            "SLIDER_DEPTH": 3,
+            "PROGRESS_DEPTH": 0,
+        },
+    )
+    psg.theme(name)
+    if psg.theme() == "HighContrast":
+        psg.set_options(font=("Arial", 14))
 
 
 def get_themes_list() -> list:
@@ -1,20 +1,34 @@
-import json
+import functools
 import logging
+import re
+import threading
+import time
 from pathlib import Path
 
 import PySimpleGUI as psg
 
-from . import configuration, models, util
+from . import configuration, util
+from .accounting import CallAccounting
 from .builder import Builder
+from .controller import Controller
+from .dispatch import Dispatcher
+from .latency import LatencyRecorder
+from .library import ConfigLibrary
 from .nvda import Nvda
 from .parser import Parser
 from .popup import Popup
+from .session import SessionRecorder
+from .trace import EventTrace
 
 logger = logging.getLogger(__name__)
 
-psg.theme(configuration.get("default_theme", "Dark Blue 3"))
-if psg.theme() == "HighContrast":
-    psg.set_options(font=("Arial", 14))
+METER_IDLE_MS = 10000
+
+HISTORY_SECONDS = 60
+
+HISTORY_SUMMARY_SECONDS = 10
+
+STARTED = time.perf_counter()
 
 
 class NVDAVMWindow(psg.Window):
@@ -25,21 +39,54 @@ class NVDAVMWindow(psg.Window):
         self.kind = self.vm.kind
         self.logger = logger.getChild(type(self).__name__)
         self.logger.debug(f"loaded with theme: {psg.theme()}")
-        self.cache = {
-            "hw_ins": models._make_hardware_ins_cache(self.vm),
-            "hw_outs": models._make_hardware_outs_cache(self.vm),
-            "strip": models._make_param_cache(self.vm, "strip"),
-            "bus": models._make_param_cache(self.vm, "bus"),
-            "labels": models._make_label_cache(self.vm),
-            "asio": models._make_patch_asio_cache(self.vm),
-            "insert": models._make_patch_insert_cache(self.vm),
-        }
-        self.nvda = Nvda()
-        self.parser = Parser()
+        self.accounting = None
+        if configuration.get("call_accounting", False):
+            self.accounting = CallAccounting(vm)
+            self.accounting.begin("startup")
+        self.controller = Controller(
+            vm,
+            speak=functools.partial(self.announce, ready=functools.partial(util.has_focus, self)),
+            post=self.write_event_value,
+        )
+        self.controller.add_view(self.on_changed)
+        # the state lives in the controller, shared with popups and the builder
+        self.specs = self.controller.specs
+        self.cache = self.controller.cache
+        self.writer = self.controller.writer
+        self.undo_history = self.controller.undo_history
+        self._meter_idle = None
         self.popup = Popup(self)
+        self.library = ConfigLibrary(
+            Path.home() / "Documents" / "Voicemeeter", configuration.store.path.with_name("library.json")
+        )
+        self.configs = self.library.for_kind(self.kind.name)
         self.builder = Builder(self)
         layout = self.builder.run()
         super().__init__(title, layout, return_keyboard_events=False, finalize=True)
+        self.logger.debug(f"first frame drawn {(time.perf_counter() - STARTED) * 1000:.1f}ms after import")
+        self.nvda = Nvda()
+        self.parser = Parser()
+        self.dispatcher = Dispatcher(
+            self.controller,
+            self.TKroot.after,
+            speak=self.nvda.speak,
+            move=self.move_slider,
+            announce=lambda text, key: self.announce(text, ready=functools.partial(util.menu_unposted, self, key)),
+        )
+        self.latency = None
+        self.loop_timers = {}
+        if configuration.get("latency_stats", False):
+            self.latency = LatencyRecorder()
+            self.latency.instrument(self.vm, ("get", "set", "sendtext"), "vm")
+            self.latency.instrument(self.nvda, ("speak",), "speech")
+        trace_file = configuration.get("trace_file")
+        self.trace = EventTrace(path=configuration.store.path.with_name(trace_file) if trace_file else None)
+        self.session = None
+        if configuration.get("record_session", False):
+            self.session = SessionRecorder(
+                configuration.store.path.with_name(f"session-{time.strftime('%Y%m%d-%H%M%S')}.jsonl.gz"),
+                self.kind.name,
+            )
         buttonmenu_opts = {"takefocus": 1, "highlightthickness": 1}
         for i in range(self.kind.phys_in):
             self[f"HARDWARE IN||{i + 1}"].Widget.config(**buttonmenu_opts)
@@ -64,65 +111,223 @@ class NVDAVMWindow(psg.Window):
         self["tabgroup"].set_focus()
 
     def __enter__(self):
-        settings_path = configuration.SETTINGS
-        if settings_path.exists():
-            try:
-                defaultconfig = Path(configuration.get("default_config", ""))  # coerce the type
-                if defaultconfig.is_file() and defaultconfig.exists():
-                    self.vm.set("command.load", str(defaultconfig))
-                    self.logger.debug(f"config {defaultconfig} loaded")
-                    self.TKroot.after(
-                        200,
-                        self.nvda.speak,
-                        f"config {defaultconfig.stem} has been loaded",
-                    )
-            except json.JSONDecodeError:
-                self.logger.debug("no default_config in settings.json. silently continuing...")
-
-        self.vm.init_thread()
-        self.vm.observer.add(self.on_pdirty)
+        if (defaultconfig := self.controller.load_default_config()) is not None:
+            self.announce(
+                f"config {defaultconfig.stem} has been loaded",
+                ready=self.TKroot.winfo_viewable,
+            )
+
+        self.controller.start()
+        self.refresh_library()
         self.TKroot.after(1000, self.enable_parameter_updates)
+        if configuration.get("level_alerts", False):
+            self.detector.start()
+        if configuration.get("level_history", False):
+            self.history.start()
 
         return self
 
     def enable_parameter_updates(self):
         self.vm.event.pdirty = True
 
+    def announce(self, text, ready=None, timeout=200):
+        """
+        Speaks text once the tk event queue is idle and ready() is true
+
+        Speech is never held back for longer than timeout ms.
+        """
+        start = time.perf_counter()
+
+        def _poll():
+            elapsed = (time.perf_counter() - start) * 1000
+            if ready is None or ready() or elapsed >= timeout:
+                self.nvda.speak(text)
+                self.logger.debug(f"announced after {elapsed:.1f}ms: {text}")
+            else:
+                self.TKroot.after(10, _poll)
+
+        self.TKroot.after_idle(_poll)
+
     def __exit__(self, exc_type, exc_value, traceback):
-        self.vm.end_thread()
+        if "detector" in self.__dict__:
+            self.detector.stop()
+        if "history" in self.__dict__:
+            self.history.stop()
+        if "meter" in self.__dict__:
+            self.meter.stop()
+        self.popup.close()
+        self.controller.stop()
+        if self.latency is not None:
+            self.latency.dump(self.latency_path)
+        if self.accounting is not None:
+            self.accounting.dump(configuration.store.path.with_name("calls.json"))
+        if self.session is not None:
+            self.session.close()
+        self.trace.dump("exception" if exc_type is not None else "exit")
+        self.trace.close()
         self.close()
 
-    def on_pdirty(self):
-        self.cache = {
-            "hw_ins": models._make_hardware_ins_cache(self.vm),
-            "hw_outs": models._make_hardware_outs_cache(self.vm),
-            "strip": models._make_param_cache(self.vm, "strip"),
-            "bus": models._make_param_cache(self.vm, "bus"),
-            "labels": models._make_label_cache(self.vm),
-            "asio": models._make_patch_asio_cache(self.vm),
-            "insert": models._make_patch_insert_cache(self.vm),
-        }
-        for key, value in self.cache["labels"].items():
+    @functools.cached_property
+    def meter(self):
+        from .meter import LevelMeter  # numpy is only loaded once levels are asked for
+
+        return LevelMeter(self.vm)
+
+    def focused_channel(self) -> tuple | None:
+        """Returns (section, index) of the strip or bus owning the focused element"""
+        focus = self.find_element_with_focus()
+        if focus is None or not str(focus.key).startswith(("STRIP ", "BUS ")):
+            return None
+        section, index = focus.key.split("||")[0].split()
+        return section, int(index)
+
+    def speak_level(self):
+        """
+        Speaks the level of the focused strip or bus
+
+        Metering starts on the first request and stops once no level has been asked for in METER_IDLE_MS.
+        """
+        if (focused := self.focused_channel()) is None:
+            return
+        section, index = focused
+        self.meter.acquire("readout")
+        if self._meter_idle is not None:
+            self.TKroot.after_cancel(self._meter_idle)
+        self._meter_idle = self.TKroot.after(METER_IDLE_MS, functools.partial(self.meter.release, "readout"))
+        label = self.cache["labels"][f"{section} {index}||LABEL"]
+        self.nvda.speak(f"{label} {self.meter.describe(section, index)}")
+
+    @functools.cached_property
+    def detector(self):
+        from .meter import LevelDetector
+
+        # alerts are raised on the level thread, hand them to the event loop
+        return LevelDetector(self.meter, lambda *alert: self.write_event_value("LEVEL||ALERT", alert))
+
+    def toggle_level_alerts(self):
+        """Turns clip and silence alerts on or off, the choice is kept in settings.json"""
+        if self.detector.running:
+            self.detector.stop()
+        else:
+            self.detector.start()
+        configuration.set("level_alerts", self.detector.running)
+        self.nvda.speak(f"level alerts {'on' if self.detector.running else 'off'}")
+
+    def speak_level_alert(self, section, index, alert):
+        label = self.cache["labels"][f"{section} {index}||LABEL"]
+        self.nvda.speak(f"{label} {alert}")
+
+    @functools.cached_property
+    def history(self):
+        from .meter import LevelHistory
+
+        return LevelHistory(self.meter, seconds=HISTORY_SECONDS)
+
+    def toggle_level_history(self):
+        """Starts or stops recording level history, the choice is kept in settings.json"""
+        if self.history.running:
+            self.history.stop()
+        else:
+            self.history.start()
+        configuration.set("level_history", self.history.running)
+        self.nvda.speak(f"level history {'on' if self.history.running else 'off'}")
+
+    def speak_level_history(self, loudest=False):
+        """
+        Speaks the average and peak level of the focused strip or bus over the last HISTORY_SUMMARY_SECONDS
+
+        With loudest, speaks the loudest strip or bus of the focused section over the whole history instead.
+        """
+        if (focused := self.focused_channel()) is None:
+            return
+        if not self.history.running:
+            self.nvda.speak("level history is off")
+            return
+        section, index = focused
+        if loudest:
+            if (result := self.history.loudest(section, HISTORY_SECONDS)) is None:
+                self.nvda.speak("no level history yet")
+                return
+            index, rms = result
+            label = self.cache["labels"][f"{section} {index}||LABEL"]
+            self.nvda.speak(f"loudest in the last {HISTORY_SECONDS} seconds {label}, average {round(rms)} dB")
+            return
+        label = self.cache["labels"][f"{section} {index}||LABEL"]
+        if (result := self.history.summary(section, index, HISTORY_SUMMARY_SECONDS)) is None:
+            self.nvda.speak("no level history yet")
+            return
+        peak, rms = result
+        self.nvda.speak(
+            f"{label} last {HISTORY_SUMMARY_SECONDS} seconds, average {round(rms)} dB, peak {round(peak)} dB"
+        )
+
+    @property
+    def latency_path(self) -> Path:
+        return configuration.store.path.with_name("latency.json")
+
+    def save_latency_stats(self):
+        """Writes the latency histograms gathered so far to latency.json, next to settings.json"""
+        if self.latency is None:
+            self.nvda.speak("latency stats are off")
+            return
+        self.latency.dump(self.latency_path)
+        self.nvda.speak(f"latency stats for {len(self.latency.histograms)} events saved")
+
+    def save_scene(self):
+        data = self.popup.get_text("Scene name", title="Save Scene")
+        if not (name := " ".join(re.findall(r"[A-Za-z0-9]+", data.get("Edit", "")))):
+            return
+        self.controller.save_scene(name)
+        self["menus"].update(menu_definition=self.builder.make_menu_def())
+
+    def delete_scene(self):
+        data = self.popup.get_text("Scene name", title="Delete Scene")
+        if self.controller.delete_scene(" ".join(re.findall(r"[A-Za-z0-9]+", data.get("Edit", "")))):
+            self["menus"].update(menu_definition=self.builder.make_menu_def())
+
+    def refresh_library(self):
+        """Brings the config library up to date off the gui thread, the menu is rebuilt if anything changed"""
+
+        def refresh():
+            if self.library.refresh():
+                self.write_event_value("LIBRARY||READY", None)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def load_config(self, filepath, summary=""):
+        self.controller.load_config(filepath)
+        self.announce(
+            ", ".join(filter(None, (f"config file {filepath.stem} has been loaded", summary))),
+            ready=lambda: util.has_focus(self),
+        )
+
+    def run_batch(self, batch, reply):
+        self.dispatcher.move_sliders(self.controller.run_batch(batch, reply).items())
+
+    def move_slider(self, key, val):
+        """Moves the widget of a slider, those of the compressor and gate only while their popup is shown"""
+        if key.count("||") == 1:
+            self[key].update(value=val)
+        else:
+            self.popup.move_slider(key, val)
+
+    def focused_key(self) -> str | None:
+        return getattr(self.find_element_with_focus(), "Key", None)
+
+    def on_changed(self, changed):
+        """Redraws the widgets whose cache entries changed on a controller refresh"""
+        for key, value in changed["labels"].items():
             self[key].update(value=value)
             self[f"{key}||SLIDER"].update(value=value)
-        for i in range(self.kind.num_strip):
-            self[f"STRIP {i}||SLIDER GAIN"].update(value=self.vm.strip[i].gain)
-            if self.kind.name != "basic":
-                self[f"STRIP {i}||SLIDER LIMIT"].update(value=self.vm.strip[i].limit)
-            for param in util.get_slider_params(i, self.kind):
-                if param in ("AUDIBILITY", "BASS", "MID", "TREBLE"):
-                    val = getattr(self.vm.strip[i], param.lower())
-                else:
-                    target = getattr(self.vm.strip[i], param.lower())
-                    val = target.knob
-                self[f"STRIP {i}||SLIDER {param}"].update(value=val)
-        for i in range(self.kind.num_bus):
-            self[f"BUS {i}||SLIDER GAIN"].update(value=self.vm.bus[i].gain)
+        for key, value in changed["sliders"].items():
+            if not self.controller.is_pending(key):
+                self[key].update(value=value)
         if self.kind.name != "basic":
-            for key, value in self.cache["insert"].items():
+            for key, value in changed["insert"].items():
                 identifier, i = key.split("||")
                 partial = util.get_channel_identifier_list(self.vm)[int(i)]
                 self[f"{identifier}||{partial}"].update(value=value)
+        self.popup.on_pdirty(changed)
 
     def register_events(self):
         """Registers events for widgets"""
@@ -145,6 +350,19 @@ class NVDAVMWindow(psg.Window):
         self.bind("<Control-o>", "CTRL-O")
         self.bind("<Control-s>", "CTRL-S")
         self.bind("<Control-m>", "CTRL-M")
+        self.bind("<Control-e>", "CTRL-E")
+        self.bind("<Control-Shift-KeyPress-E>", "CTRL-SHIFT-E")
+        self.bind("<Control-h>", "CTRL-H")
+        self.bind("<Control-Shift-KeyPress-H>", "CTRL-SHIFT-H")
+        self.bind("<Control-Alt-h>", "CTRL-ALT-H")
+        self.bind("<Control-Alt-l>", "CTRL-ALT-L")
+        self.bind("<Control-Alt-t>", "CTRL-ALT-T")
+        for i in range(1, 10):
+            self.bind(f"<Control-F{i}>", f"CTRL-F{i}")
+        for i in range(1, 10):
+            self.bind(f"<Control-Shift-F{i}>", f"CTRL-SHIFT-F{i}")
+        self.bind("<Control-z>", "CTRL-Z")
+        self.bind("<Control-y>", "CTRL-Y")
 
         self.bind("<Control-g>", "GAIN MODE")
         self.bind("<Control-b>", "BASS MODE")
@@ -280,44 +498,49 @@ class NVDAVMWindow(psg.Window):
                     )
             self[f"BUS {i}||SLIDER GAIN"].bind("<Control-Shift-KeyPress-R>", "||KEY CTRL SHIFT R")
 
+    def read_event(self, win, loop, closing=(psg.WIN_CLOSED,)) -> tuple:
+        """
+        Reads the next event of win, the main window or a popup, for the event loop named loop
+
+        The event is timed, counted, recorded and traced when those are enabled. Returns (event, values, parsed),
+        parsed is None for the events in closing, on which the loop should end.
+        """
+        timer = None
+        if self.latency is not None:
+            if (timer := self.loop_timers.get(loop)) is None:
+                timer = self.loop_timers[loop] = self.latency.loop(loop)
+            timer.wait()
+        event, values = win.read()
+        if timer:
+            timer.received(event)
+        if self.accounting:
+            self.accounting.event(loop, event)
+        if self.session:
+            self.session.record(loop, event, values, win.find_element_with_focus())
+        self.trace.add(loop, event, values)
+        if event in closing:
+            return event, values, None
+        parsed = self.parser.match.parseString(event)
+        self.trace.parsed(parsed)
+        if timer:
+            timer.parsed()
+        return event, values, parsed
+
     def run(self):
         """
         Parses the event string and matches it to events
 
         Main thread will shutdown once a close or exit event occurs
         """
-        mode = None
-
         while True:
-            event, values = self.read()
-            self.logger.debug(f"event::{event}")
-            self.logger.debug(f"values::{values}")
-            if event in (psg.WIN_CLOSED, "Exit"):
+            event, values, parsed_cmd = self.read_event(self, "main", closing=(psg.WIN_CLOSED, "Exit"))
+            if parsed_cmd is None:
                 break
-            elif event in util.get_slider_modes():
-                mode = event
-                self.nvda.speak(f"{mode} enabled")
-                self.logger.debug(f"entered slider mode {mode}")
-                continue
-            elif event == "ESCAPE":
-                if mode:
-                    self.nvda.speak(f"{mode} disabled")
-                    self.logger.debug(f"exited from slider mode {mode}")
-                    mode = None
+            # parameter changes (sliders, switches, slider modes, scenes, undo) are shared with the replayer
+            if self.dispatcher.main(parsed_cmd, event, values, self.focused_key):
                 continue
 
-            match parsed_cmd := self.parser.match.parseString(event):
-                # Slider mode
-                case [["ALT", "LEFT" | "RIGHT" | "UP" | "DOWN" as direction], ["PRESS" | "RELEASE" as e]]:
-                    if mode:
-                        self.write_event_value(f"SLIDER MODE {direction}||{e}", mode.split()[0])
-                case [
-                    ["ALT", "SHIFT" | "CTRL" as modifier, "LEFT" | "RIGHT" | "UP" | "DOWN" as direction],
-                    ["PRESS" | "RELEASE" as e],
-                ]:
-                    if mode:
-                        self.write_event_value(f"SLIDER MODE {modifier} {direction}||{e}", mode.split()[0])
-
+            match parsed_cmd:
                 # Focus tabgroup
                 case ["CTRL-TAB"] | ["CTRL-SHIFT-TAB"]:
                     self["tabgroup"].set_focus()
@@ -385,31 +608,6 @@ class NVDAVMWindow(psg.Window):
                     if focus := self.find_element_with_focus():
                         identifier, param = focus.Key.split("||")
                         self.write_event_value(f"{identifier}||MUTE", None)
-                case [["SLIDER", "MODE", direction], ["PRESS" | "RELEASE" as e]]:
-                    if values["tabgroup"] not in ("tab||Physical Strip", "tab||Virtual Strip", "tab||Buses"):
-                        continue
-                    param = values[event]
-                    if focus := self.find_element_with_focus():
-                        identifier, partial = focus.Key.split("||")
-                        _, index = identifier.split()
-                        if param in util.get_full_slider_params(int(index), self.kind):
-                            if "SLIDER" not in partial:
-                                self.write_event_value(f"{identifier}||SLIDER {param}||KEY {direction} {e}", None)
-                case [
-                    ["SLIDER", "MODE", "SHIFT" | "CTRL" as modifier, direction],
-                    ["PRESS" | "RELEASE" as e],
-                ]:
-                    if values["tabgroup"] not in ("tab||Physical Strip", "tab||Virtual Strip", "tab||Buses"):
-                        continue
-                    param = values[event]
-                    if focus := self.find_element_with_focus():
-                        identifier, partial = focus.Key.split("||")
-                        _, index = identifier.split()
-                        if param in util.get_full_slider_params(int(index), self.kind):
-                            if "SLIDER" not in partial:
-                                self.write_event_value(
-                                    f"{identifier}||SLIDER {param}||KEY {modifier} {direction} {e}", None
-                                )
 
                 # Rename popups
                 case ["F2"]:
@@ -442,6 +640,25 @@ class NVDAVMWindow(psg.Window):
                                     self[f"BUS {index}||LABEL"].update(value=label)
                                     self.cache["labels"][f"BUS {index}||LABEL"] = label
 
+                # Levels
+                case ["CTRL-E"]:
+                    self.speak_level()
+                case ["CTRL-SHIFT-E"]:
+                    self.toggle_level_alerts()
+                case [["LEVEL"], ["ALERT"]]:
+                    self.speak_level_alert(*values[event])
+                case ["CTRL-H"]:
+                    self.speak_level_history()
+                case ["CTRL-SHIFT-H"]:
+                    self.speak_level_history(loudest=True)
+                case ["CTRL-ALT-H"]:
+                    self.toggle_level_history()
+                case ["CTRL-ALT-L"]:
+                    self.save_latency_stats()
+                case ["CTRL-ALT-T"]:
+                    self.trace.dump("requested")
+                    self.nvda.speak(f"last {len(self.trace.records)} events traced")
+
                 # Advanced popups (settings, comp, gate)
                 case ["CTRL-A"]:
                     match values["tabgroup"]:
@@ -463,11 +680,7 @@ class NVDAVMWindow(psg.Window):
                 case [["Restart", "Audio", "Engine"], ["MENU"]]:
                     self.perform_long_operation(self.vm.command.restart, "ENGINE RESTART||END")
                 case [["ENGINE", "RESTART"], ["END"]]:
-                    self.TKroot.after(
-                        200,
-                        self.nvda.speak,
-                        "Audio Engine restarted",
-                    )
+                    self.announce("Audio Engine restarted", ready=lambda: util.has_focus(self))
                 case [["Save", "Settings"], ["MENU"]]:
                     initial_folder = Path.home() / "Documents" / "Voicemeeter"
                     if filepath := self.popup.save_as(
@@ -475,11 +688,10 @@ class NVDAVMWindow(psg.Window):
                     ):
                         self.vm.set("command.save", str(filepath))
                         self.logger.debug(f"saving config file to {filepath}")
-                        self.TKroot.after(
-                            200,
-                            self.nvda.speak,
-                            f"config file {filepath.stem} has been saved",
+                        self.announce(
+                            f"config file {filepath.stem} has been saved", ready=lambda: util.has_focus(self)
                         )
+                        self.TKroot.after(1000, self.refresh_library)  # give voicemeeter time to write it
                 case [["Load", "Settings"], ["MENU"]]:
                     initial_folder = Path.home() / "Documents" / "Voicemeeter"
                     if filepath := psg.popup_get_file(
@@ -489,16 +701,7 @@ class NVDAVMWindow(psg.Window):
                         no_window=True,
                         file_types=(("XML", ".xml"),),
                     ):
-                        filepath = Path(filepath)
-                        self.vm.set("command.load", str(filepath))
-                        self.logger.debug(f"loading config file from {filepath}")
-                        for i in (25, 50):  # for the benefit of the sliders
-                            self.TKroot.after(i, self.on_pdirty)
-                        self.TKroot.after(
-                            200,
-                            self.nvda.speak,
-                            f"config file {filepath.stem} has been loaded",
-                        )
+                        self.load_config(Path(filepath))
                 case [["Load", "Settings", "on", "Startup"], ["MENU"]]:
                     initial_folder = Path.home() / "Documents" / "Voicemeeter"
                     if filepath := psg.popup_get_file(
@@ -510,27 +713,44 @@ class NVDAVMWindow(psg.Window):
                     ):
                         filepath = Path(filepath)
                         configuration.set("default_config", str(filepath))
-                        self.TKroot.after(
-                            200,
-                            self.nvda.speak,
-                            f"config {filepath.stem} set as default on startup",
+                        self.announce(
+                            f"config {filepath.stem} set as default on startup", ready=lambda: util.has_focus(self)
                         )
                     else:
                         configuration.delete("default_config")
                         self.logger.debug("default_config removed from settings.json")
 
+                case [_, ["MENU", "CONFIG", index]]:
+                    filepath = self.configs[int(index)]
+                    self.load_config(filepath, self.library.summary(filepath))
+                case [str(bind)] if re.fullmatch(r"CTRL-SHIFT-F\d", bind):
+                    if (i := int(bind.removeprefix("CTRL-SHIFT-F")) - 1) < len(self.configs):
+                        self.load_config(self.configs[i], self.library.summary(self.configs[i]))
+                case [["LIBRARY"], ["READY"]]:
+                    self.configs = self.library.for_kind(self.kind.name)
+                    self["menus"].update(menu_definition=self.builder.make_menu_def())
+
                 case [theme, ["MENU", "THEME"]]:
                     chosen = " ".join(theme)
                     if chosen == "Default":
                         chosen = "Dark Blue 3"
                     configuration.set("default_theme", chosen)
-                    self.TKroot.after(
-                        200,
-                        self.nvda.speak,
-                        f"theme {chosen} selected.",
-                    )
+                    self.announce(f"theme {chosen} selected.", ready=lambda: util.has_focus(self))
                     self.logger.debug(f"theme {chosen} selected")
 
+                case [["CONFIG"], ["VERIFY"]]:
+                    self.controller.verify_config(values[event])
+
+                # Command server
+                case [["SERVER"], ["BATCH"]]:
+                    self.run_batch(*values[event])
+
+                # Scenes
+                case [["Save", "Scene"], ["MENU"]]:
+                    self.save_scene()
+                case [["Delete", "Scene"], ["MENU"]]:
+                    self.delete_scene()
+
                 # Tabs
                 case ["tabgroup"] | [["tabgroup"], ["FOCUS", "IN"]]:
                     if self.find_element_with_focus() is None:
@@ -549,14 +769,16 @@ class NVDAVMWindow(psg.Window):
                     match selection.split(":"):
                         case [device_name]:
                             setattr(self.vm.strip[index].device, "wdm", "")
-                            self.TKroot.after(200, self.nvda.speak, f"HARDWARE IN {key} device selection removed")
+                            self.announce(
+                                f"HARDWARE IN {key} device selection removed",
+                                ready=functools.partial(util.menu_unposted, self, f"HARDWARE IN||{key}"),
+                            )
                         case [driver, device_name]:
                             setattr(self.vm.strip[index].device, driver, device_name.lstrip())
                             phonetic = {"mme": "em em e"}
-                            self.TKroot.after(
-                                200,
-                                self.nvda.speak,
+                            self.announce(
                                 f"HARDWARE IN {key} set {phonetic.get(driver, driver)} {device_name}",
+                                ready=functools.partial(util.menu_unposted, self, f"HARDWARE IN||{key}"),
                             )
                 case [["HARDWARE", "IN"], [key], ["FOCUS", "IN"]]:
                     if self.find_element_with_focus() is not None:
@@ -571,14 +793,16 @@ class NVDAVMWindow(psg.Window):
                     match selection.split(":"):
                         case [device_name]:
                             setattr(self.vm.bus[index].device, "wdm", "")
-                            self.TKroot.after(200, self.nvda.speak, f"HARDWARE OUT {key} device selection removed")
+                            self.announce(
+                                f"HARDWARE OUT {key} device selection removed",
+                                ready=functools.partial(util.menu_unposted, self, f"HARDWARE OUT||{key}"),
+                            )
                         case [driver, device_name]:
                             setattr(self.vm.bus[index].device, driver, device_name.lstrip())
                             phonetic = {"mme": "em em e"}
-                            self.TKroot.after(
-                                200,
-                                self.nvda.speak,
+                            self.announce(
                                 f"HARDWARE OUT {key} set {phonetic.get(driver, driver)} {device_name}",
+                                ready=functools.partial(util.menu_unposted, self, f"HARDWARE OUT||{key}"),
                             )
                 case [["HARDWARE", "OUT"], [key], ["FOCUS", "IN"]]:
                     if self.find_element_with_focus() is not None:
@@ -591,7 +815,7 @@ class NVDAVMWindow(psg.Window):
                     val = values[f"PATCH COMPOSITE||{key}"]
                     index = int(key[-1]) - 1
                     self.vm.patch.composite[index].set(util.get_patch_composite_list(self.kind).index(val) + 1)
-                    self.TKroot.after(200, self.nvda.speak, val)
+                    self.announce(val, ready=functools.partial(util.menu_unposted, self, f"PATCH COMPOSITE||{key}"))
                 case [["PATCH", "COMPOSITE"], [key], ["FOCUS", "IN"]]:
                     if self.find_element_with_focus() is not None:
                         if values[f"PATCH COMPOSITE||{key}"]:
@@ -644,26 +868,6 @@ class NVDAVMWindow(psg.Window):
                     self.find_element_with_focus().click()
 
                 # Strip Params
-                case [["STRIP", index], [param]]:
-                    match param:
-                        case "KARAOKE":
-                            opts = ["off", "k m", "k 1", "k 2", "k v"]
-                            next_val = self.vm.strip[int(index)].k + 1
-                            if next_val == len(opts):
-                                next_val = 0
-                            self.vm.strip[int(index)].k = next_val
-                            self.cache["strip"][f"STRIP {index}||{param}"] = next_val
-                            self.nvda.speak(opts[next_val])
-                        case output if param in util._get_bus_assignments(self.kind):
-                            val = not self.cache["strip"][f"STRIP {index}||{output}"]
-                            setattr(self.vm.strip[int(index)], output, val)
-                            self.cache["strip"][f"STRIP {index}||{output}"] = val
-                            self.nvda.speak("on" if val else "off")
-                        case _:
-                            val = not self.cache["strip"][f"STRIP {index}||{param}"]
-                            setattr(self.vm.strip[int(index)], param.lower(), val)
-                            self.cache["strip"][f"STRIP {index}||{param}"] = val
-                            self.nvda.speak("on" if val else "off")
                 case [["STRIP", index], [param], ["FOCUS", "IN"]]:
                     if self.find_element_with_focus() is not None:
                         val = self.cache["strip"][f"STRIP {index}||{param}"]
@@ -679,35 +883,6 @@ class NVDAVMWindow(psg.Window):
                     self.find_element_with_focus().click()
 
                 # Strip Sliders
-                case [
-                    ["STRIP", index],
-                    [
-                        "SLIDER",
-                        "GAIN"
-                        | "COMP"
-                        | "GATE"
-                        | "DENOISER"
-                        | "AUDIBILITY"
-                        | "LIMIT"
-                        | "BASS"
-                        | "MID"
-                        | "TREBLE" as param,
-                    ],
-                ]:
-                    val = values[event]
-                    match param:
-                        case "GAIN":
-                            self.vm.strip[int(index)].gain = val
-                        case "COMP" | "GATE" | "DENOISER":
-                            target = getattr(self.vm.strip[int(index)], param.lower())
-                            target.knob = val
-                        case "AUDIBILITY":
-                            self.vm.strip[int(index)].audibility = val
-                        case "LIMIT":
-                            val = int(val)
-                            self.vm.strip[int(index)].limit = val
-                        case "BASS" | "MID" | "TREBLE":
-                            setattr(self.vm.strip[int(index)], param.lower(), val)
                 case [
                     ["STRIP", index],
                     [
@@ -737,259 +912,8 @@ class NVDAVMWindow(psg.Window):
                     ["FOCUS", "OUT"],
                 ]:
                     pass
-                case [
-                    ["STRIP", index],
-                    [
-                        "SLIDER",
-                        "GAIN"
-                        | "COMP"
-                        | "GATE"
-                        | "DENOISER"
-                        | "AUDIBILITY"
-                        | "LIMIT"
-                        | "BASS"
-                        | "MID"
-                        | "TREBLE" as param,
-                    ],
-                    ["KEY", "LEFT" | "RIGHT" | "UP" | "DOWN" as direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.vm.event.pdirty = False
-                        match param:
-                            case "GAIN":
-                                val = self.vm.strip[int(index)].gain
-                            case "COMP" | "GATE" | "DENOISER":
-                                target = getattr(self.vm.strip[int(index)], param.lower())
-                                val = target.knob
-                            case "AUDIBILITY":
-                                val = self.vm.strip[int(index)].audibility
-                            case "BASS" | "MID" | "TREBLE":
-                                val = getattr(self.vm.strip[int(index)], param.lower())
-                            case "LIMIT":
-                                val = self.vm.strip[int(index)].limit
-
-                        match direction:
-                            case "RIGHT" | "UP":
-                                val += 1
-                            case "LEFT" | "DOWN":
-                                val -= 1
-
-                        match param:
-                            case "GAIN":
-                                val = util.check_bounds(val, (-60, 12))
-                                self.vm.strip[int(index)].gain = val
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "COMP" | "GATE" | "DENOISER":
-                                val = util.check_bounds(val, (0, 10))
-                                setattr(target, "knob", val)
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "AUDIBILITY":
-                                val = util.check_bounds(val, (0, 10))
-                                self.vm.strip[int(index)].audibility = val
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "BASS" | "MID" | "TREBLE":
-                                val = util.check_bounds(val, (-12, 12))
-                                setattr(self.vm.strip[int(index)], param.lower(), val)
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "LIMIT":
-                                val = util.check_bounds(val, (-40, 12))
-                                self.vm.strip[int(index)].limit = val
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                        self.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.vm.event.pdirty = True
-                case [
-                    ["STRIP", index],
-                    [
-                        "SLIDER",
-                        "GAIN"
-                        | "COMP"
-                        | "GATE"
-                        | "DENOISER"
-                        | "AUDIBILITY"
-                        | "LIMIT"
-                        | "BASS"
-                        | "MID"
-                        | "TREBLE" as param,
-                    ],
-                    ["KEY", "CTRL", "LEFT" | "RIGHT" | "UP" | "DOWN" as direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.vm.event.pdirty = False
-                        match param:
-                            case "GAIN":
-                                val = self.vm.strip[int(index)].gain
-                            case "COMP" | "GATE" | "DENOISER":
-                                target = getattr(self.vm.strip[int(index)], param.lower())
-                                val = target.knob
-                            case "AUDIBILITY":
-                                val = self.vm.strip[int(index)].audibility
-                            case "BASS" | "MID" | "TREBLE":
-                                val = getattr(self.vm.strip[int(index)], param.lower())
-                            case "LIMIT":
-                                val = self.vm.strip[int(index)].limit
-
-                        match direction:
-                            case "RIGHT" | "UP":
-                                if param in ("COMP", "GATE", "DENOISER", "AUDIBILITY", "BASS", "MID", "TREBLE"):
-                                    val += 1
-                                else:
-                                    val += 3
-                            case "LEFT" | "DOWN":
-                                if param in ("COMP", "GATE", "DENOISER", "AUDIBILITY", "BASS", "MID", "TREBLE"):
-                                    val -= 1
-                                else:
-                                    val -= 3
-
-                        match param:
-                            case "GAIN":
-                                val = util.check_bounds(val, (-60, 12))
-                                self.vm.strip[int(index)].gain = val
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "COMP" | "GATE" | "DENOISER":
-                                val = util.check_bounds(val, (0, 10))
-                                setattr(target, "knob", val)
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "AUDIBILITY":
-                                val = util.check_bounds(val, (0, 10))
-                                self.vm.strip[int(index)].audibility = val
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "BASS" | "MID" | "TREBLE":
-                                val = util.check_bounds(val, (-12, 12))
-                                setattr(self.vm.strip[int(index)], param.lower(), val)
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "LIMIT":
-                                val = util.check_bounds(val, (-40, 12))
-                                self.vm.strip[int(index)].limit = val
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                        if param == "LIMIT":
-                            self.nvda.speak(str(int(val)))
-                        else:
-                            self.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.vm.event.pdirty = True
-                case [
-                    ["STRIP", index],
-                    [
-                        "SLIDER",
-                        "GAIN"
-                        | "COMP"
-                        | "GATE"
-                        | "DENOISER"
-                        | "AUDIBILITY"
-                        | "LIMIT"
-                        | "BASS"
-                        | "MID"
-                        | "TREBLE" as param,
-                    ],
-                    ["KEY", "SHIFT", "LEFT" | "RIGHT" | "UP" | "DOWN" as direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.vm.event.pdirty = False
-                        match param:
-                            case "GAIN":
-                                val = self.vm.strip[int(index)].gain
-                            case "COMP" | "GATE" | "DENOISER":
-                                target = getattr(self.vm.strip[int(index)], param.lower())
-                                val = target.knob
-                            case "AUDIBILITY":
-                                val = self.vm.strip[int(index)].audibility
-                            case "BASS" | "MID" | "TREBLE":
-                                val = getattr(self.vm.strip[int(index)], param.lower())
-                            case "LIMIT":
-                                val = self.vm.strip[int(index)].limit
-
-                        match direction:
-                            case "RIGHT" | "UP":
-                                if param == "LIMIT":
-                                    val += 1
-                                else:
-                                    val += 0.1
-                            case "LEFT" | "DOWN":
-                                if param == "LIMIT":
-                                    val -= 1
-                                else:
-                                    val -= 0.1
-
-                        match param:
-                            case "GAIN":
-                                val = util.check_bounds(val, (-60, 12))
-                                self.vm.strip[int(index)].gain = val
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "COMP" | "GATE" | "DENOISER":
-                                val = util.check_bounds(val, (0, 10))
-                                setattr(target, "knob", val)
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "AUDIBILITY":
-                                val = util.check_bounds(val, (0, 10))
-                                self.vm.strip[int(index)].audibility = val
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "BASS" | "MID" | "TREBLE":
-                                val = util.check_bounds(val, (-12, 12))
-                                setattr(self.vm.strip[int(index)], param.lower(), val)
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                            case "LIMIT":
-                                val = util.check_bounds(val, (-40, 12))
-                                self.vm.strip[int(index)].limit = val
-                                self[f"STRIP {index}||SLIDER {param}"].update(value=val)
-                        if param == "LIMIT":
-                            self.nvda.speak(str(int(val)))
-                        else:
-                            self.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.vm.event.pdirty = True
-                case [["STRIP", index], ["SLIDER", param], ["KEY", "CTRL", "SHIFT", "R"]]:
-                    match param:
-                        case "GAIN":
-                            self.vm.strip[int(index)].gain = 0
-                            self[f"STRIP {index}||SLIDER {param}"].update(value=0)
-                        case "COMP" | "GATE" | "DENOISER":
-                            target = getattr(self.vm.strip[int(index)], param.lower())
-                            setattr(target, "knob", 0)
-                            self[f"STRIP {index}||SLIDER {param}"].update(value=0)
-                        case "AUDIBILITY":
-                            self.vm.strip[int(index)].audibility = 0
-                            self[f"STRIP {index}||SLIDER {param}"].update(value=0)
-                        case "BASS" | "MID" | "TREBLE":
-                            setattr(self.vm.strip[int(index)], param.lower(), 0)
-                            self[f"STRIP {index}||SLIDER {param}"].update(value=0)
-                        case "LIMIT":
-                            self.vm.strip[int(index)].limit = 12
-                            self[f"STRIP {index}||SLIDER {param}"].update(value=12)
-                    self.nvda.speak(f"{12 if param == 'LIMIT' else 0}")
 
                 # Bus Params
-                case [["BUS", index], [param]]:
-                    val = self.cache["bus"][event]
-                    label = self.cache["labels"][f"BUS {index}||LABEL"]
-                    match param:
-                        case "EQ":
-                            val = not val
-                            self.vm.bus[int(index)].eq.on = val
-                            self.cache["bus"][event] = val
-                            self.TKroot.after(
-                                200,
-                                self.nvda.speak,
-                                "on" if val else "off",
-                            )
-                        case "MONO" | "MUTE":
-                            val = not val
-                            setattr(self.vm.bus[int(index)], param.lower(), val)
-                            self.cache["bus"][event] = val
-                            self.TKroot.after(
-                                200,
-                                self.nvda.speak,
-                                "on" if val else "off",
-                            )
-                        case "MODE":
-                            chosen = util._bus_mode_map_reversed[values[event]]
-                            setattr(self.vm.bus[int(index)].mode, chosen, True)
-                            self.cache["bus"][event] = chosen
-                            self.TKroot.after(
-                                200,
-                                self.nvda.speak,
-                                util._bus_mode_map[chosen],
-                            )
                 case [["BUS", index], [param], ["FOCUS", "IN"]]:
                     if self.find_element_with_focus() is not None:
                         label = self.cache["labels"][f"BUS {index}||LABEL"]
@@ -1005,10 +929,6 @@ class NVDAVMWindow(psg.Window):
                         self.find_element_with_focus().click()
 
                 # Bus Sliders
-                case [["BUS", index], ["SLIDER", "GAIN"]]:
-                    label = self.cache["labels"][f"BUS {index}||LABEL"]
-                    val = values[event]
-                    self.vm.bus[int(index)].gain = val
                 case [["BUS", index], ["SLIDER", "GAIN"], ["FOCUS", "IN"]]:
                     if self.find_element_with_focus() is not None:
                         label = self.cache["labels"][f"BUS {index}||LABEL"]
@@ -1016,74 +936,13 @@ class NVDAVMWindow(psg.Window):
                         self.nvda.speak(f"{label} gain {val}")
                 case [["BUS", index], ["SLIDER", "GAIN"], ["FOCUS", "OUT"]]:
                     pass
-                case [
-                    ["BUS", index],
-                    ["SLIDER", "GAIN"],
-                    ["KEY", "LEFT" | "RIGHT" | "UP" | "DOWN" as direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.vm.event.pdirty = False
-                        val = self.vm.bus[int(index)].gain
-                        match direction:
-                            case "RIGHT" | "UP":
-                                val += 1
-                            case "LEFT" | "DOWN":
-                                val -= 1
-                        val = util.check_bounds(val, (-60, 12))
-                        self.vm.bus[int(index)].gain = val
-                        self[f"BUS {index}||SLIDER GAIN"].update(value=val)
-                        self.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.vm.event.pdirty = True
-                case [
-                    ["BUS", index],
-                    ["SLIDER", "GAIN"],
-                    ["KEY", "CTRL", "LEFT" | "RIGHT" | "UP" | "DOWN" as direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.vm.event.pdirty = False
-                        val = self.vm.bus[int(index)].gain
-                        match direction:
-                            case "RIGHT" | "UP":
-                                val += 3
-                            case "LEFT" | "DOWN":
-                                val -= 3
-                        val = util.check_bounds(val, (-60, 12))
-                        self.vm.bus[int(index)].gain = val
-                        self[f"BUS {index}||SLIDER GAIN"].update(value=val)
-                        self.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.vm.event.pdirty = True
-                case [
-                    ["BUS", index],
-                    ["SLIDER", "GAIN"],
-                    ["KEY", "SHIFT", "LEFT" | "RIGHT" | "UP" | "DOWN" as direction, "PRESS" | "RELEASE" as e],
-                ]:
-                    if e == "PRESS":
-                        self.vm.event.pdirty = False
-                        val = self.vm.bus[int(index)].gain
-                        match direction:
-                            case "RIGHT" | "UP":
-                                val += 0.1
-                            case "LEFT" | "DOWN":
-                                val -= 0.1
-                        val = util.check_bounds(val, (-60, 12))
-                        self.vm.bus[int(index)].gain = val
-                        self[f"BUS {index}||SLIDER GAIN"].update(value=val)
-                        self.nvda.speak(str(round(val, 1)))
-                    else:
-                        self.vm.event.pdirty = True
-                case [["BUS", index], ["SLIDER", "GAIN"], ["KEY", "CTRL", "SHIFT", "R"]]:
-                    self.vm.bus[int(index)].gain = 0
-                    self[f"BUS {index}||SLIDER GAIN"].update(value=0)
-                    self.nvda.speak(str(0))
 
                 # Unknown
                 case _:
                     self.logger.debug(f"Unknown event {event}")
-            self.logger.debug(f"parsed::{parsed_cmd}")
 
 
 def request_window_object(kind_id, vm):
+    util.set_theme(configuration.get("default_theme", "Dark Blue 3"))
     NVDAVMWindow_cls = NVDAVMWindow
     return NVDAVMWindow_cls(f"Voicemeeter {kind_id.capitalize()} NVDA", vm)
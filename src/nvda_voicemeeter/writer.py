@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ParamWriter(threading.Thread):
+    """
+    Write-behind queue for vm parameter writes
+
+    Only the newest pending value per key is kept, the queue is flushed by a worker thread at most rate times a second.
+    Flushes are serialised, the gui thread flushes before writing past the queue (scenes, undo) and an older value
+    still held by the worker's flush must not land after that.
+    """
+
+    def __init__(self, rate=60):
+        super().__init__(name="ParamWriter", daemon=True)
+        self.interval = 1 / rate
+        self.logger = logger.getChild(type(self).__name__)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = threading.Event()
+        self.stats = {
+            "queued": 0,
+            "written": 0,
+            "coalesced": 0,
+            "flush_latency": 0.0,
+            "max_flush_latency": 0.0,
+        }
+
+    def __contains__(self, key):
+        return key in self._pending
+
+    def put(self, key, setter, value):
+        """Queues setter(value) replacing any write still pending for key"""
+        with self._lock:
+            if key in self._pending:
+                self.stats["coalesced"] += 1
+                queued_at = self._pending[key][2]
+            else:
+                queued_at = time.perf_counter()
+            self._pending[key] = (setter, value, queued_at)
+            self.stats["queued"] += 1
+        if not self._running.is_set():
+            self.flush()
+        self._wakeup.set()
+
+    def get(self, key, default=None):
+        """Returns the value pending for key, if any"""
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key][1]
+        return default
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending = dict(self._pending)
+            for key, entry in pending.items():
+                setter, value, queued_at = entry
+                try:
+                    setter(value)
+                except Exception as e:
+                    self.logger.error(f"{type(e).__name__}: failed writing {key}: {e}")
+                latency = (time.perf_counter() - queued_at) * 1000
+                with self._lock:
+                    self.stats["written"] += 1
+                    self.stats["flush_latency"] = latency
+                    self.stats["max_flush_latency"] = max(latency, self.stats["max_flush_latency"])
+                    if self._pending.get(key) is entry:
+                        del self._pending[key]
+
+    def start(self):
+        self._running.set()
+        super().start()
+
+    def run(self):
+        while self._running.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            started = time.perf_counter()
+            self.flush()
+            time.sleep(max(0, self.interval - (time.perf_counter() - started)))
+
+    def stop(self):
+        if self._running.is_set():
+            self._running.clear()
+            self._wakeup.set()
+            self.join()
+        self.flush()
+        with self._lock:
+            stats = dict(self.stats)
+        self.logger.debug(f"writer stats: {stats}")
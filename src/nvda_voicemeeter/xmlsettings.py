@@ -0,0 +1,105 @@
+"""
+Local read of Voicemeeter settings files
+
+Each strip and bus is an element with an index, its parameters attributes or child elements named as in the
+Voicemeeter script API (Mute, A1, Gain, EQGain1, Label...). The file is streamed with iterparse, every strip and
+bus element is cleared once mapped, and the values are returned keyed like the controller's caches. Anything not
+recognised is skipped, the engine remains the reference once it has applied the file.
+"""
+
+import xml.etree.ElementTree as ET
+
+from . import params, scenes, util
+
+KINDS_BY_CHANNELS = {(3, 2): "basic", (5, 5): "banana", (8, 8): "potato"}
+
+
+def _names(specs, section) -> dict:
+    """Maps lowercased script names of a section onto cache params"""
+    names = {script.lower(): param for param, script in scenes._switches.items()}
+    names |= {spec.script.lower(): f"SLIDER {param}" for param, spec in specs[section].items()}
+    return names | {"eq": "EQ", "k": "KARAOKE", "label": "LABEL", "mode": "MODE"}
+
+
+def _convert(param, value, specs):
+    if param == "LABEL":
+        return value
+    if param == "MODE":
+        modes = list(util._bus_mode_map)
+        if value.lower() in modes:
+            return value.lower()
+        if not 0 <= (i := int(float(value))) < len(modes):
+            raise ValueError(f"bus mode {i} out of range")
+        return modes[i]
+    if param.startswith("SLIDER "):
+        val = float(value)
+        return int(val) if specs[param.removeprefix("SLIDER ")].precision == 0 else val
+    if param == "KARAOKE":
+        return int(float(value))
+    return bool(int(float(value)))
+
+
+def _local(tag) -> str:
+    return tag.rpartition("}")[2]
+
+
+def _channels(path) -> dict:
+    """Returns the raw parameters of each strip and bus element, by section then index"""
+    found = {"strip": {}, "bus": {}}
+    for _, elem in ET.iterparse(path, events=("end",)):
+        section = _local(elem.tag).lower()
+        if section not in found:
+            continue
+        index = elem.get("index", elem.get("id", ""))
+        if index.isdigit():
+            raw = dict(elem.attrib) | {
+                _local(child.tag): child.text for child in elem if child.text and not len(child)
+            }
+            found[section][int(index)] = {name.lower(): value.strip() for name, value in raw.items()}
+        elem.clear()
+    return found
+
+
+def read(path, kind) -> dict:
+    """Returns the strip, bus, slider and label values found in a settings file, keyed like the caches"""
+    specs = params.get_param_specs(kind)
+    names = {"strip": _names(specs, "STRIP"), "bus": _names(specs, "BUS")}
+    found = _channels(path)
+    cache = {"strip": {}, "bus": {}, "sliders": {}, "labels": {}}
+    for section, channels in found.items():
+        base = 0 if 0 in channels else 1  # files number from 1, allow for either
+        for index, raw in channels.items():
+            identifier = f"{section.upper()} {index - base}"
+            for name, value in raw.items():
+                if (param := names[section].get(name)) is None or (param == "LABEL" and not value):
+                    continue
+                try:
+                    val = _convert(param, value, specs[section.upper()])
+                except (ValueError, IndexError):
+                    continue
+                target = "sliders" if param.startswith("SLIDER ") else "labels" if param == "LABEL" else section
+                cache[target][f"{identifier}||{param}"] = val
+    return cache
+
+
+def summarise(path) -> dict:
+    """
+    Returns the kind, labels and a one line summary of a settings file
+
+    The kind is guessed from the number of strips and buses, None when they match no kind. A module level function so
+    a process pool can run it.
+    """
+    try:
+        found = _channels(path)
+    except (OSError, ET.ParseError):
+        return {"kind": None, "readable": False, "labels": [], "summary": "could not be read"}
+    labels = [
+        raw["label"] for section in ("strip", "bus") for _, raw in sorted(found[section].items()) if raw.get("label")
+    ]
+    strips, buses = len(found["strip"]), len(found["bus"])
+    return {
+        "kind": KINDS_BY_CHANNELS.get((strips, buses)),
+        "readable": True,
+        "labels": labels,
+        "summary": ", ".join(labels) if labels else f"{strips} strips, {buses} buses",
+    }
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+import fakevm
+import pytest
+
+from nvda_voicemeeter.builder import Builder
+from nvda_voicemeeter.compound import CompSlider, GateSlider, LabelSliderAdvanced
+from nvda_voicemeeter.controller import Controller
+
+
+def make_window(kind):
+    vm = fakevm.api(kind)
+    controller = Controller(vm)
+    return SimpleNamespace(
+        vm=vm, kind=vm.kind, controller=controller, specs=controller.specs, cache=controller.cache, configs=[]
+    )
+
+
+@pytest.mark.parametrize("kind", fakevm.KINDS)
+def test_layout_builds_for_every_kind(kind):
+    """The layout is built before tk has a window, so this runs without a display"""
+    assert Builder(make_window(kind)).run()
+
+
+@pytest.mark.parametrize("section, slider_cls", [("comp", CompSlider), ("gate", GateSlider)])
+def test_dynamics_sliders_start_from_the_watched_cache(section, slider_cls):
+    window = make_window("potato")
+    window.controller.watch(section, 1)
+    window.vm.reset_calls()
+    sliders = [
+        LabelSliderAdvanced(window, 1, param, slider_cls)
+        for param in window.specs["COMPRESSOR" if section == "comp" else "GATE"]
+    ]
+    assert window.vm.calls["get"] == 0
+    for frame in sliders:
+        slider = frame.Rows[0][1]
+        assert slider.DefaultValue == window.cache[section][f"STRIP 1||{slider.Key}"]
@@ -0,0 +1,42 @@
+import json
+import os
+
+from nvda_voicemeeter import configuration
+from nvda_voicemeeter.configuration import SettingsStore
+
+
+def make_store(tmp_path):
+    store = SettingsStore(delay=60, retry_delay=60)
+    store._path = tmp_path / "settings.json"
+    return store
+
+
+def test_failed_write_keeps_changes_pending(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    store.set("default_theme", "Dark Blue 3")
+    replace = os.replace
+
+    def fail(*args):
+        raise OSError("file locked")
+
+    monkeypatch.setattr(configuration.os, "replace", fail)
+    store.flush()
+    assert not store.path.exists()
+    assert store._dirty
+    assert store._timer is not None  # the retry is armed
+
+    monkeypatch.setattr(configuration.os, "replace", replace)
+    store.flush()
+    assert json.loads(store.path.read_text()) == {"default_theme": "Dark Blue 3"}
+    assert not store._dirty
+    assert store.stats["writes"] == 1
+
+
+def test_delete_key_stored_as_none(tmp_path):
+    store = make_store(tmp_path)
+    store.set("default_config", None)
+    store.flush()
+    store.delete("default_config")
+    assert store._dirty
+    store.flush()
+    assert json.loads(store.path.read_text()) == {}
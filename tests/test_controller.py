@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import fakevm
+
+from nvda_voicemeeter.controller import Controller
+
+
+def test_pdirty_reports_changed_dynamics_of_watched_strips_only():
+    vm = fakevm.api("potato")
+    controller = Controller(vm)
+    controller.watch("comp", 0)
+    assert controller.on_pdirty()["comp"] == {}
+
+    vm.strip[0].comp.ratio = 3
+    vm.strip[1].comp.ratio = 4
+    assert controller.on_pdirty()["comp"] == {"STRIP 0||COMPRESSOR||SLIDER RATIO": 3}
+
+    controller.unwatch("comp", 0)
+    vm.strip[0].comp.ratio = 5
+    assert controller.on_pdirty()["comp"] == {}
+    assert controller.cache["comp"] == {}
+
+
+def test_pdirty_keeps_pending_dynamics_writes():
+    vm = fakevm.api("potato")
+    controller = Controller(vm)
+    controller.watch("gate", 2)
+    key = "STRIP 2||GATE||SLIDER HOLD"
+    controller.steps[key] = 750
+    controller.cache["gate"][key] = 750
+    assert key not in controller.on_pdirty()["gate"]
+    assert controller.cache["gate"][key] == 750
+
+
+def test_load_config_previews_the_file_and_leaves_the_cache_to_the_engine():
+    vm = fakevm.api("potato")
+    controller = Controller(vm)
+    drawn = []
+    controller.add_view(drawn.append)
+    preview = controller.load_config(Path(__file__).parent / "fixtures" / "potato.xml")
+    assert preview["strip"]["STRIP 0||MUTE"] is True
+    assert drawn == [preview]
+    assert not controller.cache["strip"]["STRIP 0||MUTE"]
+
+    # a toggle before verification works from the engine state, not the preview
+    assert controller.toggle("STRIP 0||MUTE") is True
+    assert vm.strip[0].mute
+
+
+def test_verify_config_redraws_previewed_entries_the_engine_did_not_apply():
+    vm = fakevm.api("potato")
+    controller = Controller(vm)
+    controller.load_config(Path(__file__).parent / "fixtures" / "potato.xml")
+    vm.poke("Strip[0].Mute", 1)
+    vm.poke("Strip[0].Label", "Mic")
+    drawn = []
+    controller.add_view(drawn.append)
+    differences = controller.verify_config("potato")
+    assert "STRIP 0||MUTE" not in differences
+    assert "STRIP 0||LABEL" not in differences
+    assert differences["STRIP 0||A1"] is False
+    redraw = drawn[-1]
+    assert redraw["strip"]["STRIP 0||A1"] is False
+    assert "STRIP 0||MUTE" not in redraw["strip"]
+    assert controller.preview["strip"] == {}
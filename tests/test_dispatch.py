@@ -0,0 +1,101 @@
+import fakevm
+
+from nvda_voicemeeter.controller import Controller
+from nvda_voicemeeter.dispatch import Dispatcher
+from nvda_voicemeeter.parser import Parser
+from nvda_voicemeeter.session import Replayer
+
+parser = Parser()
+
+TAB = {"tabgroup": "tab||Physical Strip"}
+
+
+def make(kind="potato"):
+    vm = fakevm.api(kind)
+    controller = Controller(vm)
+    loop = fakevm.FakeLoop()
+    moved = {}
+    dispatcher = Dispatcher(controller, loop.after, move=moved.__setitem__)
+    return vm, controller, loop, dispatcher, moved
+
+
+def main(dispatcher, event, values=TAB, focus=None):
+    return dispatcher.main(parser.match.parseString(event), event, values, lambda: focus)
+
+
+def test_steps_in_one_frame_are_coalesced():
+    vm, controller, loop, dispatcher, moved = make()
+    key = "STRIP 0||SLIDER GAIN"
+    for _ in range(3):
+        assert main(dispatcher, f"{key}||KEY RIGHT PRESS")
+    assert vm.strip[0].gain == 1  # the first step is applied at once
+    assert controller.steps == {key: 3}
+    assert not vm.event.pdirty  # refreshes are held while the key is down
+    loop.run_until(lambda: not loop.timers)
+    assert vm.strip[0].gain == 3
+    assert moved[key] == 3
+    main(dispatcher, f"{key}||KEY RIGHT RELEASE")
+    assert vm.event.pdirty
+
+
+def test_slider_mode_steps_the_slider_of_the_focused_strip():
+    vm, controller, loop, dispatcher, moved = make()
+    assert main(dispatcher, "ALT RIGHT||PRESS", focus="STRIP 1||MUTE")
+    assert vm.strip[1].gain == 0  # no slider mode yet
+    assert main(dispatcher, "GAIN MODE")
+    main(dispatcher, "ALT RIGHT||PRESS", values={"tabgroup": "tab||Settings"}, focus="STRIP 1||MUTE")
+    assert vm.strip[1].gain == 0  # not on a strip tab
+    main(dispatcher, "ALT RIGHT||PRESS", focus="tabgroup||Physical Strip")
+    main(dispatcher, "ALT RIGHT||PRESS", focus="STRIP 1||MUTE")
+    assert vm.strip[1].gain == 1
+    assert main(dispatcher, "ESCAPE")
+    assert dispatcher.mode is None
+
+
+def test_switches_sliders_and_unknown_events():
+    vm, controller, loop, dispatcher, moved = make()
+    assert main(dispatcher, "STRIP 0||MUTE")
+    assert vm.strip[0].mute
+    assert main(dispatcher, "STRIP 0||SLIDER LIMIT", {"STRIP 0||SLIDER LIMIT": 3.0})
+    assert controller.cache["sliders"]["STRIP 0||SLIDER LIMIT"] == 3
+    assert main(dispatcher, "BUS 0||MODE", {"BUS 0||MODE": "Composite"})
+    assert controller.cache["bus"]["BUS 0||MODE"] == "composite"
+    assert not main(dispatcher, "STRIP 0||MUTE||FOCUS IN")
+    assert not main(dispatcher, "CTRL-TAB")
+
+
+def test_popup_steps_and_undo_move_the_sliders():
+    vm, controller, loop, dispatcher, moved = make()
+    before = vm.strip[2].comp.ratio
+    event = "COMPRESSOR||SLIDER RATIO||KEY RIGHT PRESS"
+    assert dispatcher.dynamics(2, parser.match.parseString(event), event, {})
+    key = "STRIP 2||COMPRESSOR||SLIDER RATIO"
+    assert moved[key] == vm.strip[2].comp.ratio == before + 1
+    loop.run_until(lambda: not loop.timers)
+    controller.writer.flush()
+    assert dispatcher.dynamics(0, parser.match.parseString("CTRL-Z"), "CTRL-Z", {})
+    controller.writer.flush()
+    assert moved[key] == vm.strip[2].comp.ratio == before
+
+
+def test_replayer_runs_the_shared_handlers():
+    vm = fakevm.api("potato")
+    controller = Controller(vm)
+    loop = fakevm.FakeLoop()
+    replayer = Replayer(controller, loop.after)
+    records = [
+        ("main", "GAIN MODE", {}, None),
+        ("main", "ALT LEFT||PRESS", TAB, "STRIP 3||A1"),
+        ("main", "STRIP 3||SOLO", {}, "STRIP 3||SOLO"),
+        ("main", "STRIP 3||SOLO||FOCUS IN", {}, "STRIP 3||SOLO"),
+        ("gate 1", "GATE||SLIDER HOLD", {"GATE||SLIDER HOLD": 750.0}, None),
+        ("advanced settings", "BUFFER MME", {}, None),
+    ]
+    done = [replayer.dispatch(*record) for record in records]
+    loop.run_until(lambda: not loop.timers)
+    controller.writer.flush()
+    assert done == [True, True, True, False, True, False]
+    assert replayer.stats == {"replayed": 4, "skipped": 2}
+    assert vm.strip[3].gain == -1
+    assert vm.strip[3].solo
+    assert vm.strip[1].gate.hold == 750
@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+
+import pytest
+from bench_fake import hold
+
+
+@pytest.mark.parametrize(
+    "start, rate, repeats, expected",
+    [
+        pytest.param(-60, 200, 50, -10, id="within range"),
+        pytest.param(0, 200, 50, 12, id="held past the limit"),
+        pytest.param(10.5, 30, 5, 12, id="clamped off step"),
+    ],
+)
+def test_coalesced_hold_ends_where_per_event_does(start, rate, repeats, expected):
+    """Per frame coalescing skips writes, never steps: the final gain matches handling every repeat"""
+    args = SimpleNamespace(hold_rate=rate, hold_seconds=repeats / rate)
+    per_event = hold(args, "potato", coalesced=False, latency=0, start=start)
+    coalesced = hold(args, "potato", coalesced=True, latency=0, start=start)
+    assert per_event[2] == coalesced[2] == expected
+    if rate > 1000 / 16:
+        assert coalesced[0] < per_event[0]
@@ -0,0 +1,44 @@
+import shutil
+from pathlib import Path
+
+from concurrent.futures.process import BrokenProcessPool
+
+from nvda_voicemeeter import library
+from nvda_voicemeeter.library import ConfigLibrary
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def make(tmp_path):
+    folder = tmp_path / "configs"
+    folder.mkdir()
+    shutil.copy(FIXTURES / "potato.xml", folder)
+    return folder, ConfigLibrary(folder, tmp_path / "library.json")
+
+
+def test_entries_are_kept_when_the_index_cannot_be_written(tmp_path, monkeypatch, caplog):
+    folder, lib = make(tmp_path)
+
+    def fail(src, dst):
+        raise PermissionError("read only")
+
+    monkeypatch.setattr(library.os, "replace", fail)
+    assert lib.refresh()
+    assert lib.for_kind("potato") == [folder / "potato.xml"]
+    assert not lib.path.exists()
+    assert "could not be written" in caplog.text
+
+
+def test_old_entries_stay_when_the_files_cannot_be_read(tmp_path, monkeypatch, caplog):
+    folder, lib = make(tmp_path)
+    assert lib.refresh()
+    shutil.copy(FIXTURES / "banana.xml", folder)
+
+    def fail(paths):
+        raise BrokenProcessPool("worker died")
+
+    monkeypatch.setattr(lib, "_summarise", fail)
+    assert not lib.refresh()
+    assert lib.for_kind("banana") == []
+    assert lib.for_kind("potato") == [folder / "potato.xml"]
+    assert "could not be read" in caplog.text
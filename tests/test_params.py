@@ -0,0 +1,109 @@
+import fakevm
+import pytest
+
+from nvda_voicemeeter.params import get_param_specs
+
+# The constants of the match chains the ParamSpec table replaced, per section and param:
+# (range, resolution, steps by modifier, reset, spoken precision)
+DEFAULT_STEPS = {(): 1, ("CTRL",): 3, ("SHIFT",): 0.1}
+KNOB_STEPS = {(): 1, ("CTRL",): 1, ("SHIFT",): 0.1}
+LONG_STEPS = DEFAULT_STEPS | {("ALT",): 10, ("CTRL", "ALT"): 50}
+
+GAIN = ((-60, 12), 0.1, DEFAULT_STEPS, 0, 1)
+KNOB = ((0, 10), 0.1, KNOB_STEPS, 0, 1)
+EQ = ((-12, 12), 0.1, KNOB_STEPS, 0, 1)
+
+OLD = {
+    "basic": {
+        "STRIP": {"GAIN": GAIN, "BASS": EQ, "MID": EQ, "TREBLE": EQ, "AUDIBILITY": KNOB},
+        "BUS": {"GAIN": GAIN},
+    },
+}
+OLD["banana"] = {
+    "STRIP": {
+        "GAIN": GAIN,
+        "BASS": EQ,
+        "MID": EQ,
+        "TREBLE": EQ,
+        "COMP": KNOB,
+        "GATE": KNOB,
+        "LIMIT": ((-40, 12), 1, {(): 1, ("CTRL",): 3, ("SHIFT",): 1}, 12, 0),
+    },
+    "BUS": {"GAIN": GAIN},
+    "COMPRESSOR": {
+        "INPUT GAIN": ((-24, 24), 0.1, DEFAULT_STEPS, 0, 1),
+        "RATIO": ((1, 8), 0.1, DEFAULT_STEPS, 1, 1),
+        "THRESHOLD": ((-40, -3), 0.1, DEFAULT_STEPS, -20, 1),
+        "ATTACK": ((0, 200), 0.1, DEFAULT_STEPS, 10, 1),
+        "RELEASE": ((0, 5000), 0.1, LONG_STEPS | {("CTRL",): 5}, 50, 1),
+        "KNEE": ((0, 1), 0.01, {(): 0.1, ("CTRL",): 0.3, ("SHIFT",): 0.01}, 0.5, 2),
+        "OUTPUT GAIN": ((-24, 24), 0.1, DEFAULT_STEPS, 0, 1),
+    },
+    "GATE": {
+        "THRESHOLD": ((-60, -10), 0.1, DEFAULT_STEPS, -60, 1),
+        "DAMPING": ((-60, -10), 0.1, DEFAULT_STEPS, -60, 1),
+        "BPSIDECHAIN": ((100, 4000), 1, LONG_STEPS, 100, 0),
+        "ATTACK": ((0, 1000), 0.1, LONG_STEPS, 0, 1),
+        "HOLD": ((0, 5000), 0.1, LONG_STEPS, 500, 1),
+        "RELEASE": ((0, 5000), 0.1, LONG_STEPS, 1000, 1),
+    },
+}
+OLD["potato"] = OLD["banana"] | {"STRIP": OLD["banana"]["STRIP"] | {"DENOISER": KNOB}}
+
+MODIFIERS = [(), ("CTRL",), ("SHIFT",), ("ALT",), ("CTRL", "ALT")]
+
+CASES = [
+    pytest.param(kind, section, param, expected, id=f"{kind}-{section}-{param}")
+    for kind, sections in OLD.items()
+    for section, table in sections.items()
+    for param, expected in table.items()
+]
+
+
+def specs(kind):
+    return get_param_specs(fakevm.KINDS[kind])
+
+
+@pytest.mark.parametrize("kind", OLD)
+def test_same_params_per_kind(kind):
+    assert {section: set(table) for section, table in specs(kind).items()} == {
+        section: set(table) for section, table in OLD[kind].items()
+    }
+
+
+@pytest.mark.parametrize("kind, section, param, expected", CASES)
+def test_spec_matches_old_constants(kind, section, param, expected):
+    range_, resolution, steps, reset, precision = expected
+    spec = specs(kind)[section][param]
+    assert spec.range == range_
+    assert spec.resolution == resolution
+    assert spec.reset == reset
+    assert spec.precision == precision
+    assert spec.disabled == (section == "COMPRESSOR" and param.endswith(" GAIN"))
+
+    low, high = range_
+    mid = (low + high) / 2
+    for modifier in MODIFIERS:
+        if (step := steps.get(modifier)) is None:
+            assert spec.step(mid, "RIGHT", modifier) is None, modifier
+            continue
+        assert spec.step(mid, "RIGHT", modifier) == pytest.approx(mid + step), modifier
+        assert spec.step(mid, "LEFT", modifier) == pytest.approx(mid - step), modifier
+        assert spec.step(high, "RIGHT", modifier) == high, modifier
+        assert spec.step(low, "LEFT", modifier) == low, modifier
+
+
+@pytest.mark.parametrize("kind", ["banana", "potato"])
+def test_gate_damping_is_clamped(kind):
+    """Changed: the old check_bounds matched "DAMPING MAX", so damping steps were never clamped"""
+    damping = specs(kind)["GATE"]["DAMPING"]
+    assert damping.step(-10, "RIGHT", ()) == -10
+    assert damping.step(-60, "LEFT", ("CTRL",)) == -60
+
+
+@pytest.mark.parametrize("section, param", [("COMPRESSOR", "RELEASE"), ("GATE", "BPSIDECHAIN"), ("GATE", "HOLD")])
+def test_alt_up_down_step_like_left_right(section, param):
+    """Changed: Alt + Up|Down were bound but only Alt + Left|Right had a handler, they now step too"""
+    spec = specs("potato")[section][param]
+    assert spec.step(1000, "UP", ("ALT",)) == spec.step(1000, "RIGHT", ("ALT",)) == 1010
+    assert spec.step(1000, "DOWN", ("CTRL", "ALT")) == spec.step(1000, "LEFT", ("CTRL", "ALT")) == 950
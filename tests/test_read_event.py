@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import PySimpleGUI as psg
+
+from nvda_voicemeeter.latency import LatencyRecorder
+from nvda_voicemeeter.parser import Parser
+from nvda_voicemeeter.trace import EventTrace
+from nvda_voicemeeter.window import NVDAVMWindow
+
+
+class Events:
+    """Stands in for a window, read() returns the given events in turn"""
+
+    def __init__(self, *events):
+        self.events = list(events)
+
+    def read(self):
+        return self.events.pop(0), {}
+
+    def find_element_with_focus(self):
+        return None
+
+
+def make_window():
+    return SimpleNamespace(
+        latency=LatencyRecorder(),
+        loop_timers={},
+        accounting=None,
+        session=None,
+        trace=EventTrace(),
+        parser=Parser(),
+    )
+
+
+def read(window, win, loop, closing=(psg.WIN_CLOSED,)):
+    return NVDAVMWindow.read_event(window, win, loop, closing=closing)
+
+
+def test_read_event_parses_traces_and_times():
+    window = make_window()
+    main = Events("STRIP 0||MUTE", psg.WIN_CLOSED)
+    event, _, parsed = read(window, main, "main")
+    assert event == "STRIP 0||MUTE"
+    assert parsed.as_list() == [["STRIP", "0"], ["MUTE"]]
+    assert window.trace.records[-1].parsed is parsed
+    assert read(window, main, "main")[2] is None
+    assert set(window.latency.histograms["main STRIP||MUTE"]) >= {"read", "parse", "handler"}
+
+
+def test_handler_running_another_loop_is_not_timed():
+    window = make_window()
+    main = Events("STRIP 0||SLIDER COMP||KEY CTRL A", "tabgroup")
+    popup = Events("Exit")
+    read(window, main, "main")
+    read(window, popup, "compressor 0", closing=("Exit",))
+    read(window, main, "main")
+    assert "handler" not in window.latency.histograms["main STRIP||SLIDER COMP||KEY CTRL A"]
+    assert "handler" not in window.latency.histograms["compressor Exit"]
@@ -0,0 +1,65 @@
+import socket
+import threading
+
+import fakevm
+import pytest
+
+from nvda_voicemeeter.controller import Controller
+from nvda_voicemeeter.server import CommandServer
+
+
+def test_stop_answers_a_batch_left_waiting():
+    controller = Controller(fakevm.api("potato"), post=lambda key, value: None)  # batches are never run
+    server = CommandServer(controller, 0)
+    server.start()
+    with socket.create_connection((server.host, server.port), timeout=2) as client:
+        client.sendall(b"STRIP 0||MUTE\n")
+        while not server._waiting:
+            threading.Event().wait(0.01)
+        stopping = threading.Thread(target=server.stop)
+        stopping.start()
+        stopping.join(5)
+        assert not stopping.is_alive()
+        assert client.makefile().readline() == "ERR shutting down\n"
+
+
+def test_start_raises_when_the_port_is_taken():
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+        with pytest.raises(OSError):
+            CommandServer(Controller(fakevm.api("potato")), port).start()
+
+        controller = Controller(fakevm.api("potato"), port=port)
+        controller.start()
+        try:
+            assert controller.server is None
+            assert controller.run(poll=0) == 1
+        finally:
+            controller.stop()
+
+
+def test_run_batch_replies_when_applying_fails(monkeypatch):
+    controller = Controller(fakevm.api("potato"))
+
+    def fail(changes):
+        raise RuntimeError("engine gone")
+
+    monkeypatch.setattr(controller, "apply_deltas", fail)
+    replies = []
+    with pytest.raises(RuntimeError):
+        controller.run_batch([("STRIP 0||MUTE", None)], replies.append)
+    assert replies == ["ERR batch failed"]
+
+
+def test_bare_karaoke_cycles_like_the_window():
+    vm = fakevm.api("potato")
+    controller = Controller(vm)
+    replies = []
+    for expected in (1, 2, 3, 4, 0):
+        controller.run_batch([("STRIP 6||KARAOKE", None)], replies.append)
+        assert controller.cache["strip"]["STRIP 6||KARAOKE"] == expected
+    assert replies == ["OK 1"] * 5
+    controller.run_batch([("STRIP 6||KARAOKE", 5)], replies.append)
+    assert replies[-1] == "ERR STRIP 6||KARAOKE: expected 0 to 4"
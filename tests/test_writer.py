@@ -0,0 +1,76 @@
+import threading
+
+from nvda_voicemeeter.writer import ParamWriter
+
+
+class Blocking:
+    """A setter whose first call waits for release(), the engine sees each value once its call returns"""
+
+    def __init__(self):
+        self.written = []
+        self.entered = threading.Event()
+        self._release = threading.Event()
+
+    def __call__(self, value):
+        if not self.entered.is_set():
+            self.entered.set()
+            self._release.wait(1)
+        self.written.append(value)
+
+    def release(self):
+        self._release.set()
+
+
+def test_newest_pending_value_is_written_once():
+    setter = Blocking()
+    writer = ParamWriter()
+    writer.start()
+    writer.put("first", setter, 0)
+    assert setter.entered.wait(1)
+    written = []
+    for val in (1, 2, 3):
+        writer.put("gain", written.append, val)
+    assert writer.get("gain") == 3
+    setter.release()
+    writer.stop()
+    assert written == [3]
+    assert "gain" not in writer
+    assert writer.stats["queued"] == 4
+    assert writer.stats["coalesced"] == 2
+    assert writer.stats["written"] == 2
+
+
+def test_write_after_flush_lands_after_the_worker_write():
+    """A direct write (scene, undo) following flush() is the newest, the worker's older value must not follow it"""
+    setter = Blocking()
+    writer = ParamWriter()
+    writer.start()
+    writer.put("gain", setter, 1)
+    assert setter.entered.wait(1)
+
+    def scene():
+        writer.flush()
+        setter.written.append(2)
+
+    thread = threading.Thread(target=scene)
+    thread.start()
+    thread.join(0.1)
+    setter.release()
+    thread.join(1)
+    writer.stop()
+    assert setter.written[-1] == 2
+
+
+def test_stop_straight_after_start_ends_the_worker():
+    writer = ParamWriter()
+    writer.start()
+    writer.stop()
+    assert not writer.is_alive()
+
+
+def test_put_without_worker_writes_at_once():
+    written = []
+    writer = ParamWriter()
+    writer.put("gain", written.append, 1)
+    assert written == [1]
+    assert "gain" not in writer
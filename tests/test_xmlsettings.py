@@ -0,0 +1,108 @@
+from pathlib import Path
+
+import fakevm
+import pytest
+
+from nvda_voicemeeter import xmlsettings
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def read(kind):
+    return xmlsettings.read(FIXTURES / f"{kind}.xml", fakevm.KINDS[kind])
+
+
+def test_read_attributes_numbered_from_one():
+    assert read("potato") == {
+        "strip": {
+            "STRIP 0||A1": True,
+            "STRIP 0||B1": True,
+            "STRIP 0||MONO": False,
+            "STRIP 0||MUTE": True,
+            "STRIP 1||A2": True,
+            "STRIP 1||MONO": True,
+            "STRIP 2||A1": True,
+            "STRIP 5||A1": True,
+            "STRIP 5||KARAOKE": 2,
+            "STRIP 6||B2": True,
+        },
+        "bus": {"BUS 0||EQ": True, "BUS 0||MODE": "repeat", "BUS 1||MODE": "composite", "BUS 1||MUTE": True},
+        "sliders": {
+            "STRIP 0||SLIDER GAIN": -6.5,
+            "STRIP 0||SLIDER COMP": 3.2,
+            "STRIP 0||SLIDER GATE": 1.5,
+            "STRIP 0||SLIDER LIMIT": 6,
+            "STRIP 0||SLIDER DENOISER": 2.0,
+            "STRIP 5||SLIDER BASS": 3.0,
+            "BUS 0||SLIDER GAIN": -3.0,
+        },
+        "labels": {
+            "STRIP 0||LABEL": "Mic",
+            "STRIP 5||LABEL": "Desktop",
+            "STRIP 6||LABEL": "Comms",
+            "BUS 0||LABEL": "Speakers",
+            "BUS 1||LABEL": "Headphones",
+            "BUS 5||LABEL": "Stream",
+        },
+    }
+
+
+def test_read_skips_unknown_names_and_bad_values():
+    parsed = read("potato")
+    assert "STRIP 1||SLIDER GAIN" not in parsed["sliders"]
+    assert "STRIP 1||LABEL" not in parsed["labels"]
+    assert isinstance(parsed["sliders"]["STRIP 0||SLIDER LIMIT"], int)
+
+
+def test_read_namespaced_child_elements_numbered_from_zero():
+    assert read("banana") == {
+        "strip": {"STRIP 0||A3": True, "STRIP 0||MUTE": True, "STRIP 3||SOLO": True},
+        "bus": {"BUS 0||MODE": "amix"},
+        "sliders": {"STRIP 0||SLIDER GAIN": -12.0},
+        "labels": {"STRIP 0||LABEL": "Mic", "STRIP 3||LABEL": "Music", "BUS 4||LABEL": "Recorder"},
+    }
+
+
+def test_read_skips_bus_modes_out_of_range(tmp_path):
+    path = tmp_path / "modes.xml"
+    path.write_text(
+        '<Settings><Bus index="1" Mode="-1" /><Bus index="2" Mode="99" /><Bus index="3" Mode="1" /></Settings>'
+    )
+    assert xmlsettings.read(path, fakevm.KINDS["potato"])["bus"] == {"BUS 2||MODE": "amix"}
+
+
+@pytest.mark.parametrize(
+    "kind, labels, summary",
+    [
+        ("basic", [], "3 strips, 2 buses"),
+        ("banana", ["Mic", "Music", "Recorder"], "Mic, Music, Recorder"),
+        ("potato", ["Mic", "Desktop", "Comms", "Speakers", "Headphones", "Stream"], None),
+    ],
+)
+def test_summarise(kind, labels, summary):
+    summarised = xmlsettings.summarise(FIXTURES / f"{kind}.xml")
+    assert summarised["kind"] == kind
+    assert summarised["readable"]
+    assert summarised["labels"] == labels
+    assert summarised["summary"] == (summary or ", ".join(labels))
+
+
+def test_summarise_unknown_kind(tmp_path):
+    """Five strips are only banana with five buses, anything else is left to the engine"""
+    path = tmp_path / "partial.xml"
+    path.write_text(
+        "<Settings>" + "".join(f'<Strip index="{i}" />' for i in range(1, 6)) + '<Bus index="1" /></Settings>'
+    )
+    assert xmlsettings.summarise(path) == {
+        "kind": None,
+        "readable": True,
+        "labels": [],
+        "summary": "5 strips, 1 buses",
+    }
+
+
+def test_summarise_unreadable(tmp_path):
+    path = tmp_path / "broken.xml"
+    path.write_text("<Settings><Strip index='1'>")
+    assert xmlsettings.summarise(path)["readable"] is False
+    assert xmlsettings.summarise(tmp_path / "missing.xml")["readable"] is False